@@ -0,0 +1,76 @@
+"""
+Startup time benchmark for the drbl_py CLI.
+
+Runs each command in a fresh interpreter several times and reports the
+best and median wall time, plus the slowest imports of the last run.
+
+    $ python benchmarks/startup.py --runs 20
+"""
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+COMMANDS = {
+    "import": "import dribbble_py.cli",
+    "version": "from dribbble_py.cli import main; main(['drbl_py', '--version'])",
+    "help": "from dribbble_py.cli import main; main(['drbl_py', '--help'])",
+    "import scraper": "from dribbble_py import DribbbleUser",
+}
+
+
+def time_command(code: str, runs: int) -> list:
+    """
+    Returns the wall times of running code in fresh interpreters
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def slowest_imports(code: str, count: int) -> list:
+    """
+    Returns the imports with the highest cumulative time for code
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    argparser = argparse.ArgumentParser(description="drbl_py startup benchmark")
+    argparser.add_argument("--runs", type=int, default=10)
+    argparser.add_argument("--imports", type=int, default=5)
+    args = argparser.parse_args()
+
+    for name, code in COMMANDS.items():
+        timings = time_command(code, args.runs)
+        print(
+            "{:<16} best {:7.1f} ms   median {:7.1f} ms".format(
+                name, min(timings) * 1000, statistics.median(timings) * 1000
+            )
+        )
+        for cumulative, module in slowest_imports(code, args.imports):
+            print("    {:>8.1f} ms  {}".format(cumulative / 1000, module))
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,19 @@
-from .dribbble_user import *
+from .sections import SECTIONS, FIELD_SECTIONS, plan_sections
+
+__all__ = [
+    "DRIBBBLE_URL",
+    "DribbbleUser",
+    "SECTIONS",
+    "FIELD_SECTIONS",
+    "plan_sections",
+]
+
+
+def __getattr__(name):
+    # DribbbleUser pulls in httpx, bs4, lxml and chompjs, so it is only
+    # imported when it is first used
+    if name in ("DribbbleUser", "DRIBBBLE_URL"):
+        from . import dribbble_user
+
+        return getattr(dribbble_user, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -2,18 +2,94 @@ import sys
 import time
 import argparse
 import textwrap
-from art import tprint
+import importlib
+import contextlib
+import tracemalloc
 
-from .dribbble_user import *
+from .sections import SECTIONS, plan_sections
+from .serialization import COMPRESSIONS, FORMATS, output_path
+from .utils import split_csv
 
 __version__ = "0.0.1"
 
+SUBCOMMANDS = {
+    "serve": ".service",
+    "crawl": ".crawler",
+    "worker": ".worker",
+    "diff": ".diff",
+    "history": ".timeseries",
+    "palette": ".palette",
+    "tags": ".tags",
+    "synthetic": ".synthetic",
+}
 
-t1 = time.perf_counter()
+
+def print_banner():
+    """
+    Prints the dribbble-py banner
+    """
+    from art import tprint
+
+    tprint("DRIBBBLE-PY")
+    print("version {}".format(__version__))
+
+
+def megabytes(value: float) -> int:
+    """
+    Converts an optional size in megabytes to bytes
+    """
+    return int(value * 1024 * 1024) if value is not None else None
+
+
+def print_proxy_report(proxy_report: list):
+    """
+    Prints the health and request counts of every proxy
+    """
+    print(
+        "\n{:<32} {:>7} {:>9} {:>8} {:>7}".format(
+            "Proxy", "Health", "Requests", "Blocked", "Errors"
+        )
+    )
+    for report in proxy_report:
+        print(
+            "{:<32} {:>7.2f} {:>9} {:>8} {:>7}".format(
+                report["proxy"],
+                report["health"],
+                report["requests"],
+                report["blocked"],
+                report["errors"],
+            )
+        )
+
+
+def print_memory_report(memory_report: dict):
+    """
+    Prints the parse memory peaks per page type
+    """
+    print(
+        "\n{:<12} {:>6} {:>14} {:>16}".format(
+            "Page", "Pages", "Max page KB", "Max parse KB"
+        )
+    )
+    for page_type, report in sorted(memory_report.items()):
+        print(
+            "{:<12} {:>6} {:>14.0f} {:>16.0f}".format(
+                page_type,
+                report["pages"],
+                report["max_page_bytes"] / 1024,
+                report["max_parse_peak_bytes"] / 1024,
+            )
+        )
 
 
 def main(argv=None):
     argv = sys.argv if argv is None else argv
+
+    # Subcommands, imported only when used
+    if len(argv) > 1 and argv[1] in SUBCOMMANDS:
+        subcommand = importlib.import_module(SUBCOMMANDS[argv[1]], __package__)
+        return subcommand.main(argv[2:])
+
     argparser = argparse.ArgumentParser(
         prog="drbl_py",
         formatter_class=argparse.RawTextHelpFormatter,
@@ -32,6 +108,33 @@ def main(argv=None):
         Download info about a user to a custom JSON file.\n
             $ drbl_py -u JohnDoe -j John\n
 
+        Download only the follower counts of a user.\n
+            $ drbl_py -u JohnDoe -f followers,following\n
+
+        Download info about a list of users with 4 worker processes.\n
+            $ drbl_py -U users.txt -w 4 -o results\n
+
+        Serve scrape jobs from a long running local service.\n
+            $ drbl_py serve --port 8080\n
+
+        Discover users linked from a user, two links deep.\n
+            $ drbl_py crawl -u JohnDoe --depth 2\n
+
+        Scrape usernames claimed from a queue shared by several hosts.\n
+            $ drbl_py worker --queue /shared/jobs.db --sink /shared/results\n
+
+        Print the changes between two batch scrapes.\n
+            $ drbl_py diff yesterday today\n
+
+        Record the counters of a batch scrape for growth curves.\n
+            $ drbl_py history record results\n
+
+        Find scraped shots with a colour close to orange.\n
+            $ drbl_py palette near --color "#ff6600"\n
+
+        Print the tags found most often with a tag across scraped shots.\n
+            $ drbl_py tags related --tag logo\n
+
 
         """,
     )
@@ -69,25 +172,382 @@ def main(argv=None):
         dest="json_file",
     )
 
+    argparser.add_argument(
+        "-s",
+        "--sections",
+        help=textwrap.dedent(
+            """Comma separated sections to scrape.\n{}\nDefault = all sections\n
+            """.format(
+                ", ".join(SECTIONS)
+            )
+        ),
+        dest="sections",
+    )
+
+    argparser.add_argument(
+        "-f",
+        "--fields",
+        help=textwrap.dedent(
+            """Comma separated fields to export.\nOnly the sections holding them are scraped.\nDefault = all fields\n
+            """
+        ),
+        dest="fields",
+    )
+
+    argparser.add_argument(
+        "-U",
+        "--usernames-file",
+        help=textwrap.dedent(
+            """File of usernames to scrape, one per line.\nResults go to --output-dir.\n
+            """
+        ),
+        dest="usernames_file",
+    )
+
+    argparser.add_argument(
+        "-o",
+        "--output-dir",
+        help=textwrap.dedent(
+            """Directory of JSON files for --usernames-file.\nDefault = results\n
+            """
+        ),
+        dest="output_dir",
+        default="results",
+    )
+
+    argparser.add_argument(
+        "-w",
+        "--workers",
+        help=textwrap.dedent(
+            """Worker processes sharing --usernames-file.\nDefault = 1\n
+            """
+        ),
+        dest="workers",
+        type=int,
+        default=1,
+    )
+
+    argparser.add_argument(
+        "--concurrency",
+        help=textwrap.dedent(
+            """Users scraped at the same time, across workers.\nDefault = 4\n
+            """
+        ),
+        dest="concurrency",
+        type=int,
+        default=4,
+    )
+
+    argparser.add_argument(
+        "--max-connections",
+        help=textwrap.dedent(
+            """Requests in flight, across workers.\nDefault = 20\n
+            """
+        ),
+        dest="max_connections",
+        type=int,
+        default=20,
+    )
+
+    argparser.add_argument(
+        "--rate",
+        help=textwrap.dedent(
+            """Requests per second, across workers.\nDefault = no limit\n
+            """
+        ),
+        dest="rate",
+        type=float,
+    )
+
+    argparser.add_argument(
+        "--deadline",
+        help=textwrap.dedent(
+            """Seconds allowed per user, after which the data\nscraped so far is exported.\nDefault = no limit\n
+            """
+        ),
+        dest="deadline",
+        type=float,
+    )
+
+    argparser.add_argument(
+        "--section-deadline",
+        help=textwrap.dedent(
+            """Seconds allowed per section of a user.\nDefault = no limit\n
+            """
+        ),
+        dest="section_deadline",
+        type=float,
+    )
+
+    argparser.add_argument(
+        "--memory-budget",
+        help=textwrap.dedent(
+            """Megabytes of HTML parsed at once, across workers.\nDefault = no limit\n
+            """
+        ),
+        dest="memory_budget",
+        type=float,
+    )
+
+    argparser.add_argument(
+        "--spill-threshold",
+        help=textwrap.dedent(
+            """Megabytes of JSON past which a scraped section\nwaits for export in a temporary file.\nDefault = kept in memory\n
+            """
+        ),
+        dest="spill_threshold",
+        type=float,
+    )
+
+    argparser.add_argument(
+        "--memory-report",
+        help=textwrap.dedent(
+            """Report the parse memory peaks per page type.\n
+            """
+        ),
+        dest="memory_report",
+        action="store_true",
+    )
+
+    argparser.add_argument(
+        "--format",
+        help=textwrap.dedent(
+            """Output data format, unless --json-file has a\ndata extension.\n{}\nDefault = json\n
+            """.format(
+                ", ".join(FORMATS)
+            )
+        ),
+        dest="data_format",
+        choices=FORMATS,
+        default="json",
+    )
+
+    argparser.add_argument(
+        "--compress",
+        help=textwrap.dedent(
+            """Compress the output files.\n{}\nDefault = not compressed\n
+            """.format(
+                ", ".join(COMPRESSIONS)
+            )
+        ),
+        dest="compression",
+        choices=COMPRESSIONS,
+    )
+
+    argparser.add_argument(
+        "--profile",
+        help=textwrap.dedent(
+            """Time the fetch, parse, extract, normalize and export\nphases of a user scrape per page type, writing\nPROFILE.txt, PROFILE.folded and PROFILE.pstats.\n
+            """
+        ),
+        dest="profile",
+        metavar="PROFILE",
+    )
+
+    argparser.add_argument(
+        "--base-url",
+        help=textwrap.dedent(
+            """Site to scrape, e.g. a local synthetic server.\nDefault = https://dribbble.com\n
+            """
+        ),
+        dest="base_url",
+        default="https://dribbble.com",
+    )
+
+    argparser.add_argument(
+        "--listing-concurrency",
+        help=textwrap.dedent(
+            """Shot listing pages of a user fetched at once with -m,\nwhile their shot pages are fetched.\nDefault = 2\n
+            """
+        ),
+        dest="listing_concurrency",
+        type=int,
+        default=2,
+    )
+
+    argparser.add_argument(
+        "--detail-concurrency",
+        help=textwrap.dedent(
+            """Shot pages of a user fetched at once with -m.\nDefault = 4\n
+            """
+        ),
+        dest="detail_concurrency",
+        type=int,
+        default=4,
+    )
+
+    argparser.add_argument(
+        "--proxies",
+        help=textwrap.dedent(
+            """File of egress proxy URLs, one per line, spreading\nrequests across them with rotating header profiles.\n"direct" adds the host itself as an exit.\n
+            """
+        ),
+        dest="proxies_file",
+    )
+
+    argparser.add_argument(
+        "--proxy-rate",
+        help=textwrap.dedent(
+            """Requests per second through every proxy.\nDefault = no limit\n
+            """
+        ),
+        dest="proxy_rate",
+        type=float,
+    )
+
+    argparser.add_argument(
+        "--proxy-cooldown",
+        help=textwrap.dedent(
+            """Seconds a proxy rests after a 429 or a challenge\npage, doubling while it stays blocked.\nDefault = 60\n
+            """
+        ),
+        dest="proxy_cooldown",
+        type=float,
+        default=60,
+    )
+
+    argparser.add_argument(
+        "--no-banner",
+        help=textwrap.dedent(
+            """Do not print the banner.\n
+            """
+        ),
+        dest="no_banner",
+        action="store_true",
+    )
+
     argparser.add_argument("--version", action="version", version="%(prog)s 0.0.1")
-    args = argparser.parse_args()
+    args = argparser.parse_args(argv[1:])
+
+    try:
+        sections = split_csv(args.sections)
+        fields = split_csv(args.fields)
+        plan_sections(sections, fields)
+    except ValueError as ex:
+        argparser.error(str(ex))
+
+    if args.profile and args.usernames_file:
+        argparser.error("--profile profiles the scrape of one user, use -u")
+
+    proxies = None
+    if args.proxies_file:
+        with open(args.proxies_file) as proxies_file:
+            proxies = [line.strip() for line in proxies_file if line.strip()]
+
+    # Memory bounds, given in megabytes
+    memory_budget = megabytes(args.memory_budget)
+    spill_threshold = megabytes(args.spill_threshold)
+
+    if args.usernames_file:
+        from .sharding import run_sharded
+
+        with open(args.usernames_file) as usernames_file:
+            usernames = [line.strip() for line in usernames_file if line.strip()]
+
+        if not args.no_banner:
+            print_banner()
+        try:
+            summary = run_sharded(
+                usernames,
+                args.workers,
+                args.output_dir,
+                concurrency=args.concurrency,
+                max_connections=args.max_connections,
+                rate=args.rate,
+                with_metadata=args.get_metadata,
+                sections=sections,
+                fields=fields,
+                deadline=args.deadline,
+                section_deadline=args.section_deadline,
+                memory_budget=memory_budget,
+                spill_threshold=spill_threshold,
+                memory_report=args.memory_report,
+                data_format=args.data_format,
+                compression=args.compression,
+                base_url=args.base_url,
+                proxies=proxies,
+                proxy_rate=args.proxy_rate,
+                proxy_cooldown=args.proxy_cooldown,
+                listing_concurrency=args.listing_concurrency,
+                detail_concurrency=args.detail_concurrency,
+            )
+            if args.memory_report:
+                print_memory_report(summary["memory"])
+            print(
+                "\n{} scraped, {} partial, {} failed, {} requests in {:0.2f} second(s)...\n".format(
+                    summary["done"],
+                    summary["partial"],
+                    summary["failed"],
+                    summary["requests"],
+                    summary["seconds"],
+                )
+            )
+        except KeyboardInterrupt:
+            print("Exiting dribbble-py...\n")
+            sys.exit(0)
+        return
 
     if args.username:
-        # Set json filename
+        # Set the output filename, its extension chooses the data format
         if args.json_file is None:
-            json_file = args.username + ".json"
+            json_file = output_path(args.username, args.data_format, args.compression)
 
         elif args.json_file:
-            json_file = args.json_file + ".json"
+            json_file = output_path(args.json_file, args.data_format, args.compression)
+
+        t1 = time.perf_counter()
+        if not args.no_banner:
+            print_banner()
+
+        # Scraping dependencies are only imported once they are needed
+        from .dribbble_user import DribbbleUser
+        from .limits import MemoryBudget
+        from .profiling import PhaseProfiler
+        from .proxies import ProxyPool
+
+        if args.memory_report:
+            tracemalloc.start()
+
+        profiler = PhaseProfiler() if args.profile else None
+        proxy_pool = (
+            ProxyPool(proxies, rate=args.proxy_rate, cooldown=args.proxy_cooldown)
+            if proxies
+            else None
+        )
 
-        tprint("DRIBBBLE-PY")
-        print("version {}".format(__version__))
         if args.get_metadata:
             try:
-                dribbble_user = DribbbleUser(args.username, json_file)
-                dribbble_user.check_user()
-                dribbble_user.run_nursery_with_metadata_scraper()
-                dribbble_user.export_to_json()
+                dribbble_user = DribbbleUser(
+                    args.username,
+                    json_file,
+                    sections=sections,
+                    fields=fields,
+                    deadline=args.deadline,
+                    section_deadline=args.section_deadline,
+                    memory_budget=MemoryBudget(memory_budget)
+                    if memory_budget
+                    else None,
+                    spill_threshold=spill_threshold,
+                    profiler=profiler,
+                    base_url=args.base_url,
+                    proxy_pool=proxy_pool,
+                    listing_concurrency=args.listing_concurrency,
+                    detail_concurrency=args.detail_concurrency,
+                )
+                with profiler.run() if profiler else contextlib.nullcontext():
+                    # one event loop, so the limits and the proxy pool are shared
+                    dribbble_user.run_nursery_with_metadata_scraper(find_user=True)
+                    dribbble_user.export_to_json()
+                if args.memory_report:
+                    print_memory_report(dribbble_user.memory_report)
+                if proxy_pool is not None:
+                    print_proxy_report(proxy_pool.report())
+                if profiler is not None:
+                    print(
+                        "\nProfile saved to {}".format(
+                            ", ".join(profiler.write(args.profile))
+                        )
+                    )
 
                 t2 = time.perf_counter()
                 print(f"\nScraping took {t2-t1:0.2f} second(s)...\n")
@@ -96,10 +556,37 @@ def main(argv=None):
                 sys.exit(0)
         else:
             try:
-                dribbble_user = DribbbleUser(args.username, json_file)
-                dribbble_user.check_user()
-                dribbble_user.run_nursery_without_metadata_scraper()
-                dribbble_user.export_to_json()
+                dribbble_user = DribbbleUser(
+                    args.username,
+                    json_file,
+                    sections=sections,
+                    fields=fields,
+                    deadline=args.deadline,
+                    section_deadline=args.section_deadline,
+                    memory_budget=MemoryBudget(memory_budget)
+                    if memory_budget
+                    else None,
+                    spill_threshold=spill_threshold,
+                    profiler=profiler,
+                    base_url=args.base_url,
+                    proxy_pool=proxy_pool,
+                    listing_concurrency=args.listing_concurrency,
+                    detail_concurrency=args.detail_concurrency,
+                )
+                with profiler.run() if profiler else contextlib.nullcontext():
+                    # one event loop, so the limits and the proxy pool are shared
+                    dribbble_user.run_nursery_without_metadata_scraper(find_user=True)
+                    dribbble_user.export_to_json()
+                if args.memory_report:
+                    print_memory_report(dribbble_user.memory_report)
+                if proxy_pool is not None:
+                    print_proxy_report(proxy_pool.report())
+                if profiler is not None:
+                    print(
+                        "\nProfile saved to {}".format(
+                            ", ".join(profiler.write(args.profile))
+                        )
+                    )
 
                 t2 = time.perf_counter()
                 print(f"\nScraping took {t2-t1:0.2f} second(s)...\n")
@@ -0,0 +1,371 @@
+import os
+import sys
+import sqlite3
+import argparse
+import textwrap
+from contextlib import AsyncExitStack
+
+import anyio
+import httpx
+
+from dribbble_py.dribbble_user import DRIBBBLE_URL, DribbbleUser
+from dribbble_py.utils import split_csv, username_from_url
+
+# Sections holding links to other designers
+LINK_SECTIONS = ["main", "members", "collections"]
+
+QUEUED, IN_PROGRESS, DONE, FAILED = range(4)
+
+
+class Frontier:
+    """
+    Deduplicated crawl frontier persisted in a SQLite database.
+
+    Every username ever discovered is kept once, keyed case-insensitively,
+    so the table doubles as the seen-set. It lives on disk and only its
+    B-tree pages are cached in memory, which keeps millions of usernames
+    cheap. Usernames are handed out breadth-first, lowest depth first.
+
+    Arguments:
+        path: string, database file or ":memory:"
+    """
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                key TEXT PRIMARY KEY,
+                username TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                state INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+            """
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (state, depth)"
+        )
+        self.db.commit()
+
+    def add(self, usernames: list, depth: int) -> int:
+        """
+        Queues the usernames which have not been seen before
+
+        Returns:
+            added: int
+        """
+        before = self.db.total_changes
+        self.db.executemany(
+            "INSERT OR IGNORE INTO frontier (key, username, depth) VALUES (?, ?, ?)",
+            [(username.lower(), username, depth) for username in usernames],
+        )
+        self.db.commit()
+        return self.db.total_changes - before
+
+    def seen(self, username: str) -> bool:
+        """
+        Check whether a username was ever added to the frontier
+        """
+        row = self.db.execute(
+            "SELECT 1 FROM frontier WHERE key = ?", (username.lower(),)
+        ).fetchone()
+        return row is not None
+
+    def next_batch(self, size: int, max_depth: int = None) -> list:
+        """
+        Claims up to size queued usernames, lowest depth first
+
+        Returns:
+            [(username, depth), ...]: list
+        """
+        query = "SELECT key, username, depth FROM frontier WHERE state = ?"
+        parameters = [QUEUED]
+        if max_depth is not None:
+            query += " AND depth <= ?"
+            parameters.append(max_depth)
+        query += " ORDER BY depth LIMIT ?"
+        parameters.append(size)
+
+        rows = self.db.execute(query, parameters).fetchall()
+        self.db.executemany(
+            "UPDATE frontier SET state = ? WHERE key = ?",
+            [(IN_PROGRESS, key) for key, _, _ in rows],
+        )
+        self.db.commit()
+        return [(username, depth) for _, username, depth in rows]
+
+    def mark(self, username: str, state: int):
+        """
+        Sets the state of a username
+        """
+        self.db.execute(
+            "UPDATE frontier SET state = ? WHERE key = ?", (state, username.lower())
+        )
+        self.db.commit()
+
+    def requeue_in_progress(self) -> int:
+        """
+        Queues again the usernames left in progress by an interrupted crawl
+
+        Returns:
+            requeued: int
+        """
+        cursor = self.db.execute(
+            "UPDATE frontier SET state = ? WHERE state = ?", (QUEUED, IN_PROGRESS)
+        )
+        self.db.commit()
+        return cursor.rowcount
+
+    def counts(self) -> dict:
+        """
+        Returns the number of usernames in every state
+        """
+        names = {
+            QUEUED: "queued",
+            IN_PROGRESS: "in_progress",
+            DONE: "done",
+            FAILED: "failed",
+        }
+        counts = dict.fromkeys(names.values(), 0)
+        for state, count in self.db.execute(
+            "SELECT state, COUNT(*) FROM frontier GROUP BY state"
+        ):
+            counts[names[state]] = count
+        return counts
+
+    def close(self):
+        self.db.close()
+
+
+def discovered_usernames(dribbble_user_data: dict) -> list:
+    """
+    Returns the usernames linked from the scraped data of a user: the
+    team, the team members and the designers of collected shots
+
+    Arguments:
+        dribbble_user_data: dict
+
+    Returns:
+        usernames: list
+    """
+    urls = [dribbble_user_data.get("team_url")]
+
+    members = dribbble_user_data.get("members") or {}
+    urls.extend(
+        member.get("profile_url")
+        for member in members.values()
+        if isinstance(member, dict)
+    )
+
+    for collection in (dribbble_user_data.get("collections") or {}).values():
+        urls.extend(
+            shot.get("designer_profile_url")
+            for shot in (collection.get("shots") or {}).values()
+        )
+
+    usernames = []
+    for url in urls:
+        username = username_from_url(url)
+        if username and username not in usernames:
+            usernames.append(username)
+    return usernames
+
+
+class Crawler:
+    """
+    Breadth-first crawler over the designer, team and member links of
+    scraped users
+
+    Arguments:
+        frontier: Frontier
+        output_dir: string, directory receiving one JSON file per user
+        max_depth: int, link distance from the seeds to crawl
+        budget: int, maximum number of users to scrape, None for no limit
+        concurrency: int, users scraped at the same time
+        max_connections: int, requests in flight across all users
+        sections: list, sections to scrape besides the link sections
+        base_url: string, site to crawl
+        client: httpx.AsyncClient shared with the host application
+    """
+
+    def __init__(
+        self,
+        frontier: Frontier,
+        output_dir: str,
+        max_depth: int = 1,
+        budget: int = None,
+        concurrency: int = 4,
+        max_connections: int = 20,
+        sections: list = None,
+        base_url: str = DRIBBBLE_URL,
+        client: httpx.AsyncClient = None,
+    ):
+        self.frontier = frontier
+        self.output_dir = output_dir
+        self.max_depth = max_depth
+        self.budget = budget
+        self.concurrency = concurrency
+        self.max_connections = max_connections
+        self.sections = LINK_SECTIONS + [
+            section for section in sections or [] if section not in LINK_SECTIONS
+        ]
+        self.base_url = base_url
+        self.client = client
+
+        self.scraped = 0
+        self.active = 0
+
+    async def crawl_user(self, client, limiter, username: str, depth: int):
+        """
+        Scrapes a user, saves its data and queues the users it links to
+        """
+        try:
+            dribbble_user = DribbbleUser(
+                username,
+                os.path.join(self.output_dir, username + ".json"),
+                sections=self.sections,
+                client=client,
+                limiter=limiter,
+                base_url=self.base_url,
+            )
+            await dribbble_user.scrape_user_pages_without_metadata_nursery()
+            dribbble_user.export_to_json()
+
+            if depth < self.max_depth:
+                added = self.frontier.add(
+                    discovered_usernames(dribbble_user.dribbble_user_data), depth + 1
+                )
+                print("✓ {} crawled, {} new users found".format(username, added))
+            self.frontier.mark(username, DONE)
+
+        except Exception as ex:
+            print("✗ {} failed: {}".format(username, ex))
+            self.frontier.mark(username, FAILED)
+
+        finally:
+            self.active -= 1
+            self.progress.set()
+
+    async def crawl(self, seeds: list = None):
+        """
+        Crawls from the seeds and from the users left in the frontier by
+        a previous crawl until the frontier, the depth or the budget is
+        exhausted
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.frontier.requeue_in_progress()
+        self.frontier.add(seeds or [], 0)
+
+        limiter = anyio.CapacityLimiter(self.max_connections)
+        async with AsyncExitStack() as stack:
+            client = self.client or await stack.enter_async_context(httpx.AsyncClient())
+            nursery = await stack.enter_async_context(anyio.create_task_group())
+            while True:
+                self.progress = anyio.Event()
+
+                free_slots = self.concurrency - self.active
+                if self.budget is not None:
+                    free_slots = min(free_slots, self.budget - self.scraped)
+
+                batch = self.frontier.next_batch(free_slots, self.max_depth)
+                for username, depth in batch:
+                    self.active += 1
+                    self.scraped += 1
+                    nursery.start_soon(
+                        self.crawl_user, client, limiter, username, depth
+                    )
+
+                if self.active == 0:
+                    break
+                await self.progress.wait()
+
+        return self.frontier.counts()
+
+
+def main(argv=None):
+    argv = sys.argv[2:] if argv is None else argv
+    argparser = argparse.ArgumentParser(
+        prog="drbl_py crawl",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description=textwrap.dedent(
+            """
+            Discover dribbble users by following team, member and designer links\n
+             """
+        ),
+        epilog="""
+        Example usage
+        -------------\n
+        Crawl two links away from a user.\n
+            $ drbl_py crawl -u JohnDoe --depth 2\n
+
+        Resume an interrupted crawl.\n
+            $ drbl_py crawl --frontier crawl.db\n
+        """,
+    )
+    argparser.add_argument(
+        "-u",
+        "--usernames",
+        help="Comma separated usernames to start from.\n",
+        dest="usernames",
+    )
+    argparser.add_argument(
+        "--depth",
+        type=int,
+        default=1,
+        help="Link distance from the seeds to crawl.\nDefault = 1\n",
+    )
+    argparser.add_argument(
+        "--budget",
+        type=int,
+        help="Maximum number of users to scrape in this run.\n",
+    )
+    argparser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Users scraped at the same time.\nDefault = 4\n",
+    )
+    argparser.add_argument(
+        "--max-connections",
+        dest="max_connections",
+        type=int,
+        default=20,
+        help="Requests in flight across all users.\nDefault = 20\n",
+    )
+    argparser.add_argument(
+        "--frontier",
+        default="crawl.db",
+        help="Frontier database, reused to resume a crawl.\nDefault = crawl.db\n",
+    )
+    argparser.add_argument(
+        "--output-dir",
+        dest="output_dir",
+        default="crawl",
+        help="Directory receiving one JSON file per user.\nDefault = crawl\n",
+    )
+    argparser.add_argument(
+        "-s",
+        "--sections",
+        help="Comma separated sections to scrape besides\nmain, members and collections.\n",
+        dest="sections",
+    )
+    args = argparser.parse_args(argv)
+
+    frontier = Frontier(args.frontier)
+    crawler = Crawler(
+        frontier,
+        args.output_dir,
+        max_depth=args.depth,
+        budget=args.budget,
+        concurrency=args.concurrency,
+        max_connections=args.max_connections,
+        sections=split_csv(args.sections),
+    )
+    try:
+        counts = anyio.run(crawler.crawl, split_csv(args.usernames), backend="trio")
+        print("\nFrontier: {}".format(counts))
+    except KeyboardInterrupt:
+        print("Exiting dribbble-py...\n")
+        sys.exit(0)
+    finally:
+        frontier.close()
@@ -0,0 +1,307 @@
+import os
+import sys
+import json
+import argparse
+import textwrap
+
+from dribbble_py.serialization import data_files, load, split_extension
+from dribbble_py.utils import shot_id_from_url
+
+# Shot metadata fields compared between snapshots
+SHOT_STATS = {"likes": "likes", "views": "views_count", "saves": "saves_count"}
+USER_STATS = ("followers", "following")
+
+# Fields compared between snapshots, by the section they are scraped from
+DIFF_SECTIONS = {
+    "about": USER_STATS,
+    "shots": ("shots",),
+    "collections": ("collections",),
+    "members": ("members",),
+}
+
+
+def build_index(dribbble_user_data: dict) -> dict:
+    """
+    Reduces the data of a user to the values compared between snapshots,
+    keyed by stable IDs: shot id, collection URL and member username.
+    The status of every compared section is kept under sections:
+    missing when the section was not scraped, else its section_status,
+    complete for snapshots without one.
+
+    Arguments:
+        dribbble_user_data: dict
+
+    Returns:
+        index: dict
+    """
+    section_status = dribbble_user_data.get("section_status") or {}
+    index = {
+        "sections": {
+            section: section_status.get(section, "complete")
+            if any(field in dribbble_user_data for field in fields)
+            else "missing"
+            for section, fields in DIFF_SECTIONS.items()
+        }
+    }
+    index.update({stat: dribbble_user_data.get(stat) for stat in USER_STATS})
+
+    index["shots"] = {}
+    for shot_key, shot in (
+        (dribbble_user_data.get("shots") or {}).get("shots") or {}
+    ).items():
+        # shots of older snapshots are keyed by title
+        metadata = shot.get("metadata") or {}
+        index["shots"][shot_id_from_url(shot.get("shot_url"))] = {
+            "title": shot.get("title", shot_key),
+            **{stat: metadata.get(field) for stat, field in SHOT_STATS.items()},
+        }
+
+    index["collections"] = {
+        collection["collection_url"]: collection_name
+        for collection_name, collection in (
+            dribbble_user_data.get("collections") or {}
+        ).items()
+        if isinstance(collection, dict) and collection.get("collection_url")
+    }
+
+    index["members"] = sorted(
+        member_username
+        for member_username, member in (dribbble_user_data.get("members") or {}).items()
+        if isinstance(member, dict)
+    )
+    return index
+
+
+def diff_indexes(username: str, old_index: dict, new_index: dict):
+    """
+    Compares the indexes of two snapshots of a user. Only the sections
+    complete in both snapshots are compared, the others are reported in a
+    sections_skipped change with their status in either snapshot.
+
+    Arguments:
+        username: string
+        old_index: dict, None when the user is new
+        new_index: dict, None when the user was removed
+
+    Returns:
+        changes: generator of dicts
+    """
+    if old_index is None:
+        yield {"username": username, "change": "user_added"}
+        return
+    if new_index is None:
+        yield {"username": username, "change": "user_removed"}
+        return
+
+    # a section missing from a snapshot, or cut short by a deadline, would
+    # read as removals, so only sections complete in both are compared
+    old_sections, new_sections = old_index["sections"], new_index["sections"]
+    skipped = {
+        section: {"old": old_sections[section], "new": new_sections[section]}
+        for section in DIFF_SECTIONS
+        if not old_sections[section] == new_sections[section] == "complete"
+        and not old_sections[section] == new_sections[section] == "missing"
+    }
+    if skipped:
+        yield {"username": username, "change": "sections_skipped", **skipped}
+
+    def compared(section):
+        return old_sections[section] == new_sections[section] == "complete"
+
+    # follower changes
+    stats = {}
+    for stat in USER_STATS if compared("about") else ():
+        old_value, new_value = old_index.get(stat), new_index.get(stat)
+        if old_value != new_value and None not in (old_value, new_value):
+            stats[stat] = {"old": old_value, "new": new_value}
+    if stats:
+        yield {"username": username, "change": "user_stats", **stats}
+
+    # added, removed and changed shots
+    if compared("shots"):
+        yield from diff_shots(username, old_index["shots"], new_index["shots"])
+
+    # added and removed collections
+    if compared("collections"):
+        old_collections, new_collections = (
+            old_index["collections"],
+            new_index["collections"],
+        )
+        for collection_url, collection_name in new_collections.items():
+            if collection_url not in old_collections:
+                yield {
+                    "username": username,
+                    "change": "collection_added",
+                    "collection_url": collection_url,
+                    "name": collection_name,
+                }
+        for collection_url, collection_name in old_collections.items():
+            if collection_url not in new_collections:
+                yield {
+                    "username": username,
+                    "change": "collection_removed",
+                    "collection_url": collection_url,
+                    "name": collection_name,
+                }
+
+    # joined and left members
+    if compared("members"):
+        old_members = set(old_index["members"])
+        new_members = set(new_index["members"])
+        for member_username in sorted(new_members - old_members):
+            yield {
+                "username": username,
+                "change": "member_added",
+                "member": member_username,
+            }
+        for member_username in sorted(old_members - new_members):
+            yield {
+                "username": username,
+                "change": "member_removed",
+                "member": member_username,
+            }
+
+
+def diff_shots(username: str, old_shots: dict, new_shots: dict):
+    """
+    Compares the shots of two snapshots of a user
+
+    Arguments:
+        username: string
+        old_shots: dict, {shot_id: shot index}
+        new_shots: dict, {shot_id: shot index}
+
+    Returns:
+        changes: generator of dicts
+    """
+    for shot_id, shot in new_shots.items():
+        if shot_id not in old_shots:
+            yield {
+                "username": username,
+                "change": "shot_added",
+                "shot_id": shot_id,
+                "title": shot["title"],
+            }
+            continue
+
+        deltas = {
+            stat: shot[stat] - old_shots[shot_id][stat]
+            for stat in SHOT_STATS
+            if None not in (shot[stat], old_shots[shot_id][stat])
+            and shot[stat] != old_shots[shot_id][stat]
+        }
+        if deltas:
+            yield {
+                "username": username,
+                "change": "shot_stats",
+                "shot_id": shot_id,
+                "title": shot["title"],
+                **deltas,
+            }
+
+    for shot_id, shot in old_shots.items():
+        if shot_id not in new_shots:
+            yield {
+                "username": username,
+                "change": "shot_removed",
+                "shot_id": shot_id,
+                "title": shot["title"],
+            }
+
+
+def snapshot_files(path: str) -> dict:
+    """
+    Lists the user files of a snapshot, either a single data file or a
+    directory of user data files as written by batch scrapes, in any
+    format and compression
+
+    Arguments:
+        path: string
+
+    Returns:
+        {username: file_path}: dict
+    """
+    if not os.path.isdir(path):
+        return {split_extension(os.path.basename(path))[0]: path}
+
+    user_files = data_files(path)
+    user_files.pop("summary", None)
+    return user_files
+
+
+def load_index(file_path: str) -> dict:
+    """
+    Loads a whole user file and reduces it to its index. The file is
+    decoded at once, not streamed: only the index outlives the call, but
+    the full data of the user is held while it is built.
+    """
+    if file_path is None:
+        return None
+    return build_index(load(file_path))
+
+
+def diff_snapshots(old_path: str, new_path: str):
+    """
+    Yields the changes between two snapshots, one user at a time. The
+    files of a user are loaded whole and reduced to their indexes before
+    the next user is read, so memory grows with the largest user rather
+    than with the snapshot. Two single files are compared as the same
+    user, whatever their names.
+
+    Arguments:
+        old_path: string, file or directory
+        new_path: string, file or directory
+
+    Returns:
+        changes: generator of dicts
+    """
+    old_files, new_files = snapshot_files(old_path), snapshot_files(new_path)
+    if not os.path.isdir(old_path) and not os.path.isdir(new_path):
+        old_files = {username: old_path for username in new_files}
+
+    for username in sorted(old_files.keys() | new_files.keys()):
+        yield from diff_indexes(
+            username,
+            load_index(old_files.get(username)),
+            load_index(new_files.get(username)),
+        )
+
+
+def main(argv=None):
+    argv = sys.argv[2:] if argv is None else argv
+    argparser = argparse.ArgumentParser(
+        prog="drbl_py diff",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description=textwrap.dedent(
+            """
+            Compare two scrapes and print a feed of changes as JSON lines\n
+            Users are compared one at a time, each user file is loaded whole.
+             """
+        ),
+        epilog="""
+        Example usage
+        -------------\n
+        Compare two scrapes of a user.\n
+            $ drbl_py diff yesterday/JohnDoe.json today/JohnDoe.json\n
+
+        Compare two batch scrapes into a change feed.\n
+            $ drbl_py diff yesterday today -o changes.jsonl\n
+        """,
+    )
+    argparser.add_argument("old", help="Older user file or directory.\n")
+    argparser.add_argument("new", help="Newer user file or directory.\n")
+    argparser.add_argument(
+        "-o",
+        "--output",
+        help="File receiving the change feed.\nDefault = standard output\n",
+        dest="output",
+    )
+    args = argparser.parse_args(argv)
+
+    feed = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for change in diff_snapshots(args.old, args.new):
+            feed.write(json.dumps(change) + "\n")
+    finally:
+        if args.output:
+            feed.close()
@@ -1,19 +1,57 @@
 import chompjs
-import re
 import json
-import trio
+import anyio
 import httpx
-from datetime import datetime
 from bs4 import BeautifulSoup
+from lxml import etree
 import sys
+import shutil
+import tempfile
+import tracemalloc
+from contextlib import asynccontextmanager, AsyncExitStack, nullcontext
+from datetime import datetime, timezone
+from dribbble_py.limits import MemoryBudget, RateLimiter, RequestScheduler
+from dribbble_py.proxies import ProxyPool, is_challenge_page, retry_after
+from dribbble_py.sections import FIELD_SECTIONS, SHOT_SECTIONS, plan_sections
 from dribbble_py.silent_selector import SilentSelector
-from dribbble_py.utils import int_k, get_redirect_url, string_to_number
+from dribbble_py.normalize import (
+    SCRAPED_AT_FORMAT,
+    Normalizer,
+    parse_count,
+    date_parser,
+)
+from dribbble_py.profiling import PhaseProfiler
+from dribbble_py.serialization import (
+    compressed_writer,
+    dumps,
+    json_dumps,
+    split_extension,
+    write_text,
+)
+from dribbble_py.utils import (
+    aclosing,
+    element_soup,
+    profile_redirect_url,
+    shot_id_from_url,
+)
 
 sys.path.append("../dribbble_py")
 
 
 DRIBBBLE_URL = "https://dribbble.com"
 
+# Redirects followed from a social link to the profile it points to
+MAX_REDIRECTS = 20
+
+
+def is_full_page(chunk: bytes) -> bool:
+    """
+    Check whether the first chunk of a response starts a full HTML page
+    rather than a fragment
+    """
+    head = chunk[:1024].lstrip().lower()
+    return head.startswith(b"<!doctype") or b"<html" in head
+
 
 class DribbbleUser:
     """
@@ -22,11 +60,110 @@ class DribbbleUser:
     Arguments:
         username: string
         json_file: string
+        sections: list
+        fields: list
+        client: httpx.AsyncClient shared with the host application
+        limiter: anyio.CapacityLimiter bounding concurrent requests
+        rate_limiter: RateLimiter bounding requests per second
+        scheduler: RequestScheduler sharing connection slots between
+            priority classes, used instead of limiter when given
+        priority: string, scheduler class of the requests of this user
+        deadline: float, seconds after which the scrape stops and keeps
+            the data scraped so far
+        section_deadline: float, seconds after which a section stops
+        memory_budget: MemoryBudget bounding the HTML parsed at once
+        spill_threshold: int, bytes of JSON past which a scraped section
+            is moved to a temporary file until it is exported; sections
+            holding shot metadata once every section finished
+        profiler: PhaseProfiler timing the fetch, parse, extract, normalize
+            and export phases of every page type
+        fragments: bool, request listing pages as the list fragments loaded
+            by infinite scroll, falling back to full pages
+        base_url: string, site to scrape, e.g. a local synthetic server
+        proxy_pool: ProxyPool spreading the requests across egress proxies
+            with rotating header profiles, instead of the client
+        listing_concurrency: int, listing pages of shot pipelines fetched
+            at once
+        detail_concurrency: int, shot pages fetched at once
+        pipeline_buffer: int, listed shots waiting for a detail worker
+            before the listing stage waits
+        backend: string, anyio backend used by the run_* methods
 
     """
 
-    def __init__(self, username: str, json_file: str):
+    def __init__(
+        self,
+        username: str,
+        json_file: str,
+        sections: list = None,
+        fields: list = None,
+        client: httpx.AsyncClient = None,
+        limiter: anyio.CapacityLimiter = None,
+        rate_limiter: RateLimiter = None,
+        scheduler: RequestScheduler = None,
+        priority: str = "bulk",
+        deadline: float = None,
+        section_deadline: float = None,
+        memory_budget: MemoryBudget = None,
+        spill_threshold: int = None,
+        profiler: PhaseProfiler = None,
+        fragments: bool = True,
+        base_url: str = DRIBBBLE_URL,
+        proxy_pool: ProxyPool = None,
+        listing_concurrency: int = 2,
+        detail_concurrency: int = 4,
+        pipeline_buffer: int = 16,
+        backend: str = "trio",
+    ):
         self.username = username
+        self.base_url = base_url.rstrip("/")
+
+        # HTTP client and request limits, owned by the caller when given
+        self.host_client = client
+        self.client = client
+        self.limiter = limiter
+        self.rate_limiter = rate_limiter
+        self.scheduler = scheduler
+        self.priority = priority
+        self.proxy_pool = proxy_pool
+        self.requests_made = 0
+        self.bytes_downloaded = 0
+        self.backend = backend
+
+        # Time budgets, and the completeness of every scraped section
+        self.deadline = deadline
+        self.section_deadline = section_deadline
+        self.section_status = {}
+        self.scraper_sections = {}
+
+        # Memory bounds, and the parse peaks per page type while
+        # tracemalloc is tracing
+        self.memory_budget = memory_budget
+        self.spill_threshold = spill_threshold
+        self.spilled = {}
+        self.memory_report = {}
+
+        # Time per phase and page type, when profiling
+        self.profiler = profiler
+
+        # Pages whose data ends before a marker are read up to the marker,
+        # any page at most up to max_page_bytes of decoded HTML
+        self.page_end_markers = {"main": ("shot-thumbnail",)}
+        self.max_page_bytes = 8 * 1024 * 1024
+
+        # Listings are requested like infinite scroll does, which returns
+        # only the list items; whether it worked is kept per listing type
+        self.fragments = fragments
+        self.fragment_support = {}
+
+        # Throttled listing pages are requested again after their
+        # Retry-After, or after a backoff doubling with every attempt
+        self.throttle_retries = 3
+        self.throttle_backoff = 1.0
+
+        # Sections to scrape and fields to export
+        self.sections = plan_sections(sections, fields)
+        self.fields = list(fields) if fields else None
 
         # Set JSON file name
         if json_file is None:
@@ -37,8 +174,23 @@ class DribbbleUser:
 
         self.join_date_format = "%b %Y"
         self.shot_published_date_format = "%b %d, %Y"
+        self.project_date_format = "%B %d, %Y"
         self.preferred_time_format = "%Y-%m-%d"
 
+        # Converts extracted strings, collecting the fields which fail
+        self.normalizer = Normalizer(profiler)
+
+        # Metadata of the shots fetched in this run, by shot id
+        self.shot_registry = {}
+
+        # Shot pipelines, fetching shot pages while their listing is read,
+        # and their shot counts and channel depths per section
+        self.listing_concurrency = listing_concurrency
+        self.detail_concurrency = detail_concurrency
+        self.pipeline_buffer = pipeline_buffer
+        self.stage_limiters = {}
+        self.pipeline_report = {}
+
         self.shots_per_page = 8
         self.project_shots_per_page = 8
         self.members_per_page = 6
@@ -46,6 +198,11 @@ class DribbbleUser:
         self.scraper_header = {
             "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/97.0.4690.0 Safari/537.36/QInxREvS-38"
         }
+        self.fragment_header = {
+            **self.scraper_header,
+            "x-requested-with": "XMLHttpRequest",
+            "accept": "text/html, */*",
+        }
         # Construct URLs for various pages
         self.user_pages = {
             "main": "/",
@@ -58,17 +215,365 @@ class DribbbleUser:
         }
 
         self.user_pages = {
-            key: DRIBBBLE_URL + "/" + self.username + value
+            key: self.base_url + "/" + self.username + value
             for key, value in self.user_pages.items()
         }
 
+    @asynccontextmanager
+    async def open_client(self):
+        """
+        Yields the shared HTTP client, or a new one closed on exit when
+        no client is shared
+        """
+        if self.client is not None:
+            yield self.client
+        else:
+            async with httpx.AsyncClient() as client:
+                yield client
+
+    def open_stream(self, client: httpx.AsyncClient, url: str, headers: dict):
+        """
+        Returns the context streaming a GET request, through the proxy pool
+        when there is one
+        """
+        if self.proxy_pool is not None:
+            return self.proxy_pool.stream(url, headers)
+        return client.stream("GET", url, headers=headers)
+
+    def check_challenge(self, response: httpx.Response, chunk: bytes):
+        """
+        Cools down the proxy of a response whose body is a challenge page
+        """
+        if self.proxy_pool is not None and is_challenge_page(chunk):
+            print(f"\nChallenge page served for {str(response.url)!r}.")
+            self.proxy_pool.penalize(response)
+
+    async def get_page(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        until: tuple = None,
+        page_type: str = "page",
+    ) -> httpx.Response:
+        """
+        Requests a page with the scraper headers, within the request limits
+
+        Arguments:
+            client: httpx.AsyncClient
+            url: string
+            until: tuple of markers, the body is read until all of them
+                were seen
+            page_type: string, reported by the profiler
+
+        Returns:
+            response: httpx.Response
+        """
+        with self.profile("fetch", page_type):
+            async with self.request_slot():
+                return await self.read_page(client, url, until)
+
+    def profile(self, phase: str, page_type: str):
+        """
+        Returns a context timing a phase of a page type when profiling
+        """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.phase(phase, page_type)
+
+    @asynccontextmanager
+    async def request_slot(self):
+        """
+        Waits for the request limits, holding a connection slot while the
+        request runs
+        """
+        self.requests_made += 1
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+
+        if self.scheduler is not None:
+            async with self.scheduler.slot(self.priority, self.username):
+                yield
+        elif self.limiter is None:
+            yield
+        else:
+            async with self.limiter:
+                yield
+
+    async def get_redirect_url(
+        self, client: httpx.AsyncClient, url: str, page_type: str = "redirect"
+    ) -> list:
+        """
+        Follows the redirects of a URL within the request limits and
+        through the proxy pool, without reading the response bodies
+
+        Arguments:
+            client: httpx.AsyncClient
+            url: string
+            page_type: string, reported by the profiler
+
+        Returns:
+            [redirected_url, response_site]: list
+        """
+        history_urls = [url]
+        for _ in range(MAX_REDIRECTS):
+            with self.profile("fetch", page_type):
+                async with self.request_slot():
+                    async with self.open_stream(
+                        client, url, self.scraper_header
+                    ) as response:
+                        if not response.is_redirect:
+                            break
+                        url = str(response.url.join(response.headers["location"]))
+            history_urls.append(url)
+
+        return [profile_redirect_url(history_urls), httpx.URL(url).host]
+
+    async def read_page(
+        self, client: httpx.AsyncClient, url: str, until: tuple = None
+    ) -> httpx.Response:
+        """
+        Streams a page body, closing the connection early once the markers
+        were seen or max_page_bytes were read. Compressed transfer is
+        negotiated by the client.
+        """
+        pending = [marker.encode() for marker in until or ()]
+        body = bytearray()
+
+        async with self.open_stream(client, url, self.scraper_header) as response:
+            async with aclosing(response.aiter_bytes()) as chunks:
+                async for chunk in chunks:
+                    # markers may straddle two chunks
+                    search_from = max(0, len(body) - max(map(len, pending), default=0))
+                    body += chunk
+                    pending = [
+                        marker
+                        for marker in pending
+                        if body.find(marker, search_from) < 0
+                    ]
+
+                    if until and not pending:
+                        break
+                    if len(body) >= self.max_page_bytes:
+                        print(
+                            f"\nResponse of {url!r} truncated to {self.max_page_bytes} bytes."
+                        )
+                        break
+
+            self.bytes_downloaded += response.num_bytes_downloaded
+            self.check_challenge(response, bytes(body[:8192]))
+
+        # the body is already decoded, only its charset is kept
+        return httpx.Response(
+            response.status_code,
+            headers={"content-type": response.headers.get("content-type", "text/html")},
+            content=bytes(body),
+            request=response.request,
+        )
+
+    @asynccontextmanager
+    async def open_soup(self, page: httpx.Response, page_type: str):
+        """
+        Parses a page within the memory budget, and frees its tree as soon
+        as the extraction is done
+
+        Arguments:
+            page: httpx.Response
+            page_type: string, reported in memory_report
+
+        Yields:
+            page_soup: BeautifulSoup
+        """
+        page_size = len(page.content)
+        if self.memory_budget is None:
+            hold = AsyncExitStack()
+        else:
+            hold = self.memory_budget.hold(page_size)
+
+        async with hold:
+            # the parse runs without yielding to other tasks, so the peak
+            # traced while it runs is its own; reset_peak needs Python 3.9
+            tracing = tracemalloc.is_tracing()
+            if tracing:
+                traced_before = tracemalloc.get_traced_memory()[0]
+                if hasattr(tracemalloc, "reset_peak"):
+                    tracemalloc.reset_peak()
+
+            with self.profile("parse", page_type):
+                page_soup = BeautifulSoup(page.text, "lxml")
+
+            if tracing:
+                traced_after, traced_peak = tracemalloc.get_traced_memory()
+                if not hasattr(tracemalloc, "reset_peak"):
+                    traced_peak = traced_after
+                self.record_memory(page_type, page_size, traced_peak - traced_before)
+            try:
+                with self.profile("extract", page_type):
+                    yield page_soup
+            finally:
+                page_soup.decompose()
+
+    def record_memory(self, page_type: str, page_size: int, parse_peak: int):
+        """
+        Adds a parsed page to the memory report of its page type
+        """
+        report = self.memory_report.setdefault(
+            page_type, {"pages": 0, "max_page_bytes": 0, "max_parse_peak_bytes": 0}
+        )
+        report["pages"] += 1
+        report["max_page_bytes"] = max(report["max_page_bytes"], page_size)
+        report["max_parse_peak_bytes"] = max(report["max_parse_peak_bytes"], parse_peak)
+
+    async def read_listing(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        item_tag: str,
+        item_class: str,
+        parser,
+        page_type: str = "listing",
+        items: list = None,
+    ) -> list:
+        """
+        Reads a listing page within the request limits, parsing every item
+        as soon as its closing tag arrives
+
+        Arguments:
+            client: httpx.AsyncClient
+            url: string
+            item_tag: string
+            item_class: string
+            parser: callable returning (key, item) for an item soup
+            page_type: string, reported by the profiler
+            items: list the items are added to as they are parsed, which
+                keeps them when the read is cancelled
+
+        Returns:
+            [(key, item), ...]: list
+        """
+        items = [] if items is None else items
+        read_bytes = 0
+        async with AsyncExitStack() as stack:
+            # the time spent parsing between chunks is not fetch time
+            with self.profile("fetch", page_type):
+                await stack.enter_async_context(self.request_slot())
+                response = await self.open_listing(stack, client, url, page_type)
+            detect_fragment = page_type not in self.fragment_support
+            html_parser = etree.HTMLPullParser(
+                events=("end",),
+                tag=item_tag,
+                encoding=response.charset_encoding or "utf-8",
+            )
+            chunks = await stack.enter_async_context(aclosing(response.aiter_bytes()))
+            while True:
+                with self.profile("fetch", page_type):
+                    try:
+                        chunk = await chunks.__anext__()
+                    except StopAsyncIteration:
+                        break
+
+                if detect_fragment and response.request.headers.get("x-requested-with"):
+                    self.fragment_support[page_type] = not is_full_page(chunk)
+                if read_bytes == 0:
+                    self.check_challenge(response, chunk)
+                detect_fragment = False
+
+                with self.profile("parse", page_type):
+                    html_parser.feed(chunk)
+                read_bytes += len(chunk)
+                items += self.closed_items(html_parser, item_class, parser, page_type)
+
+                if read_bytes >= self.max_page_bytes:
+                    print(
+                        f"\nResponse of {url!r} truncated to {self.max_page_bytes} bytes."
+                    )
+                    break
+
+            self.bytes_downloaded += response.num_bytes_downloaded
+
+        # an empty body, like the fragment of an empty page, has no document
+        if read_bytes:
+            with self.profile("parse", page_type):
+                html_parser.close()
+            items += self.closed_items(html_parser, item_class, parser, page_type)
+        return items
+
+    async def open_listing(
+        self, stack: AsyncExitStack, client: httpx.AsyncClient, url: str, page_type
+    ) -> httpx.Response:
+        """
+        Opens the response of a listing page on stack, requesting only its
+        list fragment unless fragments failed for the listing type. A
+        refused fragment request is retried as a full page request, a
+        throttled one after a backoff. A listing still throttled once the
+        retries ran out raises httpx.HTTPStatusError.
+        """
+        for attempt in range(self.throttle_retries + 1):
+            if self.fragments and self.fragment_support.get(page_type, True):
+                response = await stack.enter_async_context(
+                    self.open_stream(client, url, self.fragment_header)
+                )
+                # throttling says nothing about fragments
+                if response.is_error and response.status_code != 429:
+                    self.fragment_support[page_type] = False
+                    await response.aclose()
+                    response = None
+            else:
+                response = None
+
+            if response is None:
+                response = await stack.enter_async_context(
+                    self.open_stream(client, url, self.scraper_header)
+                )
+            if response.status_code != 429:
+                return response
+
+            await response.aclose()
+            if attempt < self.throttle_retries:
+                await anyio.sleep(
+                    max(retry_after(response), self.throttle_backoff * 2**attempt)
+                )
+
+        response.raise_for_status()
+
+    def closed_items(
+        self, html_parser, item_class: str, parser, page_type: str = "listing"
+    ) -> list:
+        """
+        Parses the items closed since the last call of a pull parser,
+        dropping them from its tree afterwards
+        """
+        items = []
+        for _, element in html_parser.read_events():
+            if item_class not in element.get("class", "").split():
+                continue
+
+            # the soup is copied from the parsed element, not parsed again
+            with self.profile("parse", page_type):
+                item_soup = element_soup(element)
+            with self.profile("extract", page_type):
+                items.append(parser(item_soup))
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        return items
+
     def check_user(self) -> bool:
         """
         Check whether a dribbble user exists or not
         """
+        anyio.run(self.find_user, backend=self.backend)
+
+    async def find_user(self):
+        """
+        Check whether a dribbble user exists or not, within the request
+        limits and through the proxy pool
+        """
         try:
             print("\n🔍 Searching for user " + self.username + "...\n")
-            user_page = httpx.get(self.user_pages["main"])
+            async with self.open_session() as client:
+                user_page = await self.get_page(
+                    client, self.user_pages["main"], page_type="main"
+                )
             user_page_soup = BeautifulSoup(user_page.text, "lxml")
 
             sselect = SilentSelector(user_page_soup)
@@ -93,132 +598,257 @@ class DribbbleUser:
                 f"\nError response {ex.response.status_code} while requesting {ex.request.url!r}."
             )
 
-    async def scrape_user_pages_with_metadata_nursery(self):
+    def planned_scrapers(self, with_metadata: bool) -> list:
         """
-        Scrape all available dribbble user pages with trio nursery
+        Returns the scraper coroutines of the planned sections
+
+        Arguments:
+            with_metadata: bool
+
+        Returns:
+            scrapers: list
         """
-        async with trio.open_nursery() as nursery:
-            nursery.start_soon(self.scrape_main_page)
-            nursery.start_soon(self.scrape_about_page)
-            nursery.start_soon(self.scrape_projects_page)
-            nursery.start_soon(self.scrape_goods_page)
-            nursery.start_soon(self.scrape_members_page)
-            nursery.start_soon(self.scrape_collections_page)
-            nursery.start_soon(self.scrape_shots_with_metadata_page)
+        scrapers = {
+            "main": self.scrape_main_page,
+            "about": self.scrape_about_page,
+            "projects": self.scrape_projects_page,
+            "goods": self.scrape_goods_page,
+            "members": self.scrape_members_page,
+            "collections": self.scrape_collections_page,
+            "shots": self.scrape_shots_with_metadata_page
+            if with_metadata
+            else self.scrape_shots_without_metadata_page,
+        }
+        self.scraper_sections.update(
+            (scrapers[section], section) for section in self.sections
+        )
+        return [scrapers[section] for section in self.sections]
 
-    def run_nursery_with_metadata_scraper(self):
+    @asynccontextmanager
+    async def open_session(self):
         """
-        Run the trio nursery for scraping pages of a dribbble user
+        Yields the HTTP client shared by all requests until exit, with the
+        proxy pool open when there is one
         """
-        trio.run(self.scrape_user_pages_with_metadata_nursery)
+        async with AsyncExitStack() as stack:
+            client = await stack.enter_async_context(self.open_client())
+            if self.proxy_pool is not None:
+                await stack.enter_async_context(self.proxy_pool)
+            self.client = client
+            try:
+                yield client
+            finally:
+                self.client = self.host_client
 
-    async def scrape_user_pages_without_metadata_nursery(self):
+    async def run_scrapers(self, scrapers: list):
         """
-        Scrape all available dribbble user pages with trio nursery
+        Runs scrapers concurrently in an anyio task group, sharing one
+        HTTP client between all of their requests
+
+        Arguments:
+            scrapers: list
         """
-        async with trio.open_nursery() as nursery:
-            nursery.start_soon(self.scrape_main_page)
-            nursery.start_soon(self.scrape_about_page)
-            nursery.start_soon(self.scrape_projects_page)
-            nursery.start_soon(self.scrape_goods_page)
-            nursery.start_soon(self.scrape_members_page)
-            nursery.start_soon(self.scrape_collections_page)
-            nursery.start_soon(self.scrape_shots_without_metadata_page)
+        self.dribbble_user_data["scraped_at"] = datetime.now(timezone.utc).strftime(
+            SCRAPED_AT_FORMAT
+        )
+        async with self.open_session():
+            with anyio.move_on_after(self.deadline):
+                async with anyio.create_task_group() as nursery:
+                    for scraper in scrapers:
+                        nursery.start_soon(self.run_section, scraper)
+        self.link_shot_metadata()
+
+        # sections holding shot metadata are spilled once all of it arrived
+        if self.spill_threshold is not None:
+            for section in SHOT_SECTIONS:
+                self.spill_section(section)
+
+    async def run_section(self, scraper):
+        """
+        Runs the scraper of a section within the section deadline, and
+        records whether the section is complete, partial or timed out
+        """
+        section = self.scraper_sections.get(scraper, scraper.__name__)
+        completed = False
+        try:
+            with anyio.move_on_after(self.section_deadline):
+                await scraper()
+                completed = True
+        finally:
+            if completed:
+                self.section_status[section] = "complete"
+            elif self.has_section_data(section):
+                self.section_status[section] = "partial"
+            else:
+                self.section_status[section] = "timed_out"
+
+            if self.spill_threshold is not None and section not in SHOT_SECTIONS:
+                self.spill_section(section)
+
+    def spill_section(self, section: str):
+        """
+        Moves the fields of a scraped section that encode to more than
+        spill_threshold bytes of JSON to temporary files
+        """
+        for field, field_section in FIELD_SECTIONS.items():
+            if field_section != section or field not in self.dribbble_user_data:
+                continue
+
+            encoded_field = json_dumps(self.dribbble_user_data[field])
+            if len(encoded_field) < self.spill_threshold:
+                continue
+
+            spill_file = tempfile.TemporaryFile("w+", encoding="utf-8")
+            spill_file.write(encoded_field)
+            self.spilled[field] = spill_file
+            del self.dribbble_user_data[field]
+
+    def has_section_data(self, section: str) -> bool:
+        """
+        Check whether any field of a section was scraped
+        """
+        return any(
+            self.dribbble_user_data.get(field)
+            for field, field_section in FIELD_SECTIONS.items()
+            if field_section == section
+        )
 
-    def run_nursery_without_metadata_scraper(self):
+    async def scrape_user_pages_with_metadata_nursery(self, find_user: bool = False):
         """
-        Run the trio nursery for scraping pages of a dribbble user
+        Scrape the planned dribbble user pages with an anyio task group,
+        checking first whether the user exists when find_user is set
         """
-        trio.run(self.scrape_user_pages_without_metadata_nursery)
+        if find_user:
+            await self.find_user()
+        await self.run_scrapers(self.planned_scrapers(with_metadata=True))
+
+    def run_nursery_with_metadata_scraper(self, find_user: bool = False):
+        """
+        Run the task group for scraping pages of a dribbble user
+        """
+        anyio.run(
+            self.scrape_user_pages_with_metadata_nursery,
+            find_user,
+            backend=self.backend,
+        )
+
+    async def scrape_user_pages_without_metadata_nursery(self, find_user: bool = False):
+        """
+        Scrape the planned dribbble user pages with an anyio task group,
+        checking first whether the user exists when find_user is set
+        """
+        if find_user:
+            await self.find_user()
+        await self.run_scrapers(self.planned_scrapers(with_metadata=False))
+
+    def run_nursery_without_metadata_scraper(self, find_user: bool = False):
+        """
+        Run the task group for scraping pages of a dribbble user
+        """
+        anyio.run(
+            self.scrape_user_pages_without_metadata_nursery,
+            find_user,
+            backend=self.backend,
+        )
 
     async def scrape_main_page(self):
         """
         Scrape data from the main page of a dribbble user
         """
 
-        async with httpx.AsyncClient() as client:
+        async with self.open_client() as client:
 
             try:
-                user_page = await client.get(
-                    self.user_pages["main"], headers=self.scraper_header
+                user_page = await self.get_page(
+                    client,
+                    self.user_pages["main"],
+                    self.page_end_markers["main"],
+                    page_type="main",
                 )
-                user_page_soup = BeautifulSoup(user_page.text, "lxml")
-                sselect = SilentSelector(user_page_soup)
+                async with self.open_soup(user_page, "main") as user_page_soup:
+                    sselect = SilentSelector(user_page_soup)
 
-                # shots count
-                shots_count = sselect.select_one("li.shots a span.count", True, None)
-                self.dribbble_user_data["shots_count"] = string_to_number(shots_count)
+                    main_page = {}
 
-                # projects count
-                projects_count = sselect.select_one(
-                    "li.projects a span.count", True, None
-                )
-                self.dribbble_user_data["projects_count"] = string_to_number(
-                    projects_count
-                )
+                    # shots count
+                    main_page["shots_count"] = sselect.select_one(
+                        "li.shots a span.count", True, None
+                    )
 
-                # collections count
-                collections_count = sselect.select_one(
-                    "li.collections a span.count", True, None
-                )
-                self.dribbble_user_data["collections_count"] = string_to_number(
-                    collections_count
-                )
+                    # projects count
+                    main_page["projects_count"] = sselect.select_one(
+                        "li.projects a span.count", True, None
+                    )
 
-                # liked shots count
-                liked_shots = sselect.select_one("li.liked a span.count", True, None)
-                self.dribbble_user_data["liked_shots"] = string_to_number(liked_shots)
+                    # collections count
+                    main_page["collections_count"] = sselect.select_one(
+                        "li.collections a span.count", True, None
+                    )
 
-                # user description
-                self.dribbble_user_data["user_description"] = sselect.select_one(
-                    "div.masthead-intro h2", True, None
-                )
+                    # liked shots count
+                    main_page["liked_shots"] = sselect.select_one(
+                        "li.liked a span.count", True, None
+                    )
 
-                # hire status
-                self.dribbble_user_data["hire_status"] = bool(
-                    sselect.select_one(
-                        "div.hire-prompt-trigger.profile-action-item", False, None
+                    # user description
+                    self.dribbble_user_data["user_description"] = sselect.select_one(
+                        "div.masthead-intro h2", True, None
                     )
-                )
 
-                # members count
-                members_count = sselect.select_one("li.members span.count", True, None)
-                self.dribbble_user_data["members_count"] = string_to_number(
-                    members_count
-                )
+                    # hire status
+                    self.dribbble_user_data["hire_status"] = bool(
+                        sselect.select_one(
+                            "div.hire-prompt-trigger.profile-action-item", False, None
+                        )
+                    )
 
-                # team profile
-                team_profile = sselect.select_one(
-                    "div.masthead-teams a.team-avatar-link[href]", False, "href"
-                )
+                    # members count
+                    main_page["members_count"] = sselect.select_one(
+                        "li.members span.count", True, None
+                    )
 
-                if team_profile is not None:
-                    self.dribbble_user_data["team_url"] = DRIBBBLE_URL + team_profile
-                else:
-                    self.dribbble_user_data["team_url"] = None
+                    # convert the counts
+                    self.normalizer.normalize(
+                        "main",
+                        [main_page],
+                        dict.fromkeys(main_page, parse_count),
+                    )
+                    self.dribbble_user_data.update(main_page)
 
-                # print some of the info
-                print(
-                    "Shots           : {}".format(
-                        self.dribbble_user_data["shots_count"]
+                    # team profile
+                    team_profile = sselect.select_one(
+                        "div.masthead-teams a.team-avatar-link[href]", False, "href"
                     )
-                )
-                print(
-                    "Projects        : {}".format(
-                        self.dribbble_user_data["projects_count"]
+
+                    if team_profile is not None:
+                        self.dribbble_user_data["team_url"] = (
+                            self.base_url + team_profile
+                        )
+                    else:
+                        self.dribbble_user_data["team_url"] = None
+
+                    # print some of the info
+                    print(
+                        "Shots           : {}".format(
+                            self.dribbble_user_data["shots_count"]
+                        )
                     )
-                )
-                print(
-                    "Collections     : {}".format(
-                        self.dribbble_user_data["collections_count"]
+                    print(
+                        "Projects        : {}".format(
+                            self.dribbble_user_data["projects_count"]
+                        )
                     )
-                )
-                print(
-                    "Liked Shots     : {}".format(
-                        self.dribbble_user_data["liked_shots"]
+                    print(
+                        "Collections     : {}".format(
+                            self.dribbble_user_data["collections_count"]
+                        )
                     )
-                )
-                print("\n✓ Main page scraped...")
+                    print(
+                        "Liked Shots     : {}".format(
+                            self.dribbble_user_data["liked_shots"]
+                        )
+                    )
+                    print("\n✓ Main page scraped...")
 
             except httpx.RequestError as ex:
                 print(
@@ -235,94 +865,96 @@ class DribbbleUser:
         Retrieves data from the about page of a dribbble user
         """
 
-        async with httpx.AsyncClient() as client:
+        async with self.open_client() as client:
             try:
-                about_page = await client.get(
-                    self.user_pages["about"], headers=self.scraper_header
-                )
-                about_page_soup = BeautifulSoup(about_page.text, "lxml")
-                sselect = SilentSelector(about_page_soup)
-
-                # profile stats - following, followers, tags
-                profile_stats = [
-                    stat.find("span", class_="count").text
-                    for stat in sselect.select(
-                        "section.content-section.profile-stats-section.medium-screens-only a "
-                    )
-                ]
-
-                # user followers
-                user_followers_count = profile_stats[0].replace(",", "")
-                self.dribbble_user_data["followers"] = string_to_number(
-                    user_followers_count
+                about_page = await self.get_page(
+                    client, self.user_pages["about"], page_type="about"
                 )
+                async with self.open_soup(about_page, "about") as about_page_soup:
+                    sselect = SilentSelector(about_page_soup)
+
+                    # profile stats - following, followers, tags
+                    profile_stats = [
+                        stat.find("span", class_="count").text
+                        for stat in sselect.select(
+                            "section.content-section.profile-stats-section.medium-screens-only a "
+                        )
+                    ]
 
-                # user following
-                user_following_count = profile_stats[1].replace(",", "")
-                self.dribbble_user_data["following"] = string_to_number(
-                    user_following_count
-                )
+                    profile_stats += [None] * (3 - len(profile_stats))
+                    about_page = {
+                        "followers": profile_stats[0],
+                        "following": profile_stats[1],
+                    }
 
-                # user tags
-                try:
+                    # user tags
                     self.dribbble_user_data["tags"] = profile_stats[2]
-                except IndexError:
-                    self.dribbble_user_data["tags"] = None
-
-                # user location
-                self.dribbble_user_data["location"] = (
-                    str(sselect.select_one("p.location", True, None))
-                    .replace("\n", "")
-                    .strip()
-                )
 
-                # user bio
-                self.dribbble_user_data["bio"] = str(
-                    sselect.select_one("p.bio-text", True, None)
-                ).replace("\n", "")
+                    # user location
+                    self.dribbble_user_data["location"] = (
+                        str(sselect.select_one("p.location", True, None))
+                        .replace("\n", "")
+                        .strip()
+                    )
 
-                # user pro status
-                self.dribbble_user_data["is_pro"] = bool(
-                    sselect.select_one("p.info-item.pro", False, None)
-                )
+                    # user bio
+                    self.dribbble_user_data["bio"] = str(
+                        sselect.select_one("p.bio-text", True, None)
+                    ).replace("\n", "")
 
-                # user join date
-                join_date_string = (
-                    str(sselect.select_one("p.info-item.created span", True, None))
-                    .replace("Member since", "")
-                    .strip()
-                )
-                join_date = datetime.strptime(join_date_string, self.join_date_format)
-                self.dribbble_user_data["join_date"] = join_date.strftime(
-                    self.preferred_time_format
-                )
+                    # user pro status
+                    self.dribbble_user_data["is_pro"] = bool(
+                        sselect.select_one("p.info-item.pro", False, None)
+                    )
+
+                    # user join date
+                    about_page["join_date"] = (
+                        str(sselect.select_one("p.info-item.created span", True, None))
+                        .replace("Member since", "")
+                        .strip()
+                    )
 
-                # user skills
-                skills_list = [
-                    skill.text for skill in sselect.select("ul.skills-list a")
-                ]
-                self.dribbble_user_data["skills"] = skills_list
-
-                # social media profiles
-                self.dribbble_user_data["social_media_profiles"] = {}
-                social_media_redirect_urls = [
-                    DRIBBBLE_URL + anchor["href"]
-                    for anchor in sselect.select("ul.social-links-list a")
-                ]
-
-                for url in social_media_redirect_urls:
-                    profile_url, site = get_redirect_url(url)
-                    self.dribbble_user_data["social_media_profiles"][site] = profile_url
-
-                # Print some of the info
-                print("Followers       :", self.dribbble_user_data["followers"])
-                print("Following       :", self.dribbble_user_data["following"])
-                print("Location        :", self.dribbble_user_data["location"])
-                print("Pro Status      :", self.dribbble_user_data["is_pro"])
-                print("Join Date       :", self.dribbble_user_data["join_date"])
-                print("Skills          :", self.dribbble_user_data["skills"])
-
-                print("\n✓ About page scraped...")
+                    # convert the counts and dates
+                    self.normalizer.normalize(
+                        "about",
+                        [about_page],
+                        {
+                            "followers": parse_count,
+                            "following": parse_count,
+                            "join_date": date_parser(self.join_date_format),
+                        },
+                    )
+                    self.dribbble_user_data.update(about_page)
+
+                    # user skills
+                    skills_list = [
+                        skill.text for skill in sselect.select("ul.skills-list a")
+                    ]
+                    self.dribbble_user_data["skills"] = skills_list
+
+                    # social media profiles, resolving every redirect costs a request
+                    if self.wants_field("social_media_profiles"):
+                        self.dribbble_user_data["social_media_profiles"] = {}
+                        social_media_redirect_urls = [
+                            self.base_url + anchor["href"]
+                            for anchor in sselect.select("ul.social-links-list a")
+                        ]
+
+                        for url in social_media_redirect_urls:
+                            profile_url, site = await self.get_redirect_url(client, url)
+                            self.dribbble_user_data["social_media_profiles"][
+                                site
+                            ] = profile_url
+
+                    # Print some of the info
+                    print("Followers       :", self.dribbble_user_data["followers"])
+                    print("Following       :", self.dribbble_user_data["following"])
+                    print("Location        :", self.dribbble_user_data["location"])
+                    print("Pro Status      :", self.dribbble_user_data["is_pro"])
+                    print("Join Date       :", self.dribbble_user_data["join_date"])
+                    print("Skills          :", self.dribbble_user_data["skills"])
+
+                    print("\n✓ About page scraped...")
             except httpx.RequestError as ex:
                 print(
                     f"\nAn error occurred while requesting {ex.request.url!r}.\n {ex}"
@@ -338,24 +970,27 @@ class DribbbleUser:
         Retrieves data from the shots page of a dribbble user
         """
 
-        user_shots = {}
+        user_shots = self.dribbble_user_data["shots"] = {}
 
-        async with httpx.AsyncClient() as client:
+        async with self.open_client() as client:
             try:
-                shots_page = await client.get(
-                    self.user_pages["main"], headers=self.scraper_header
-                )
-                shots_page_soup = BeautifulSoup(shots_page.text, "lxml")
-                sselect = SilentSelector(shots_page_soup)
-
-                # total shots
-                shots_count = string_to_number(
-                    sselect.select_one("li.shots a span.count", True, None)
+                shots_page = await self.get_page(
+                    client,
+                    self.user_pages["main"],
+                    self.page_end_markers["main"],
+                    page_type="main",
                 )
+                async with self.open_soup(shots_page, "main") as shots_page_soup:
+                    sselect = SilentSelector(shots_page_soup)
+
+                    # total shots
+                    shots_count = self.normalize_count(
+                        "shots",
+                        "shots_count",
+                        sselect.select_one("li.shots a span.count", True, None),
+                    )
                 user_shots["shots_count"] = shots_count
                 user_shots["shots"] = {}
-                shots_urls = []
-                shot_names = []
 
                 # number of pages to scrape
                 page_counter = 0
@@ -371,44 +1006,23 @@ class DribbbleUser:
                         + "&per_page="
                         + str(self.shots_per_page)
                     )
-                    async with httpx.AsyncClient() as client_i:
-
-                        # grab all shots info from current page
-                        shots_page = await client_i.get(
-                            current_shots_page, headers=self.scraper_header
-                        )
-                        shots_page_soup = BeautifulSoup(shots_page.text, "lxml")
-                        sselect_shots = SilentSelector(shots_page_soup)
+                    async with self.open_client() as client_i:
 
-                        # loop through each found shot
-                        for shot_soup in sselect_shots.find_all(
-                            "li", "shot-thumbnail", None, False, None
-                        ):
-                            current_shot = {}
-
-                            sselect_current_shot = SilentSelector(shot_soup)
-
-                            # shot titles
-                            current_shot_title = sselect_current_shot.select_one(
-                                "div.shot-title", True, None
-                            )
-                            shot_names.append(current_shot_title)
-
-                            # shot URL
-                            current_shot_url = DRIBBBLE_URL + str(
-                                sselect_current_shot.select_one(
-                                    "a.shot-thumbnail-link", False, "href"
-                                )
+                        # parse each shot as the current page arrives, keeping
+                        # the shots read when the section deadline passes
+                        page_shots = []
+                        try:
+                            await self.read_listing(
+                                client_i,
+                                current_shots_page,
+                                "li",
+                                "shot-thumbnail",
+                                self.parse_shot_thumbnail,
+                                "shots",
+                                page_shots,
                             )
-                            shots_urls.append(current_shot_url)
-
-                            current_shot["shot_url"] = current_shot_url
-
-                            # shot alt description
-                            current_shot[
-                                "alt_description"
-                            ] = sselect_current_shot.select_one("img", False, "alt")
-                            user_shots["shots"][current_shot_title] = current_shot
+                        finally:
+                            user_shots["shots"].update(page_shots)
                     page_counter += 1
 
             except httpx.RequestError as ex:
@@ -429,82 +1043,58 @@ class DribbbleUser:
         Retrieves data from the shots page of a dribbble user
         """
 
-        user_shots = {}
+        user_shots = self.dribbble_user_data["shots"] = {}
 
-        async with httpx.AsyncClient() as client:
+        async with self.open_client() as client:
             try:
-                shots_page = await client.get(
-                    self.user_pages["main"], headers=self.scraper_header
-                )
-                shots_page_soup = BeautifulSoup(shots_page.text, "lxml")
-                sselect = SilentSelector(shots_page_soup)
-
-                # total shots
-                shots_count = string_to_number(
-                    sselect.select_one("li.shots a span.count", True, None)
+                shots_page = await self.get_page(
+                    client,
+                    self.user_pages["main"],
+                    self.page_end_markers["main"],
+                    page_type="main",
                 )
+                async with self.open_soup(shots_page, "main") as shots_page_soup:
+                    sselect = SilentSelector(shots_page_soup)
+
+                    # total shots
+                    shots_count = self.normalize_count(
+                        "shots",
+                        "shots_count",
+                        sselect.select_one("li.shots a span.count", True, None),
+                    )
                 user_shots["shots_count"] = shots_count
                 user_shots["shots"] = {}
-                shots_urls = []
-                shot_names = []
 
                 # number of pages to scrape
-                page_counter = 0
                 max_pages = (shots_count // self.shots_per_page) + 5
 
-                # iterate over pages
-                while page_counter <= max_pages:
-
-                    current_shots_page = (
-                        self.user_pages["shots"]
-                        + "?page="
-                        + str(page_counter)
-                        + "&per_page="
-                        + str(self.shots_per_page)
-                    )
-                    async with httpx.AsyncClient() as client_i:
-
-                        # grab all shots info from current page
-                        shots_page = await client_i.get(
-                            current_shots_page, headers=self.scraper_header
+                async def listed_shots():
+                    # iterate over pages
+                    for page_counter in range(max_pages + 1):
+                        current_shots_page = (
+                            self.user_pages["shots"]
+                            + "?page="
+                            + str(page_counter)
+                            + "&per_page="
+                            + str(self.shots_per_page)
                         )
-                        shots_page_soup = BeautifulSoup(shots_page.text, "lxml")
-                        sselect_shots = SilentSelector(shots_page_soup)
-
-                        # loop through each found shot
-                        for shot_soup in sselect_shots.find_all(
-                            "li", "shot-thumbnail", None, False, None
-                        ):
-                            current_shot = {}
-
-                            sselect_current_shot = SilentSelector(shot_soup)
-
-                            # shot titles
-                            current_shot_title = sselect_current_shot.select_one(
-                                "div.shot-title", True, None
-                            )
-                            shot_names.append(current_shot_title)
-
-                            # shot URL
-                            current_shot_url = DRIBBBLE_URL + str(
-                                sselect_current_shot.select_one(
-                                    "a.shot-thumbnail-link", False, "href"
-                                )
+                        # the page is read before its shots are handed on,
+                        # so a full channel never holds a request slot
+                        async with self.stage_limiter("listing"):
+                            page_shots = await self.read_listing(
+                                client,
+                                current_shots_page,
+                                "li",
+                                "shot-thumbnail",
+                                self.parse_shot_thumbnail,
+                                "shots",
                             )
-                            shots_urls.append(current_shot_url)
-
-                            current_shot["shot_url"] = current_shot_url
+                        for shot_id, current_shot in page_shots:
+                            yield shot_id, current_shot
 
-                            # shot alt description
-                            current_shot[
-                                "alt_description"
-                            ] = sselect_current_shot.select_one("img", False, "alt")
-                            user_shots["shots"][current_shot_title] = current_shot
-                    page_counter += 1
-
-                # Get more data about the shots
-                user_shots = await self.get_shots_data(
-                    shots_urls, shot_names, user_shots["shots"]
+                # Get more data about the shots while they are listed
+                await self.pipeline_shots_data(
+                    "shots", listed_shots(), user_shots["shots"]
                 )
 
             except httpx.RequestError as ex:
@@ -524,63 +1114,68 @@ class DribbbleUser:
         """
         Retrieves data from the projects' page of a dribbble user
         """
-        user_projects = {}
+        user_projects = self.dribbble_user_data["projects"] = {}
 
-        async with httpx.AsyncClient() as client:
+        async with self.open_client() as client:
             try:
                 # scrape projects page
-                projects_page = await client.get(
-                    self.user_pages["projects"], headers=self.scraper_header
+                projects_page = await self.get_page(
+                    client, self.user_pages["projects"], page_type="projects"
                 )
-                projects_page_soup = BeautifulSoup(projects_page.text, "lxml")
-                sselect = SilentSelector(projects_page_soup)
-
-                # project titles
-                project_titles = [
-                    str(project.text).strip()
-                    for project in sselect.select("div.collection-name")
-                ]
-
-                # project shot count
-                project_shots_count = [
-                    int(
+                async with self.open_soup(
+                    projects_page, "projects"
+                ) as projects_page_soup:
+                    sselect = SilentSelector(projects_page_soup)
+
+                    # project titles
+                    project_titles = [
+                        str(project.text).strip()
+                        for project in sselect.select("div.collection-name")
+                    ]
+
+                    # project shot count
+                    project_shots_count = [
                         str(project_shots.text)
-                        .replace("Shots", "")
-                        .replace("Shot", "")
-                        .strip()
-                    )
-                    for project_shots in sselect.select(
-                        "div.shots-group-meta>span.shots-count"
+                        for project_shots in sselect.select(
+                            "div.shots-group-meta>span.shots-count"
+                        )
+                    ]
+
+                    # project updated date
+                    project_updated_dates = [
+                        str(project_updated_date.text).replace("Updated", "").strip()
+                        for project_updated_date in sselect.select("span.timestamp")
+                    ]
+
+                    # convert the counts and dates
+                    projects = self.normalizer.normalize(
+                        "projects",
+                        [
+                            {"shots_count": shots_count, "updated_date": updated_date}
+                            for shots_count, updated_date in zip(
+                                project_shots_count, project_updated_dates
+                            )
+                        ],
+                        {
+                            "shots_count": parse_count,
+                            "updated_date": date_parser(
+                                self.project_date_format, self.preferred_time_format
+                            ),
+                        },
                     )
-                ]
-
-                # project updated date
-                project_updated_dates = [
-                    datetime.strptime(
-                        str(project_updated_date.text).replace("Updated", "").strip(),
-                        "%B %d, %Y",
-                    ).strftime(self.preferred_time_format)
-                    for project_updated_date in sselect.select("span.timestamp")
-                ]
-
-                # project urls
-                project_urls = [
-                    DRIBBBLE_URL + str(anchor["href"])
-                    for anchor in sselect.select("a.shots-group")
-                ]
+
+                    # project urls
+                    project_urls = [
+                        self.base_url + str(anchor["href"])
+                        for anchor in sselect.select("a.shots-group")
+                    ]
 
                 # retrieve data about each project and its shots
-                for (
-                    project_title,
-                    project_url,
-                    shots_count,
-                    project_updated_date,
-                ) in zip(
-                    project_titles,
-                    project_urls,
-                    project_shots_count,
-                    project_updated_dates,
+                for project_title, project_url, project in zip(
+                    project_titles, project_urls, projects
                 ):
+                    project_updated_date = project["updated_date"]
+                    shots_count = project["shots_count"] or 0
 
                     max_pages = (shots_count // self.project_shots_per_page) + 1
                     page_number = 1
@@ -593,61 +1188,42 @@ class DribbbleUser:
                         page_number += 1
 
                         # get current project page soup
-                        async with httpx.AsyncClient() as client_i:
+                        async with self.open_client() as client_i:
                             try:
-                                individual_project_page = await client_i.get(
-                                    project_page_url
-                                )
-                                individual_project_page_soup = BeautifulSoup(
-                                    individual_project_page.text, "lxml"
+                                individual_project_page = await self.get_page(
+                                    client_i, project_page_url, page_type="project"
                                 )
-                                sselect_project = SilentSelector(
-                                    individual_project_page_soup
-                                )
-
-                                # loop though each found shot
-                                for shot_soup in sselect_project.find_all(
-                                    "div", "shot-section-item", None, False, None
-                                ):
-
-                                    current_shot = {}
-                                    sselect_shot = SilentSelector(shot_soup)
-
-                                    # shot title
-                                    current_shot_title = sselect_shot.select_one(
-                                        "h3.shot-title a", True, None
+                                async with self.open_soup(
+                                    individual_project_page, "project"
+                                ) as individual_project_page_soup:
+                                    sselect_project = SilentSelector(
+                                        individual_project_page_soup
                                     )
 
-                                    # shot published date
-                                    shot_pub_date = sselect_shot.select_one(
-                                        "p.shot-date", True, None
-                                    )
-                                    current_shot["shot_pub_date"] = datetime.strptime(
-                                        shot_pub_date, "%B %d, %Y"
-                                    ).strftime(self.preferred_time_format)
-
-                                    # shot description
-                                    current_shot[
-                                        "shot_description"
-                                    ] = sselect_shot.select_one(
-                                        "p.shot-description", True, None
-                                    )
-
-                                    # shot URL
-                                    current_shot[
-                                        "shot_url"
-                                    ] = DRIBBBLE_URL + sselect_shot.select_one(
-                                        "a.shot-link", False, "href"
+                                    # loop though each found shot
+                                    page_shots = [
+                                        self.parse_project_shot(shot_soup)
+                                        for shot_soup in sselect_project.find_all(
+                                            "div",
+                                            "shot-section-item",
+                                            None,
+                                            False,
+                                            None,
+                                        )
+                                    ]
+                                    self.normalize_shots(
+                                        "projects", [shot for _, shot in page_shots]
                                     )
+                                    project_shots.update(page_shots)
 
-                                    project_shots[current_shot_title] = current_shot
-
-                                # Assign the projects' shots to the project
-                                user_projects[project_title] = {}
-                                user_projects[project_title][
-                                    "updated_date"
-                                ] = project_updated_date
-                                user_projects[project_title]["shots"] = project_shots
+                                    # Assign the projects' shots to the project
+                                    user_projects[project_title] = {}
+                                    user_projects[project_title][
+                                        "updated_date"
+                                    ] = project_updated_date
+                                    user_projects[project_title][
+                                        "shots"
+                                    ] = project_shots
 
                             except httpx.RequestError as ex:
                                 print(
@@ -677,165 +1253,110 @@ class DribbbleUser:
         """
         Retrieves data from the collections' page of a dribbble user
         """
-        user_collections = {}
+        user_collections = self.dribbble_user_data["collections"] = {}
 
-        async with httpx.AsyncClient() as client:
+        async with self.open_client() as client:
 
             try:
-                collections_page = await client.get(
-                    self.user_pages["collections"], headers=self.scraper_header
+                collections_page = await self.get_page(
+                    client, self.user_pages["collections"], page_type="collections"
                 )
-                collections_page_soup = BeautifulSoup(collections_page.text, "lxml")
-                sselect = SilentSelector(collections_page_soup)
-
-                # loop through each collection
-                for collection in sselect.find_all(
-                    "li", "shots-group-item", None, False, None
-                ):
-                    current_collection = {}
-
-                    sselect_collection = SilentSelector(collection)
-
-                    # collections' name
-                    current_collection_name = str(
-                        sselect_collection.find(
-                            "div", "collection-name", None, True, None
-                        )
-                    ).strip()
-
-                    # collections' shots count
-                    shots_count = str(
-                        sselect_collection.find("span", "shots-count", None, True, None)
-                    ).strip()
-                    shots_count = str(re.sub("Shot*.", "", shots_count)).strip()
-                    current_collection["shots_count"] = int(shots_count)
-
-                    # collections' designer Count
-                    designer_count = str(
-                        sselect_collection.find(
-                            "span", "designers-count", None, True, None
-                        )
-                    ).strip()
-                    designer_count = str(
-                        re.sub("Designer*.", "", designer_count)
-                    ).strip()
-                    current_collection["designers_count"] = int(designer_count)
-
-                    # collections' URL
-                    collection_url = DRIBBBLE_URL + sselect_collection.find(
-                        "a", "shots-group", None, False, "href"
-                    )
-                    current_collection["collection_url"] = collection_url
-
-                    # assign the collections' data to dict
-                    user_collections[current_collection_name] = current_collection
-
-                    # get current collections' page soup
-                    async with httpx.AsyncClient() as client_ii:
-
-                        try:
-                            collection_shots_page = await client_ii.get(
-                                collection_url, headers=self.scraper_header
+                async with self.open_soup(
+                    collections_page, "collections"
+                ) as collections_page_soup:
+                    sselect = SilentSelector(collections_page_soup)
+
+                    # loop through each collection
+                    for collection in sselect.find_all(
+                        "li", "shots-group-item", None, False, None
+                    ):
+                        current_collection = {}
+
+                        sselect_collection = SilentSelector(collection)
+
+                        # collections' name
+                        current_collection_name = str(
+                            sselect_collection.find(
+                                "div", "collection-name", None, True, None
                             )
-                            collection_shots_page_soup = BeautifulSoup(
-                                collection_shots_page.text, "lxml"
+                        ).strip()
+
+                        # collections' shots count
+                        current_collection["shots_count"] = str(
+                            sselect_collection.find(
+                                "span", "shots-count", None, True, None
                             )
-                            user_collections[current_collection_name]["shots"] = {}
+                        ).strip()
 
-                            sselect_current_collection = SilentSelector(
-                                collection_shots_page_soup
+                        # collections' designer Count
+                        current_collection["designers_count"] = str(
+                            sselect_collection.find(
+                                "span", "designers-count", None, True, None
                             )
+                        ).strip()
+
+                        # convert the counts
+                        self.normalizer.normalize(
+                            "collections",
+                            [current_collection],
+                            {
+                                "shots_count": parse_count,
+                                "designers_count": parse_count,
+                            },
+                        )
 
-                            # loop through each found shot
-                            for shot in sselect_current_collection.find_all(
-                                "li", "shot-thumbnail", None, False, None
-                            ):
+                        # collections' URL
+                        collection_url = self.base_url + sselect_collection.find(
+                            "a", "shots-group", None, False, "href"
+                        )
+                        current_collection["collection_url"] = collection_url
 
-                                current_shot = {}
-                                sselect_shot = SilentSelector(shot)
+                        # assign the collections' data to dict
+                        user_collections[current_collection_name] = current_collection
 
-                                # shot title
-                                shot_title = str(
-                                    sselect_shot.find(
-                                        "div", "shot-title", None, True, None
-                                    )
-                                ).strip()
-
-                                # shot designer profile URL
-                                current_shot[
-                                    "designer_profile_url"
-                                ] = DRIBBBLE_URL + str(
-                                    sselect_shot.select_one(
-                                        "a.hoverable.url", False, "href"
-                                    )
+                        # get current collections' page soup
+                        async with self.open_client() as client_ii:
+
+                            try:
+                                collection_shots_page = await self.get_page(
+                                    client_ii, collection_url, page_type="collection"
                                 )
-                                # shot designer username
-                                current_shot["designer_name"] = str(
-                                    sselect_shot.find(
-                                        "span", "display-name", None, True, None
+                                async with self.open_soup(
+                                    collection_shots_page, "collection"
+                                ) as collection_shots_page_soup:
+                                    user_collections[current_collection_name][
+                                        "shots"
+                                    ] = {}
+
+                                    sselect_current_collection = SilentSelector(
+                                        collection_shots_page_soup
                                     )
-                                ).strip()
 
-                                # shot likes
-                                shot_likes = str(
-                                    sselect_shot.find(
-                                        "span", "js-shot-likes-count", None, True, None
-                                    )
-                                ).strip()
-                                if "k" in shot_likes or "K" in shot_likes:
-                                    current_shot["shot_likes"] = int_k(shot_likes)
-                                else:
-                                    current_shot["shot_likes"] = int(shot_likes)
-
-                                # shot views
-                                shot_views = str(
-                                    (
-                                        sselect_shot.find(
-                                            "span",
-                                            "js-shot-views-count",
-                                            None,
-                                            True,
-                                            None,
+                                    # loop through each found shot
+                                    page_shots = [
+                                        self.parse_collection_shot(shot)
+                                        for shot in sselect_current_collection.find_all(
+                                            "li", "shot-thumbnail", None, False, None
                                         )
+                                    ]
+                                    self.normalize_shots(
+                                        "collections", [shot for _, shot in page_shots]
                                     )
-                                ).strip()
-
-                                if "k" in shot_views or "K" in shot_views:
-                                    current_shot["shot_views"] = int_k(shot_views)
-                                else:
-                                    current_shot["shot_views"] = int(shot_views)
 
-                                # designer pro status
-                                if (
-                                    sselect_shot.find(
-                                        "span", "badge-pro", None, False, None
-                                    )
-                                    is not None
-                                ):
-                                    is_pro = True
-                                else:
-                                    is_pro = False
-                                current_shot["is_pro"] = is_pro
+                                    # assign current collection dict to collections
+                                    user_collections[current_collection_name][
+                                        "shots"
+                                    ].update(page_shots)
 
-                                # shot URL
-                                current_shot["shot_url"] = sselect_shot.find(
-                                    "img", None, None, False, "src"
+                            except httpx.RequestError as ex:
+                                print(
+                                    f"\nAn error occurred while requesting {ex.request.url!r}.\n {ex}"
                                 )
 
-                                # assign current collection dict to collections
-                                user_collections[current_collection_name]["shots"][
-                                    shot_title
-                                ] = current_shot
-
-                        except httpx.RequestError as ex:
-                            print(
-                                f"\nAn error occurred while requesting {ex.request.url!r}.\n {ex}"
-                            )
-
-                        except httpx.HTTPStatusError as ex:
-                            print(
-                                f"\nError response {ex.response.status_code} while requesting {ex.request.url!r}."
-                            )
+                            except httpx.HTTPStatusError as ex:
+                                print(
+                                    f"\nError response {ex.response.status_code} while requesting {ex.request.url!r}."
+                                )
 
             except httpx.RequestError as ex:
                 print(
@@ -855,26 +1376,26 @@ class DribbbleUser:
         Retrieves data from the members' page of a dribbble user
         """
 
-        user_members = {}
+        user_members = self.dribbble_user_data["members"] = {}
 
-        async with httpx.AsyncClient() as client:
+        async with self.open_client() as client:
             try:
 
                 # get members count
-                member_page = await client.get(
-                    self.user_pages["main"], headers=self.scraper_header
-                )
-                member_page_soup = BeautifulSoup(member_page.text, "lxml")
-                sselect = SilentSelector(member_page_soup)
-
-                members_count = sselect.select_one(
-                    "li.members a span.count", True, None
+                member_page = await self.get_page(
+                    client,
+                    self.user_pages["main"],
+                    self.page_end_markers["main"],
+                    page_type="main",
                 )
+                async with self.open_soup(member_page, "main") as member_page_soup:
+                    sselect = SilentSelector(member_page_soup)
 
-                if members_count is not None:
-                    members_count = int(members_count)
-                else:
-                    members_count = 0
+                    members_count = self.normalize_count(
+                        "members",
+                        "members_count",
+                        sselect.select_one("li.members a span.count", True, None),
+                    )
 
                 # scrape if members are available
                 if members_count > 0:
@@ -896,66 +1417,22 @@ class DribbbleUser:
                         )
 
                         # get current member page soup
-                        async with httpx.AsyncClient() as client:
+                        async with self.open_client() as client:
                             try:
-                                members_page = await client.get(
-                                    current_user_members_page_url,
-                                    headers=self.scraper_header,
-                                )
-                                members_page_soup = BeautifulSoup(
-                                    members_page.text, "lxml"
-                                )
-                                sselect = SilentSelector(members_page_soup)
-
-                                # loop through each found member
-                                if sselect.find_all(
-                                    "li", "scrolling-row", None, False, None
-                                ):
-                                    for member in sselect.find_all(
-                                        "li", "scrolling-row", None, False, None
-                                    ):
-                                        current_member = {}
-
-                                        sselect_member = SilentSelector(member)
-
-                                        # member username
-                                        member_username = str(
-                                            sselect_member.select_one(
-                                                "span.designer-card-username a.designer-link",
-                                                False,
-                                                "href",
-                                            )
-                                        ).replace("/", "")
-
-                                        # member profile URL
-                                        current_member["profile_url"] = (
-                                            DRIBBBLE_URL + "/" + member_username
-                                        )
-
-                                        # member pofile name
-                                        profile_name = sselect_member.select_one(
-                                            "span.designer-card-username a.designer-link",
-                                            True,
-                                            None,
-                                        )
-
-                                        current_member["profile_name"] = profile_name
-
-                                        # member location
-                                        current_member[
-                                            "location"
-                                        ] = sselect_member.select_one(
-                                            "span.designer-card-location", True, None
-                                        )
-
-                                        # member pro status
-                                        current_member["is_pro"] = bool(
-                                            sselect_member.select_one(
-                                                "span.badge.badge-pro", False, None
-                                            )
-                                        )
-
-                                        user_members[member_username] = current_member
+                                # parse each member as the current page arrives
+                                page_members = [
+                                    member
+                                    for member in await self.read_listing(
+                                        client,
+                                        current_user_members_page_url,
+                                        "li",
+                                        "scrolling-row",
+                                        self.parse_member,
+                                        "members",
+                                    )
+                                ]
+                                if page_members:
+                                    user_members.update(page_members)
                                     member_page_count += 1
                                 else:
                                     break
@@ -993,54 +1470,28 @@ class DribbbleUser:
 
         """
 
-        user_goods = {}
-        async with httpx.AsyncClient() as client:
-            try:
-                goods_page = await client.get(
-                    self.user_pages["goods"], headers=self.scraper_header
+        user_goods = self.dribbble_user_data["goods_for_sale"] = {}
+
+        async def listed_goods(client):
+            # the page is read before its goods are handed on, so a full
+            # channel never holds a request slot
+            async with self.stage_limiter("listing"):
+                goods = await self.read_listing(
+                    client,
+                    self.user_pages["goods"],
+                    "li",
+                    "shot-thumbnail-container",
+                    self.parse_goods_item,
+                    "goods",
                 )
-                goods_page_soup = BeautifulSoup(goods_page.text, "lxml")
-                sselect = SilentSelector(goods_page_soup)
-
-                # goods' Names
-                goods_names = [
-                    name.text
-                    for name in sselect.select(
-                        "div.shot-details-container>div.font-label"
-                    )
-                ]
-
-                # goods' prices
-                goods_prices = [
-                    str(price.text).strip()
-                    for price in sselect.select(
-                        "div.shot-details-container>div.price-label>span"
-                    )
-                ]
-
-                # goods' urls
-                goods_urls = [
-                    DRIBBBLE_URL
-                    + "/shots/"
-                    + str(goods_id_soup.get("data-thumbnail-id"))
-                    for goods_id_soup in sselect.find_all(
-                        "li", "shot-thumbnail-container", None, False, None
-                    )
-                ]
+            for goods_id, current_user_good in goods:
+                yield goods_id, current_user_good
 
-                for goods_url, goods_name, goods_price in zip(
-                    goods_urls, goods_names, goods_prices
-                ):
-                    current_user_good = {}
-
-                    # Construct Goods shot URL
-                    current_user_good["url"] = goods_url
-                    current_user_good["price"] = goods_price
-                    user_goods[goods_name] = current_user_good
-
-                # Get more data about the goods on sale
-                user_goods = await self.get_shots_data(
-                    goods_urls, goods_names, user_goods
+        async with self.open_client() as client:
+            try:
+                # Get more data about the goods on sale while they are listed
+                await self.pipeline_shots_data(
+                    "goods_for_sale", listed_goods(client), user_goods, "url"
                 )
 
             except httpx.RequestError as ex:
@@ -1056,21 +1507,450 @@ class DribbbleUser:
         self.dribbble_user_data["goods_for_sale"] = user_goods
         print("\n✓ Goods page scraped...")
 
-    async def get_shots_data(
-        self, shot_urls: list, shot_names: list, shots_dict: dict
-    ) -> dict:
+    def parse_shot_thumbnail(self, shot_soup) -> tuple:
         """
-        Retrieves data about a list of given shots
+        Extracts a shot from a shot thumbnail of a shots listing page
+
+        Arguments:
+            shot_soup: bs4 Tag
+
+        Returns:
+            (shot_id, shot): tuple
         """
-        for shot_url, shot_name in zip(shot_urls, shot_names):
+        current_shot = {}
+        sselect_current_shot = SilentSelector(shot_soup)
+
+        # shot titles
+        current_shot["title"] = sselect_current_shot.select_one(
+            "div.shot-title", True, None
+        )
+
+        # shot URL
+        current_shot["shot_url"] = self.base_url + str(
+            sselect_current_shot.select_one("a.shot-thumbnail-link", False, "href")
+        )
+
+        # shot alt description
+        current_shot["alt_description"] = sselect_current_shot.select_one(
+            "img", False, "alt"
+        )
+        return shot_id_from_url(current_shot["shot_url"]), current_shot
+
+    def parse_goods_item(self, goods_soup) -> tuple:
+        """
+        Extracts a good from a shot thumbnail of the goods page
 
-            # get current shot page HTML
-            async with httpx.AsyncClient() as client:
+        Arguments:
+            goods_soup: bs4 Tag
+
+        Returns:
+            (goods_id, good): tuple
+        """
+        current_user_good = {}
+        sselect_good = SilentSelector(goods_soup)
+
+        # goods' id
+        goods_id = str(
+            sselect_good.find(
+                "li", "shot-thumbnail-container", None, False, "data-thumbnail-id"
+            )
+        )
+
+        # goods' name
+        current_user_good["title"] = sselect_good.select_one(
+            "div.shot-details-container>div.font-label", True, None
+        )
+
+        # Construct Goods shot URL
+        current_user_good["url"] = self.base_url + "/shots/" + goods_id
+
+        # goods' price
+        current_user_good["price"] = str(
+            sselect_good.select_one(
+                "div.shot-details-container>div.price-label>span", True, None
+            )
+        ).strip()
+        return goods_id, current_user_good
+
+    def parse_project_shot(self, shot_soup) -> tuple:
+        """
+        Extracts a shot from a shot section item of a project page
+
+        Arguments:
+            shot_soup: bs4 Tag
+
+        Returns:
+            (shot_id, shot): tuple
+        """
+        current_shot = {}
+        sselect_shot = SilentSelector(shot_soup)
+
+        # shot title
+        current_shot["title"] = sselect_shot.select_one("h3.shot-title a", True, None)
+
+        # shot published date
+        current_shot["shot_pub_date"] = sselect_shot.select_one(
+            "p.shot-date", True, None
+        )
+
+        # shot description
+        current_shot["shot_description"] = sselect_shot.select_one(
+            "p.shot-description", True, None
+        )
+
+        # shot URL
+        current_shot["shot_url"] = self.base_url + str(
+            sselect_shot.select_one("a.shot-link", False, "href")
+        )
+        return shot_id_from_url(current_shot["shot_url"]), current_shot
+
+    def parse_collection_shot(self, shot_soup) -> tuple:
+        """
+        Extracts a shot from a shot thumbnail of a collection page
+
+        Arguments:
+            shot_soup: bs4 Tag
+
+        Returns:
+            (shot_id, shot): tuple
+        """
+        current_shot = {}
+        sselect_shot = SilentSelector(shot_soup)
+
+        # shot title
+        current_shot["title"] = str(
+            sselect_shot.find("div", "shot-title", None, True, None)
+        ).strip()
+
+        # shot designer profile URL
+        current_shot["designer_profile_url"] = self.base_url + str(
+            sselect_shot.select_one("a.hoverable.url", False, "href")
+        )
+        # shot designer username
+        current_shot["designer_name"] = str(
+            sselect_shot.find("span", "display-name", None, True, None)
+        ).strip()
+
+        # shot likes
+        current_shot["shot_likes"] = str(
+            sselect_shot.find("span", "js-shot-likes-count", None, True, None)
+        ).strip()
+
+        # shot views
+        current_shot["shot_views"] = str(
+            sselect_shot.find("span", "js-shot-views-count", None, True, None)
+        ).strip()
+
+        # designer pro status
+        current_shot["is_pro"] = (
+            sselect_shot.find("span", "badge-pro", None, False, None) is not None
+        )
+
+        # shot URL
+        current_shot["shot_url"] = sselect_shot.find("img", None, None, False, "src")
+
+        # shot id, from the link to the shot page when there is one
+        shot_link = sselect_shot.select_one("a.shot-thumbnail-link", False, "href")
+        if shot_link is not None:
+            return shot_id_from_url(self.base_url + shot_link), current_shot
+        return shot_id_from_url(current_shot["shot_url"]), current_shot
+
+    def parse_member(self, member_soup) -> tuple:
+        """
+        Extracts a member from a designer card of a members page
+
+        Arguments:
+            member_soup: bs4 Tag
+
+        Returns:
+            (member_username, member): tuple
+        """
+        current_member = {}
+        sselect_member = SilentSelector(member_soup)
+
+        # member username
+        member_username = str(
+            sselect_member.select_one(
+                "span.designer-card-username a.designer-link", False, "href"
+            )
+        ).replace("/", "")
+
+        # member profile URL
+        current_member["profile_url"] = self.base_url + "/" + member_username
+
+        # member pofile name
+        current_member["profile_name"] = sselect_member.select_one(
+            "span.designer-card-username a.designer-link", True, None
+        )
+
+        # member location
+        current_member["location"] = sselect_member.select_one(
+            "span.designer-card-location", True, None
+        )
+
+        # member pro status
+        current_member["is_pro"] = bool(
+            sselect_member.select_one("span.badge.badge-pro", False, None)
+        )
+        return member_username, current_member
+
+    async def iter_listing(
+        self, section: str, page_url, item_tag: str, item_class: str, parser
+    ):
+        """
+        Yields the parsed items of a paginated listing, one page at a time.
+
+        The next page is only requested once every item of the current page
+        has been consumed, so a consumer that stops early never pays for the
+        remaining pages. Iteration ends on an empty page or on a page which
+        only repeats already seen items.
+
+        Arguments:
+            section: string, reported with parse errors
+            page_url: callable returning the URL of a page number
+            item_tag: string
+            item_class: string
+            parser: callable returning (key, item) for an item soup
+
+        Yields:
+            (key, item): tuple
+        """
+        seen_keys = set()
+        page_number = 1
+
+        async with self.open_client() as client:
+            while True:
                 try:
-                    shot_page = await client.get(shot_url, headers=self.scraper_header)
-                    shot_page_soup = BeautifulSoup(shot_page.text, "lxml")
+                    page_items = await self.read_listing(
+                        client,
+                        page_url(page_number),
+                        item_tag,
+                        item_class,
+                        parser,
+                        section,
+                    )
+                except httpx.RequestError as ex:
+                    print(
+                        f"\nAn error occurred while requesting {ex.request.url!r}.\n {ex}"
+                    )
+                    return
+                except httpx.HTTPStatusError as ex:
+                    print(
+                        f"\nError response {ex.response.status_code} while requesting {ex.request.url!r}."
+                    )
+                    return
+
+                new_items = 0
+                for key, item in page_items:
+                    if key in seen_keys:
+                        continue
+                    seen_keys.add(key)
+                    new_items += 1
+                    self.normalize_shots(section, [item])
+                    yield key, item
+
+                if not new_items:
+                    return
+                page_number += 1
+
+    async def iter_shots(self):
+        """
+        Yields the shots of a dribbble user as the listing pages arrive
+        """
+        async with aclosing(
+            self.iter_listing(
+                "shots",
+                lambda page_number: self.user_pages["shots"]
+                + "?page="
+                + str(page_number)
+                + "&per_page="
+                + str(self.shots_per_page),
+                "li",
+                "shot-thumbnail",
+                self.parse_shot_thumbnail,
+            )
+        ) as items:
+            async for shot_id, shot in items:
+                shot["shot_id"] = shot_id
+                yield shot
+
+    async def iter_members(self):
+        """
+        Yields the members of a dribbble team as the members pages arrive
+        """
+        async with aclosing(
+            self.iter_listing(
+                "members",
+                lambda page_number: self.user_pages["members"]
+                + str(page_number)
+                + "&per_page="
+                + str(self.members_per_page),
+                "li",
+                "scrolling-row",
+                self.parse_member,
+            )
+        ) as items:
+            async for member_username, member in items:
+                member["username"] = member_username
+                yield member
+
+    async def iter_collection_shots(self, collection_url: str):
+        """
+        Yields the shots of a collection as the collection pages arrive
+
+        Arguments:
+            collection_url: string
+        """
+        async with aclosing(
+            self.iter_listing(
+                "collections",
+                lambda page_number: collection_url + "?page=" + str(page_number),
+                "li",
+                "shot-thumbnail",
+                self.parse_collection_shot,
+            )
+        ) as items:
+            async for shot_id, shot in items:
+                shot["shot_id"] = shot_id
+                yield shot
+
+    async def iter_project_shots(self, project_url: str):
+        """
+        Yields the shots of a project as the project pages arrive
+
+        Arguments:
+            project_url: string
+        """
+        async with aclosing(
+            self.iter_listing(
+                "projects",
+                lambda page_number: project_url + "?page=" + str(page_number),
+                "div",
+                "shot-section-item",
+                self.parse_project_shot,
+            )
+        ) as items:
+            async for shot_id, shot in items:
+                shot["shot_id"] = shot_id
+                yield shot
+
+    async def get_shots_data(self, shots_dict: dict, url_field: str = "shot_url"):
+        """
+        Adds the metadata of their shot page to shots keyed by shot id.
+        A shot page is fetched once per run: shots met again, in another
+        section, reference the metadata in the shot registry.
+
+        Arguments:
+            shots_dict: dict, {shot_id: shot}
+            url_field: string, shot field holding the shot page URL
+        """
+
+        async def listed_shots():
+            for shot_id, shot in list(shots_dict.items()):
+                yield shot_id, shot
+
+        await self.pipeline_shots_data("shots", listed_shots(), shots_dict, url_field)
+
+    async def pipeline_shots_data(
+        self, section: str, listing, shots_dict: dict, url_field: str = "shot_url"
+    ):
+        """
+        Fetches the shot pages of a listing while the listing is still read.
+
+        The listing stage adds every listed shot to shots_dict and hands the
+        shots whose page was not fetched yet to the detail workers through
+        a memory channel of pipeline_buffer shots, waiting while it is full.
+        Listing pages and shot pages have their own concurrency limits,
+        shared by all sections of the user, so the scrape takes about as
+        long as its slower stage. The channel depth seen by every hand-off
+        is kept in pipeline_report.
+
+        Arguments:
+            section: string, reported in pipeline_report
+            listing: async generator of (shot_id, shot) tuples
+            shots_dict: dict, {shot_id: shot}
+            url_field: string, shot field holding the shot page URL
+        """
+        shots_data = []
+        report = self.pipeline_report.setdefault(
+            section, {"listed": 0, "fetched": 0, "max_queue_depth": 0, "queue_depth": 0}
+        )
+        queued_depths = []
+        send_stream, receive_stream = anyio.create_memory_object_stream(
+            self.pipeline_buffer
+        )
+
+        async def list_shots():
+            async with send_stream, aclosing(listing):
+                async for shot_id, shot in listing:
+                    shots_dict[shot_id] = shot
+                    report["listed"] += 1
+                    if shot_id in self.shot_registry:
+                        shot["metadata"] = self.shot_registry[shot_id]
+                        continue
+
+                    # registered before the fetch, so concurrent sections share it
+                    current_shot_data = self.shot_registry[shot_id] = {}
+                    shot["metadata"] = current_shot_data
+                    shots_data.append(current_shot_data)
+
+                    depth = send_stream.statistics().current_buffer_used
+                    queued_depths.append(depth)
+                    report["max_queue_depth"] = max(report["max_queue_depth"], depth)
+                    await send_stream.send((shot[url_field], current_shot_data))
+
+        async def fetch_shots(receive_stream):
+            async with receive_stream:
+                async for shot_url, current_shot_data in receive_stream:
+                    async with self.stage_limiter("detail"):
+                        await self.fetch_shot_data(shot_url, current_shot_data)
+                    report["fetched"] += 1
+
+        async with anyio.create_task_group() as nursery:
+            nursery.start_soon(list_shots)
+            async with receive_stream:
+                for _ in range(self.detail_concurrency):
+                    nursery.start_soon(fetch_shots, receive_stream.clone())
+
+        if queued_depths:
+            report["queue_depth"] = sum(queued_depths) / len(queued_depths)
+        print(
+            "\nShot pipeline of {}: {} listed, {} fetched, queue depth {:0.1f} (max {})".format(
+                section,
+                report["listed"],
+                report["fetched"],
+                report["queue_depth"],
+                report["max_queue_depth"],
+            )
+        )
+
+        # convert the counts and dates of all shots at once
+        self.normalizer.normalize(
+            "shot_metadata",
+            shots_data,
+            {
+                "likes": parse_count,
+                "saves_count": parse_count,
+                "views_count": parse_count,
+                "published_date": date_parser(
+                    self.shot_published_date_format, self.preferred_time_format
+                ),
+            },
+        )
+
+    async def fetch_shot_data(self, shot_url: str, current_shot_data: dict):
+        """
+        Fills the metadata of a shot from its shot page
+
+        Arguments:
+            shot_url: string
+            current_shot_data: dict, metadata of the shot
+        """
+        async with self.open_client() as client:
+            try:
+                shot_page = await self.get_page(client, shot_url, page_type="shot")
+                async with self.open_soup(shot_page, "shot") as shot_page_soup:
                     sselect = SilentSelector(shot_page_soup)
-                    current_shot_data = {}
 
                     # get shot color palette
                     shot_color_palette = [
@@ -1086,56 +1966,180 @@ class DribbbleUser:
                     shot_data_json = chompjs.parse_js_object(
                         shot_data_js, json_params={"strict": False}
                     )
-                    shot_data_dict = dict(shot_data_json)
+                    shot_data = dict(shot_data_json).get("shotData", {})
 
                     # shot metadata
-                    current_shot_data["likes"] = shot_data_dict["shotData"][
-                        "likesCount"
-                    ]
-                    shot_published_date = datetime.strptime(
-                        shot_data_dict["shotData"]["postedOn"],
-                        self.shot_published_date_format,
-                    ).strftime(self.preferred_time_format)
-
-                    current_shot_data["published_date"] = shot_published_date
-                    current_shot_data["saves_count"] = shot_data_dict["shotData"][
-                        "savesCount"
-                    ]
-                    current_shot_data["isAnimated"] = shot_data_dict["shotData"][
-                        "isAnimated"
-                    ]
-                    current_shot_data["isAnimatedGif"] = shot_data_dict["shotData"][
-                        "isAnimatedGif"
-                    ]
-                    current_shot_data["tags"] = shot_data_dict["shotData"]["tags"]
-                    current_shot_data["views_count"] = shot_data_dict["shotData"][
-                        "viewsCount"
-                    ]
+                    current_shot_data["likes"] = shot_data.get("likesCount")
+                    current_shot_data["published_date"] = shot_data.get("postedOn")
+                    current_shot_data["saves_count"] = shot_data.get("savesCount")
+                    current_shot_data["isAnimated"] = shot_data.get("isAnimated")
+                    current_shot_data["isAnimatedGif"] = shot_data.get("isAnimatedGif")
+                    current_shot_data["tags"] = shot_data.get("tags")
+                    current_shot_data["views_count"] = shot_data.get("viewsCount")
 
-                except httpx.RequestError as ex:
-                    print(
-                        f"\nAn error occurred while requesting {ex.request.url!r}.\n {ex}"
-                    )
+            except httpx.RequestError as ex:
+                print(
+                    f"\nAn error occurred while requesting {ex.request.url!r}.\n {ex}"
+                )
 
-                except httpx.HTTPStatusError as ex:
-                    print(
-                        f"\nError response {ex.response.status_code} while requesting {ex.request.url!r}."
-                    )
+            except httpx.HTTPStatusError as ex:
+                print(
+                    f"\nError response {ex.response.status_code} while requesting {ex.request.url!r}."
+                )
 
-            shots_dict[shot_name]["metadata"] = current_shot_data
-        return shots_dict
+    def stage_limiter(self, stage: str) -> anyio.Semaphore:
+        """
+        Returns the concurrency limit of the listing or detail stage of
+        the shot pipelines
+        """
+        # anyio primitives have to be created inside the event loop; a
+        # semaphore, as a stage slot is not owned by the task taking it
+        if stage not in self.stage_limiters:
+            self.stage_limiters[stage] = anyio.Semaphore(
+                self.listing_concurrency
+                if stage == "listing"
+                else self.detail_concurrency
+            )
+        return self.stage_limiters[stage]
 
-    def export_to_json(self):
+    def link_shot_metadata(self):
+        """
+        References the fetched shot metadata from the project and
+        collection shots of the same shot ids
+        """
+        sections_shots = [
+            section.get("shots", {})
+            for sections in (
+                self.dribbble_user_data.get("projects", {}),
+                self.dribbble_user_data.get("collections", {}),
+            )
+            for section in sections.values()
+            if isinstance(section, dict)
+        ]
+        for shots in sections_shots:
+            for shot_id, shot in shots.items():
+                if shot_id in self.shot_registry:
+                    shot["metadata"] = self.shot_registry[shot_id]
+
+    def normalize_count(self, section: str, field: str, count_string: str) -> int:
+        """
+        Converts a single count, recording a parse error as a count of 0
         """
-        Exports the scraped user data as a JSON file
+        record = self.normalizer.normalize(
+            section, [{field: count_string}], {field: parse_count}
+        )[0]
+        return record[field] or 0
 
+    def normalize_shots(self, section: str, shots: list) -> list:
+        """
+        Converts the counts and dates of a batch of listed shots
         """
+        return self.normalizer.normalize(
+            section,
+            shots,
+            {
+                "shot_pub_date": date_parser(
+                    self.project_date_format, self.preferred_time_format
+                ),
+                "shot_likes": parse_count,
+                "shot_views": parse_count,
+            },
+        )
+
+    def wants_field(self, field: str) -> bool:
+        """
+        Check whether a field was requested for export
+        """
+        return self.fields is None or field in self.fields
 
-        # Convert dict to JSON
-        dribbble_json = json.dumps(self.dribbble_user_data)
+    def projected_data(self, load_spilled: bool = True) -> dict:
+        """
+        Returns the scraped user data restricted to the requested fields,
+        with the spilled sections loaded back unless load_spilled is False
+        """
+        if load_spilled:
+            for field, spill_file in self.spilled.items():
+                spill_file.seek(0)
+                self.dribbble_user_data[field] = json.load(spill_file)
+                spill_file.close()
+            self.spilled = {}
+
+        if self.normalizer.errors:
+            self.dribbble_user_data["parse_errors"] = self.normalizer.errors
+
+        if self.deadline is not None or self.section_deadline is not None:
+            self.dribbble_user_data["section_status"] = self.section_status
+
+        if self.fields is None:
+            return self.dribbble_user_data
+
+        return {
+            key: value
+            for key, value in self.dribbble_user_data.items()
+            if key in ("user_exists", "scraped_at", "parse_errors", "section_status")
+            or key in self.fields
+        }
+
+    def is_complete(self) -> bool:
+        """
+        Check whether every scraped section completed within its deadline
+        """
+        return all(status == "complete" for status in self.section_status.values())
+
+    def export_to_json(self):
+        """
+        Exports the scraped user data to json_file, in the data format and
+        compression of its extension, JSON by default
+
+        """
 
-        # Write to JSON file
-        with open(self.json_file, "w") as json_file:
-            json_file.write(dribbble_json)
+        # Write to the data file
+        _, data_format, compression = split_extension(self.json_file)
+        with open(self.json_file, "wb") as data_file, compressed_writer(
+            data_file, compression
+        ) as writer:
+            self.write_data(writer, data_format or "json")
 
         print("\nResults saved to {}".format(self.json_file))
+
+    def write_data(self, data_file, data_format: str = "json"):
+        """
+        Writes the scraped user data to a binary file object. JSON is
+        streamed by write_json, other formats are encoded at once.
+
+        Arguments:
+            data_file: file object opened for writing bytes
+            data_format: string, json or msgpack
+        """
+        with self.profile("export", data_format):
+            if data_format == "json":
+                write_text(data_file, self.write_json)
+            else:
+                data_file.write(dumps(self.projected_data(), data_format))
+
+    def write_json(self, json_file):
+        """
+        Writes the scraped user data as JSON to a file object, copying the
+        spilled sections from their temporary files without loading them
+
+        Arguments:
+            json_file: file object opened for writing text
+        """
+        data = self.projected_data(load_spilled=False)
+        spilled = {
+            field: spill_file
+            for field, spill_file in self.spilled.items()
+            if self.wants_field(field)
+        }
+
+        json_file.write("{")
+        for index, field in enumerate(list(data) + list(spilled)):
+            if index:
+                json_file.write(", ")
+            json_file.write(json_dumps(field) + ": ")
+            if field in spilled:
+                spilled[field].seek(0)
+                shutil.copyfileobj(spilled[field], json_file)
+            else:
+                json_file.write(json_dumps(data[field]))
+        json_file.write("}")
@@ -0,0 +1,203 @@
+import json
+import os
+from urllib.parse import urlsplit, parse_qs
+
+import anyio
+import h11
+
+
+MAX_RECEIVE_BYTES = 64 * 1024
+
+
+class HTTPRequest:
+    """
+    Request received by the HTTP server
+
+    Arguments:
+        method: string
+        target: string
+        headers: dict
+        body: bytes
+    """
+
+    def __init__(self, method: str, target: str, headers: dict, body: bytes):
+        self.method = method
+        self.target = target
+        self.headers = headers
+        self.body = body
+
+        url = urlsplit(target)
+        self.path = url.path
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+    def json(self):
+        """
+        Decodes the request body as JSON
+        """
+        return json.loads(self.body or b"null")
+
+
+class HTTPResponder:
+    """
+    Writes a response to an h11 connection, either at once with send()
+    and send_json() or streamed with start(), write() and finish()
+
+    Arguments:
+        stream: anyio ByteStream
+        connection: h11.Connection
+    """
+
+    def __init__(self, stream, connection: h11.Connection):
+        self.stream = stream
+        self.connection = connection
+        self.started = False
+
+    async def _send_event(self, event):
+        data = self.connection.send(event)
+        if data:
+            await self.stream.send(data)
+
+    async def start(self, status: int, headers: dict):
+        """
+        Sends the status line and headers of a response
+        """
+        self.started = True
+        await self._send_event(
+            h11.Response(
+                status_code=status,
+                headers=[(name, str(value)) for name, value in headers.items()],
+            )
+        )
+
+    async def write(self, data: bytes):
+        """
+        Sends a chunk of the response body
+        """
+        await self._send_event(h11.Data(data=data))
+
+    async def finish(self):
+        """
+        Ends the response body
+        """
+        await self._send_event(h11.EndOfMessage())
+
+    async def send(self, status: int, body: bytes, content_type: str):
+        """
+        Sends a complete response
+        """
+        await self.start(
+            status, {"content-type": content_type, "content-length": len(body)}
+        )
+        await self.write(body)
+        await self.finish()
+
+    async def send_json(self, status: int, data):
+        """
+        Sends a complete JSON response
+        """
+        await self.send(status, json.dumps(data).encode(), "application/json")
+
+
+async def _receive_request(stream, connection: h11.Connection):
+    """
+    Reads events from a connection until a whole request has arrived.
+    Returns None when the client closed the connection.
+    """
+    request = None
+    body = []
+
+    while True:
+        event = connection.next_event()
+
+        if event is h11.NEED_DATA:
+            try:
+                data = await stream.receive(MAX_RECEIVE_BYTES)
+            except (anyio.EndOfStream, anyio.BrokenResourceError):
+                data = b""
+            connection.receive_data(data)
+
+        elif isinstance(event, h11.Request):
+            request = event
+
+        elif isinstance(event, h11.Data):
+            body.append(event.data)
+
+        elif isinstance(event, h11.EndOfMessage):
+            return HTTPRequest(
+                request.method.decode(),
+                request.target.decode(),
+                {
+                    name.decode().lower(): value.decode()
+                    for name, value in request.headers
+                },
+                b"".join(body),
+            )
+
+        else:
+            # ConnectionClosed or PAUSED without a pending request
+            return None
+
+
+def connection_handler(handler):
+    """
+    Wraps a request handler into an anyio listener handler serving
+    keep-alive HTTP/1.1 connections
+
+    Arguments:
+        handler: async callable taking (HTTPRequest, HTTPResponder)
+    """
+
+    async def handle_connection(stream):
+        connection = h11.Connection(h11.SERVER)
+        async with stream:
+            while True:
+                try:
+                    request = await _receive_request(stream, connection)
+                except h11.RemoteProtocolError:
+                    return
+                if request is None:
+                    return
+
+                responder = HTTPResponder(stream, connection)
+                try:
+                    await handler(request, responder)
+                except (anyio.BrokenResourceError, anyio.ClosedResourceError):
+                    return
+                except Exception as ex:
+                    if responder.started:
+                        return
+                    await responder.send_json(500, {"error": str(ex)})
+
+                if (
+                    connection.our_state is h11.DONE
+                    and connection.their_state is h11.DONE
+                ):
+                    connection.start_next_cycle()
+                else:
+                    return
+
+    return handle_connection
+
+
+async def serve_http(
+    handler, host: str = "127.0.0.1", port: int = 8080, unix_socket: str = None
+):
+    """
+    Serves HTTP requests over TCP, or over a Unix socket when a socket
+    path is given, until cancelled
+
+    Arguments:
+        handler: async callable taking (HTTPRequest, HTTPResponder)
+        host: string
+        port: int
+        unix_socket: string
+    """
+    if unix_socket is not None:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        listener = await anyio.create_unix_listener(unix_socket)
+    else:
+        listener = await anyio.create_tcp_listener(local_host=host, local_port=port)
+
+    async with listener:
+        await listener.serve(connection_handler(handler))
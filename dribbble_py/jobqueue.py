@@ -0,0 +1,395 @@
+import os
+import time
+import sqlite3
+import tempfile
+from abc import ABC, abstractmethod
+
+from dribbble_py.serialization import compressed_writer, dumps, output_path
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+
+class Job:
+    """
+    Username job claimed from a queue
+
+    Arguments:
+        job_id: int
+        username: string
+        attempts: int, claims of the job including this one
+    """
+
+    def __init__(self, job_id: int, username: str, attempts: int):
+        self.job_id = job_id
+        self.username = username
+        self.attempts = attempts
+
+    def __repr__(self):
+        return "Job({!r}, {!r}, {!r})".format(self.job_id, self.username, self.attempts)
+
+
+class JobQueue(ABC):
+    """
+    Queue of username jobs claimed by workers under leases.
+
+    A claimed job is leased to one worker until its lease expires. The
+    worker extends the lease with heartbeats while it scrapes; a job whose
+    lease expired, because its worker died or stalled, is claimable again.
+    Lease times come from the clock of each worker, so hosts sharing a
+    queue need roughly synchronised clocks.
+
+    Arguments:
+        max_attempts: int, claims of a job before it is failed for good
+        clock: callable returning the current time in seconds
+    """
+
+    def __init__(self, max_attempts: int = 3, clock=time.time):
+        self.max_attempts = max_attempts
+        self.clock = clock
+
+    @abstractmethod
+    def put(self, usernames: list) -> int:
+        """
+        Queues jobs for usernames which are not queued or running already
+
+        Returns:
+            added: int
+        """
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float):
+        """
+        Leases the oldest claimable job to a worker
+
+        Returns:
+            job: Job, or None when no job is claimable
+        """
+
+    @abstractmethod
+    def heartbeat(self, job: Job, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extends the lease of a job. Returns False when the worker no
+        longer holds the lease.
+        """
+
+    @abstractmethod
+    def complete(self, job: Job, worker_id: str) -> bool:
+        """
+        Marks a leased job as done. Returns False when the worker no
+        longer holds the lease.
+        """
+
+    @abstractmethod
+    def fail(self, job: Job, worker_id: str, error: str) -> bool:
+        """
+        Releases a job after an error, queueing it again unless it ran out
+        of attempts. Returns False when the worker no longer holds the lease.
+        """
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """
+        Queues again the jobs whose lease expired
+
+        Returns:
+            requeued: int
+        """
+
+    @abstractmethod
+    def counts(self) -> dict:
+        """
+        Returns the number of jobs in every state
+        """
+
+    def close(self):
+        pass
+
+
+class MemoryJobQueue(JobQueue):
+    """
+    Job queue held in memory, a local stand-in for tests and single
+    process runs
+    """
+
+    def __init__(self, max_attempts: int = 3, clock=time.time):
+        super().__init__(max_attempts, clock)
+        self.jobs = {}
+
+    def put(self, usernames: list) -> int:
+        active = {
+            job["username"]
+            for job in self.jobs.values()
+            if job["state"] in (QUEUED, LEASED)
+        }
+        added = 0
+        for username in usernames:
+            if username in active:
+                continue
+            active.add(username)
+            self.jobs[len(self.jobs) + 1] = {
+                "username": username,
+                "state": QUEUED,
+                "worker_id": None,
+                "lease_expires": None,
+                "attempts": 0,
+                "error": None,
+            }
+            added += 1
+        return added
+
+    def claim(self, worker_id: str, lease_seconds: float):
+        self.requeue_expired()
+        for job_id, job in self.jobs.items():
+            if job["state"] == QUEUED:
+                job["state"] = LEASED
+                job["worker_id"] = worker_id
+                job["lease_expires"] = self.clock() + lease_seconds
+                job["attempts"] += 1
+                return Job(job_id, job["username"], job["attempts"])
+        return None
+
+    def _leased_to(self, job: Job, worker_id: str):
+        queued_job = self.jobs.get(job.job_id)
+        if (
+            queued_job is None
+            or queued_job["state"] != LEASED
+            or queued_job["worker_id"] != worker_id
+            or queued_job["lease_expires"] < self.clock()
+        ):
+            return None
+        return queued_job
+
+    def heartbeat(self, job: Job, worker_id: str, lease_seconds: float) -> bool:
+        queued_job = self._leased_to(job, worker_id)
+        if queued_job is None:
+            return False
+        queued_job["lease_expires"] = self.clock() + lease_seconds
+        return True
+
+    def complete(self, job: Job, worker_id: str) -> bool:
+        queued_job = self._leased_to(job, worker_id)
+        if queued_job is None:
+            return False
+        queued_job["state"] = DONE
+        return True
+
+    def fail(self, job: Job, worker_id: str, error: str) -> bool:
+        queued_job = self._leased_to(job, worker_id)
+        if queued_job is None:
+            return False
+        queued_job["error"] = error
+        if queued_job["attempts"] >= self.max_attempts:
+            queued_job["state"] = FAILED
+        else:
+            queued_job["state"] = QUEUED
+        return True
+
+    def requeue_expired(self) -> int:
+        requeued = 0
+        now = self.clock()
+        for job in self.jobs.values():
+            if job["state"] == LEASED and job["lease_expires"] < now:
+                job["state"] = QUEUED if job["attempts"] < self.max_attempts else FAILED
+                requeued += job["state"] == QUEUED
+        return requeued
+
+    def counts(self) -> dict:
+        counts = dict.fromkeys((QUEUED, LEASED, DONE, FAILED), 0)
+        for job in self.jobs.values():
+            counts[job["state"]] += 1
+        return counts
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue in a SQLite database, shareable between processes and, on
+    a shared volume with working file locks, between hosts
+
+    Arguments:
+        path: string, database file
+        max_attempts: int
+        clock: callable returning the current time in seconds
+        busy_timeout: float, seconds to wait for a locked database
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = 3,
+        clock=time.time,
+        busy_timeout: float = 30,
+    ):
+        super().__init__(max_attempts, clock)
+        # workers call the queue from a thread, one call at a time
+        self.db = sqlite3.connect(
+            path, timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                state TEXT NOT NULL,
+                worker_id TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            )
+            """
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, job_id)")
+
+    def _transaction(self, statements):
+        """
+        Runs statements in a write transaction, returning their results
+        """
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            results = statements()
+            self.db.execute("COMMIT")
+            return results
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def put(self, usernames: list) -> int:
+        def statements():
+            active = {
+                username
+                for (username,) in self.db.execute(
+                    "SELECT username FROM jobs WHERE state IN (?, ?)", (QUEUED, LEASED)
+                )
+            }
+            new_usernames = []
+            for username in usernames:
+                if username not in active:
+                    active.add(username)
+                    new_usernames.append((username, QUEUED))
+            self.db.executemany(
+                "INSERT INTO jobs (username, state) VALUES (?, ?)", new_usernames
+            )
+            return len(new_usernames)
+
+        return self._transaction(statements)
+
+    def _requeue_expired(self) -> int:
+        now = self.clock()
+        self.db.execute(
+            """
+            UPDATE jobs SET state = ?
+            WHERE state = ? AND lease_expires < ? AND attempts >= ?
+            """,
+            (FAILED, LEASED, now, self.max_attempts),
+        )
+        return self.db.execute(
+            "UPDATE jobs SET state = ? WHERE state = ? AND lease_expires < ?",
+            (QUEUED, LEASED, now),
+        ).rowcount
+
+    def claim(self, worker_id: str, lease_seconds: float):
+        def statements():
+            self._requeue_expired()
+            row = self.db.execute(
+                "SELECT job_id, username, attempts FROM jobs "
+                "WHERE state = ? ORDER BY job_id LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            job_id, username, attempts = row
+            self.db.execute(
+                """
+                UPDATE jobs SET state = ?, worker_id = ?, lease_expires = ?,
+                    attempts = attempts + 1
+                WHERE job_id = ?
+                """,
+                (LEASED, worker_id, self.clock() + lease_seconds, job_id),
+            )
+            return Job(job_id, username, attempts + 1)
+
+        return self._transaction(statements)
+
+    def _update_leased(self, job: Job, worker_id: str, assignments: str, values):
+        cursor = self.db.execute(
+            "UPDATE jobs SET "
+            + assignments
+            + " WHERE job_id = ? AND state = ? AND worker_id = ? AND lease_expires >= ?",
+            tuple(values) + (job.job_id, LEASED, worker_id, self.clock()),
+        )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job: Job, worker_id: str, lease_seconds: float) -> bool:
+        return self._update_leased(
+            job, worker_id, "lease_expires = ?", (self.clock() + lease_seconds,)
+        )
+
+    def complete(self, job: Job, worker_id: str) -> bool:
+        return self._update_leased(job, worker_id, "state = ?", (DONE,))
+
+    def fail(self, job: Job, worker_id: str, error: str) -> bool:
+        state = FAILED if job.attempts >= self.max_attempts else QUEUED
+        return self._update_leased(
+            job, worker_id, "state = ?, error = ?", (state, error)
+        )
+
+    def requeue_expired(self) -> int:
+        return self._transaction(self._requeue_expired)
+
+    def counts(self) -> dict:
+        counts = dict.fromkeys((QUEUED, LEASED, DONE, FAILED), 0)
+        for state, count in self.db.execute(
+            "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+        ):
+            counts[state] = count
+        return counts
+
+    def close(self):
+        self.db.close()
+
+
+class DirectorySink:
+    """
+    Result sink writing one data file per username into a directory,
+    which several workers can share
+
+    Arguments:
+        path: string
+        data_format: string, json or msgpack
+        compression: string, gzip, zstd or None
+    """
+
+    def __init__(self, path: str, data_format: str = "json", compression: str = None):
+        self.path = path
+        self.data_format = data_format
+        self.compression = compression
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, username: str, data) -> str:
+        """
+        Writes the data of a user atomically, so readers never see a
+        partially written file
+
+        Arguments:
+            username: string
+            data: dict, or callable writing the data to a binary file object
+                in a data format
+
+        Returns:
+            file_path: string
+        """
+        file_path = output_path(
+            os.path.join(self.path, username), self.data_format, self.compression
+        )
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.path, prefix="." + username, suffix=".tmp"
+        )
+        with os.fdopen(file_descriptor, "wb") as temporary_file, compressed_writer(
+            temporary_file, self.compression
+        ) as writer:
+            if callable(data):
+                data(writer, self.data_format)
+            else:
+                writer.write(dumps(data, self.data_format))
+        os.replace(temporary_path, file_path)
+        return file_path
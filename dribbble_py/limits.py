@@ -0,0 +1,223 @@
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+
+import anyio
+
+# Default request classes of RequestScheduler, in priority order
+PRIORITIES = {"interactive": 1.0, "bulk": 0.75}
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many requests start per second. Waiting
+    callers are served in arrival order.
+
+    Arguments:
+        rate: float, requests per second
+        burst: float, requests allowed at once after an idle period,
+            defaults to one second worth of requests
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = None
+        self.lock = None
+
+    def _refill(self):
+        now = anyio.current_time()
+        if self.updated is not None:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+        self.updated = now
+
+    async def acquire(self):
+        """
+        Waits until a request may start
+        """
+        # anyio primitives have to be created inside the event loop
+        if self.lock is None:
+            self.lock = anyio.Lock()
+
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await anyio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+class RequestScheduler:
+    """
+    Connection slots shared by priority classes of requests.
+
+    A freed slot goes to the waiting request of the first class, in
+    priority order, which is below its concurrency share. Within a class,
+    slots are shared between flows, such as users or jobs, by weighted
+    fair queuing: every flow gets slots in proportion to its weight,
+    however many requests it queued.
+
+    Arguments:
+        max_connections: int, requests in flight
+        shares: dict of class name to the fraction of max_connections the
+            class may use, in priority order. Defaults to interactive
+            requests using every slot and bulk requests all but a quarter,
+            which stays free for interactive requests.
+    """
+
+    def __init__(self, max_connections: int, shares: dict = None):
+        self.max_connections = max_connections
+        if shares is None:
+            shares = PRIORITIES
+        self.limits = {
+            priority: max(1, int(max_connections * share))
+            for priority, share in shares.items()
+        }
+
+        self.in_flight = 0
+        self.class_in_flight = dict.fromkeys(self.limits, 0)
+        self.queues = {priority: [] for priority in self.limits}
+        self.virtual_time = dict.fromkeys(self.limits, 0.0)
+        self.flow_finish = {priority: {} for priority in self.limits}
+        self.order = itertools.count()
+
+    def _free(self, priority: str) -> bool:
+        return (
+            self.in_flight < self.max_connections
+            and self.class_in_flight[priority] < self.limits[priority]
+        )
+
+    def _grant(self, priority: str):
+        self.in_flight += 1
+        self.class_in_flight[priority] += 1
+
+    def _release(self, priority: str):
+        self.in_flight -= 1
+        self.class_in_flight[priority] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """
+        Hands free slots to waiting requests, highest priority first
+        """
+        for priority, queue in self.queues.items():
+            while queue and self._free(priority):
+                finish, _, waiter = heapq.heappop(queue)
+                if waiter["cancelled"]:
+                    continue
+                self.virtual_time[priority] = finish
+                waiter["granted"] = True
+                self._grant(priority)
+                waiter["event"].set()
+
+            # with an empty queue no flow is ahead of the virtual time
+            if not queue:
+                self.flow_finish[priority].clear()
+
+    async def acquire(self, priority: str = "bulk", flow=None, weight: float = 1.0):
+        """
+        Waits for a connection slot
+
+        Arguments:
+            priority: string, class of the request
+            flow: hashable, user or job the request belongs to
+            weight: float, share of the flow within its class
+        """
+        if priority not in self.limits:
+            raise ValueError("Unknown priority: {}".format(priority))
+
+        if not self.queues[priority] and self._free(priority):
+            self._grant(priority)
+            return
+
+        # finish tag of the request in the virtual time of its class
+        flow_finish = self.flow_finish[priority]
+        finish = (
+            max(self.virtual_time[priority], flow_finish.get(flow, 0.0)) + 1 / weight
+        )
+        flow_finish[flow] = finish
+
+        waiter = {"event": anyio.Event(), "granted": False, "cancelled": False}
+        heapq.heappush(self.queues[priority], (finish, next(self.order), waiter))
+        try:
+            await waiter["event"].wait()
+        except BaseException:
+            if waiter["granted"]:
+                self._release(priority)
+            else:
+                waiter["cancelled"] = True
+            raise
+
+    def release(self, priority: str = "bulk"):
+        """
+        Frees the connection slot of a finished request
+        """
+        self._release(priority)
+
+    @asynccontextmanager
+    async def slot(self, priority: str = "bulk", flow=None, weight: float = 1.0):
+        """
+        Holds a connection slot for the duration of a request
+        """
+        await self.acquire(priority, flow, weight)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+
+class MemoryBudget:
+    """
+    Bounds the bytes of HTML parsed into trees at the same time. A page
+    waits until its bytes fit in the budget, unless no page is held, so a
+    page larger than the budget still gets parsed alone.
+
+    A task parsing a page inside another page it holds never waits: its
+    outer page could otherwise never be released.
+
+    Arguments:
+        max_bytes: int
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.holders = {}
+        self.condition = None
+
+    @asynccontextmanager
+    async def hold(self, size: int):
+        """
+        Holds size bytes of the budget
+        """
+        # anyio primitives have to be created inside the event loop
+        if self.condition is None:
+            self.condition = anyio.Condition()
+
+        task_id = anyio.get_current_task().id
+        async with self.condition:
+            if task_id not in self.holders:
+                while self.used and self.used + size > self.max_bytes:
+                    await self.condition.wait()
+            self.used += size
+            self.holders[task_id] = self.holders.get(task_id, 0) + 1
+
+        try:
+            yield
+        finally:
+            with anyio.CancelScope(shield=True):
+                async with self.condition:
+                    self.used -= size
+                    self.holders[task_id] -= 1
+                    if not self.holders[task_id]:
+                        del self.holders[task_id]
+                    self.condition.notify_all()
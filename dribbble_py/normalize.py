@@ -0,0 +1,125 @@
+import re
+from datetime import datetime
+from functools import lru_cache, partial
+
+PREFERRED_DATE_FORMAT = "%Y-%m-%d"
+
+# UTC time at which a user was scraped, stored with the exported data
+SCRAPED_AT_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Optional thousands or millions suffix attached to a number, e.g. 1.2k or
+# 3M, which is not the first letter of a word as in "12 members". The
+# boundaries keep a match from starting or ending inside a token such as
+# "12kB" or "123mm".
+COUNT_PATTERN = re.compile(
+    r"(?<!\d)(?<!\d\.)(\d+(?:\.\d+)?)([kKmM])?(?![\da-zA-Z]|\.\d)"
+)
+COUNT_MULTIPLIERS = {"": 1, "k": 1000, "m": 1000000}
+
+
+@lru_cache(maxsize=65536)
+def parse_count(count_string) -> int:
+    """
+    Converts a displayed count to an integer. Thousands separators, k/M
+    suffixes and trailing words such as "Shots" are handled; a missing
+    count is 0.
+
+    Arguments:
+        count_string: string
+
+    Returns:
+        count: int
+    """
+    if count_string is None:
+        return 0
+    if isinstance(count_string, int):
+        return count_string
+
+    match = COUNT_PATTERN.search(count_string.replace(",", ""))
+    if match is None:
+        raise ValueError("Not a count: {!r}".format(count_string))
+
+    number, suffix = match.groups()
+    return int(round(float(number) * COUNT_MULTIPLIERS[(suffix or "").lower()]))
+
+
+@lru_cache(maxsize=65536)
+def parse_date(
+    date_string: str, date_format: str, output_format: str = PREFERRED_DATE_FORMAT
+) -> str:
+    """
+    Reformats a date string. Memoized, as the distinct dates of a scrape
+    are few compared to the dates parsed.
+
+    Arguments:
+        date_string: string
+        date_format: string, strptime format of date_string
+        output_format: string
+
+    Returns:
+        date: string
+    """
+    if date_string is None:
+        raise ValueError("Missing date")
+    return datetime.strptime(date_string.strip(), date_format).strftime(output_format)
+
+
+def date_parser(date_format: str, output_format: str = PREFERRED_DATE_FORMAT):
+    """
+    Returns a converter parsing dates of the given format
+    """
+    return partial(parse_date, date_format=date_format, output_format=output_format)
+
+
+class Normalizer:
+    """
+    Converts the raw strings extracted from pages into typed values, a
+    batch of records at a time. A value which cannot be converted is set
+    to None and recorded in errors, instead of failing the whole page.
+
+    Arguments:
+        profiler: PhaseProfiler timing every batch as a normalize phase
+    """
+
+    def __init__(self, profiler=None):
+        self.errors = []
+        self.profiler = profiler
+
+    def normalize(self, section: str, records: list, converters: dict) -> list:
+        """
+        Converts the fields of records in place
+
+        Arguments:
+            section: string, reported with parse errors
+            records: list of dicts
+            converters: dict of field name to converter
+
+        Returns:
+            records: list
+        """
+        if self.profiler is None:
+            return self.convert(section, records, converters)
+        with self.profiler.phase("normalize", section):
+            return self.convert(section, records, converters)
+
+    def convert(self, section: str, records: list, converters: dict) -> list:
+        """
+        Converts the fields of records in place, without profiling
+        """
+        for record in records:
+            for field, converter in converters.items():
+                if field not in record:
+                    continue
+                try:
+                    record[field] = converter(record[field])
+                except (ValueError, TypeError) as ex:
+                    self.errors.append(
+                        {
+                            "section": section,
+                            "field": field,
+                            "value": record[field],
+                            "error": str(ex),
+                        }
+                    )
+                    record[field] = None
+        return records
@@ -0,0 +1,337 @@
+import os
+import sys
+import argparse
+import textwrap
+
+from dribbble_py.diff import snapshot_files
+from dribbble_py.serialization import load
+from dribbble_py.utils import iter_user_shots
+
+# numpy is optional, see the palette extra of setup.py
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# sRGB to CIE XYZ under the D65 white point, and the white point itself
+SRGB_TO_XYZ = (
+    (0.4124564, 0.3575761, 0.1804375),
+    (0.2126729, 0.7151522, 0.0721750),
+    (0.0193339, 0.1191920, 0.9503041),
+)
+D65_WHITE = (0.95047, 1.0, 1.08883)
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("palette indexes need: pip install dribbble-py[palette]")
+
+
+def parse_hex(color: str):
+    """
+    Returns the (r, g, b) bytes of a hex colour such as #ff6600 or f60, or
+    None when it is not a hex colour
+    """
+    color = str(color).strip().lstrip("#")
+    if len(color) == 3:
+        color = "".join(digit * 2 for digit in color)
+    if len(color) != 6:
+        return None
+    try:
+        return tuple(int(color[index : index + 2], 16) for index in (0, 2, 4))
+    except ValueError:
+        return None
+
+
+def rgb_to_lab(rgb):
+    """
+    Converts sRGB colours to CIELAB, where euclidean distances follow the
+    perceived colour difference
+
+    Arguments:
+        rgb: array of shape (n, 3), bytes from 0 to 255
+
+    Returns:
+        lab: float32 array of shape (n, 3)
+    """
+    require_numpy()
+    rgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3) / 255
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ np.array(SRGB_TO_XYZ).T / np.array(D65_WHITE)
+
+    epsilon = (6 / 29) ** 3
+    f = np.where(xyz > epsilon, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    lab = np.empty_like(f)
+    lab[:, 0] = 116 * f[:, 1] - 16
+    lab[:, 1] = 500 * (f[:, 0] - f[:, 1])
+    lab[:, 2] = 200 * (f[:, 1] - f[:, 2])
+    return lab.astype(np.float32)
+
+
+def parse_palette(palette: list) -> list:
+    """
+    Returns the valid colours of a palette as (r, g, b) tuples
+    """
+    return [rgb for rgb in map(parse_hex, palette or []) if rgb is not None]
+
+
+class PaletteIndex:
+    """
+    Colour palettes of shots in CIELAB, stored as flat arrays so every
+    query is a few vectorized passes over all colours.
+
+    The palette of the shot at position i is colors[starts[i]:starts[i+1]],
+    the last palette ending at the end of colors. Shots without a valid
+    colour are not indexed.
+
+    Arguments:
+        colors: float32 array of shape (colours, 3)
+        starts: int64 array of shape (shots,)
+        shot_ids: string array of shape (shots,)
+    """
+
+    def __init__(self, colors, starts, shot_ids):
+        require_numpy()
+        self.colors = colors
+        self.starts = starts
+        self.shot_ids = shot_ids
+        self.lengths = np.diff(np.append(starts, len(colors)))
+        self.squared_norms = np.einsum("ij,ij->i", colors, colors)
+
+    @classmethod
+    def build(cls, palettes) -> "PaletteIndex":
+        """
+        Builds an index from palettes of hex colours
+
+        Arguments:
+            palettes: iterable of (shot_id, palette) tuples, a later
+                palette of a shot id replaces the earlier ones
+
+        Returns:
+            palette_index: PaletteIndex
+        """
+        require_numpy()
+        shot_palettes = {}
+        for shot_id, palette in palettes:
+            rgb = parse_palette(palette)
+            if rgb:
+                shot_palettes[str(shot_id)] = rgb
+
+        lengths = np.array([len(rgb) for rgb in shot_palettes.values()], np.int64)
+        colors = rgb_to_lab([color for rgb in shot_palettes.values() for color in rgb])
+        return cls(
+            colors, np.cumsum(lengths) - lengths, np.array(list(shot_palettes), str)
+        )
+
+    @classmethod
+    def from_snapshots(cls, paths: list) -> "PaletteIndex":
+        """
+        Builds an index from the shot metadata of user files or batch
+        output directories
+        """
+
+        def palettes():
+            for path in paths:
+                for file_path in snapshot_files(path).values():
+                    for shot_id, shot in iter_user_shots(load(file_path)):
+                        metadata = shot.get("metadata") or {}
+                        yield shot_id, metadata.get("color_palette")
+
+        return cls.build(palettes())
+
+    def save(self, path: str):
+        """
+        Saves the index as .npy files in a directory
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "colors.npy"), self.colors)
+        np.save(os.path.join(path, "starts.npy"), self.starts)
+        np.save(os.path.join(path, "shot_ids.npy"), self.shot_ids)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "PaletteIndex":
+        """
+        Loads an index saved by save, memory-mapping its arrays by default
+        so only the pages touched by queries are read
+        """
+        require_numpy()
+        mmap_mode = "r" if mmap else None
+        return cls(
+            *(
+                np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode)
+                for name in ("colors", "starts", "shot_ids")
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.shot_ids)
+
+    def squared_distances(self, lab):
+        """
+        Returns the squared distances of colours to every indexed colour
+
+        Arguments:
+            lab: array of shape (k, 3)
+
+        Returns:
+            squared_distances: float32 array of shape (k, colours)
+        """
+        squared = (-2 * lab) @ self.colors.T
+        squared += self.squared_norms[None, :]
+        squared += np.einsum("ij,ij->i", lab, lab)[:, None]
+        return np.maximum(squared, 0, out=squared)
+
+    def top(self, scores, limit: int, exclude: str = None) -> list:
+        """
+        Returns the shot ids with the lowest scores, lowest first
+        """
+        if exclude is not None:
+            scores = np.where(self.shot_ids == exclude, np.inf, scores)
+        limit = min(limit, len(scores))
+        if not limit:
+            return []
+
+        best = np.argpartition(scores, limit - 1)[:limit]
+        best = best[np.argsort(scores[best])]
+        return [
+            (str(self.shot_ids[index]), float(scores[index]))
+            for index in best
+            if np.isfinite(scores[index])
+        ]
+
+    def near_color(self, color: str, limit: int = 20) -> list:
+        """
+        Returns the shots holding the colours closest to a colour
+
+        Arguments:
+            color: string, hex colour
+            limit: int
+
+        Returns:
+            [(shot_id, distance), ...]: list, distance in CIELAB units
+        """
+        rgb = parse_hex(color)
+        if rgb is None:
+            raise ValueError("not a hex colour: {!r}".format(color))
+        if not len(self):
+            return []
+
+        squared = self.squared_distances(rgb_to_lab([rgb]))[0]
+        return self.top(np.sqrt(np.minimum.reduceat(squared, self.starts)), limit)
+
+    def palette_of(self, shot_id: str):
+        """
+        Returns the CIELAB palette of an indexed shot, or None
+        """
+        positions = np.flatnonzero(self.shot_ids == str(shot_id))
+        if not len(positions):
+            return None
+        start = self.starts[positions[0]]
+        return self.colors[start : start + self.lengths[positions[0]]]
+
+    def similar(self, palette, limit: int = 20, exclude: str = None) -> list:
+        """
+        Returns the shots whose palettes are closest to a palette. The
+        distance of two palettes averages the distance of each colour to
+        the closest colour of the other palette, both ways.
+
+        Arguments:
+            palette: list of hex colours, or CIELAB array of shape (k, 3)
+            limit: int
+            exclude: string, shot id left out of the results
+
+        Returns:
+            [(shot_id, distance), ...]: list
+        """
+        if isinstance(palette, list):
+            rgb = parse_palette(palette)
+            if not rgb:
+                raise ValueError("no hex colour in palette {!r}".format(palette))
+            palette = rgb_to_lab(rgb)
+        if not len(self):
+            return []
+
+        # square roots are only taken of the minimums
+        squared = self.squared_distances(np.asarray(palette, np.float32))
+        query_to_shot = np.sqrt(np.minimum.reduceat(squared, self.starts, axis=1)).mean(
+            0
+        )
+        shot_to_query = (
+            np.add.reduceat(np.sqrt(squared.min(0)), self.starts) / self.lengths
+        )
+        return self.top((query_to_shot + shot_to_query) / 2, limit, exclude)
+
+    def similar_to_shot(self, shot_id: str, limit: int = 20) -> list:
+        """
+        Returns the shots whose palettes are closest to an indexed shot
+        """
+        palette = self.palette_of(shot_id)
+        if palette is None:
+            raise ValueError("shot {} is not indexed".format(shot_id))
+        return self.similar(palette, limit, exclude=str(shot_id))
+
+
+def main(argv=None):
+    argv = sys.argv[2:] if argv is None else argv
+    argparser = argparse.ArgumentParser(
+        prog="drbl_py palette",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description=textwrap.dedent(
+            """
+            Index the colour palettes of scraped shots and search them\n
+             """
+        ),
+        epilog="""
+        Example usage
+        -------------\n
+        Index the shots of a batch scrape with metadata.\n
+            $ drbl_py palette build results\n
+
+        Print the shots holding a colour close to orange.\n
+            $ drbl_py palette near --color "#ff6600"\n
+
+        Print the shots with a palette similar to a shot.\n
+            $ drbl_py palette similar --shot 123\n
+        """,
+    )
+    argparser.add_argument("action", choices=("build", "near", "similar"))
+    argparser.add_argument(
+        "paths", nargs="*", help="User files or directories to index.\n"
+    )
+    argparser.add_argument(
+        "--index",
+        default="palette_index",
+        help="Index directory.\nDefault = palette_index\n",
+    )
+    argparser.add_argument("--color", help="Hex colour to search for.\n")
+    argparser.add_argument("--shot", help="Shot id whose palette to match.\n")
+    argparser.add_argument("--palette", help="Comma separated hex colours to match.\n")
+    argparser.add_argument(
+        "--limit", type=int, default=20, help="Shots to print.\nDefault = 20\n"
+    )
+    args = argparser.parse_args(argv)
+
+    try:
+        if args.action == "build":
+            palette_index = PaletteIndex.from_snapshots(args.paths)
+            palette_index.save(args.index)
+            print("✓ {} shot palettes indexed".format(len(palette_index)))
+            return
+
+        palette_index = PaletteIndex.load(args.index)
+        if args.action == "near":
+            if args.color is None:
+                argparser.error("near needs --color")
+            matches = palette_index.near_color(args.color, args.limit)
+        elif args.shot is not None:
+            matches = palette_index.similar_to_shot(args.shot, args.limit)
+        elif args.palette is not None:
+            matches = palette_index.similar(args.palette.split(","), args.limit)
+        else:
+            argparser.error("similar needs --shot or --palette")
+    except (ImportError, ValueError) as ex:
+        print(ex)
+        sys.exit(1)
+
+    for shot_id, distance in matches:
+        print("{}\t{:0.1f}".format(shot_id, distance))
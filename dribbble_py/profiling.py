@@ -0,0 +1,141 @@
+import io
+import time
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager
+
+import anyio
+
+# Phases of a scrape, in the order a page goes through them
+PHASES = ("fetch", "parse", "extract", "normalize", "export")
+
+
+class PhaseProfiler:
+    """
+    Attributes the time of a scrape to named phases per page type, and
+    optionally profiles every function call with cProfile.
+
+    Phases nest: the time of a phase excludes the phases opened inside
+    it, e.g. the fetch of a collection page inside the extraction of the
+    collections page. Times are wall clock per task, so the network waits
+    of concurrent tasks add up to more than the duration of the run.
+
+    Arguments:
+        functions: bool, profile function calls with cProfile in run()
+    """
+
+    def __init__(self, functions: bool = True):
+        self.phases = {}
+        self.stacks = {}
+        self.open_phases = {}
+        self.function_profile = cProfile.Profile() if functions else None
+
+    def _task_key(self):
+        # outside of an event loop, e.g. during the export, phases belong
+        # to the thread
+        try:
+            return anyio.get_current_task().id
+        except Exception:
+            return threading.get_ident()
+
+    @contextmanager
+    def phase(self, phase: str, page_type: str):
+        """
+        Times a phase of a page type
+        """
+        task_key = self._task_key()
+        open_phases = self.open_phases.setdefault(task_key, [])
+        frame = [phase + ":" + page_type, time.perf_counter(), 0.0]
+        open_phases.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame[1]
+            stack = ";".join(open_frame[0] for open_frame in open_phases)
+            open_phases.pop()
+            if open_phases:
+                open_phases[-1][2] += elapsed
+            else:
+                del self.open_phases[task_key]
+
+            own_time = elapsed - frame[2]
+            totals = self.phases.setdefault((phase, page_type), [0, 0.0])
+            totals[0] += 1
+            totals[1] += own_time
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + own_time
+
+    @contextmanager
+    def run(self):
+        """
+        Profiles the function calls made inside the block
+        """
+        if self.function_profile is None:
+            yield
+            return
+
+        self.function_profile.enable()
+        try:
+            yield
+        finally:
+            self.function_profile.disable()
+
+    def report(self, top_functions: int = 20) -> str:
+        """
+        Returns the time per phase and page type, followed by the functions
+        with the most cumulative time
+
+        Arguments:
+            top_functions: int
+
+        Returns:
+            report: string
+        """
+        total = sum(seconds for _, seconds in self.phases.values()) or 1.0
+        lines = [
+            "{:<10} {:<12} {:>7} {:>10} {:>7}".format(
+                "Phase", "Page", "Calls", "Seconds", "Share"
+            )
+        ]
+        for (phase, page_type), (calls, seconds) in sorted(
+            self.phases.items(),
+            key=lambda item: (PHASES.index(item[0][0]), -item[1][1]),
+        ):
+            lines.append(
+                "{:<10} {:<12} {:>7} {:>10.3f} {:>6.1f}%".format(
+                    phase, page_type, calls, seconds, 100 * seconds / total
+                )
+            )
+
+        if self.function_profile is not None and self.function_profile.getstats():
+            stream = io.StringIO()
+            stats = pstats.Stats(self.function_profile, stream=stream)
+            stats.sort_stats("cumulative").print_stats(top_functions)
+            lines += ["", stream.getvalue().strip()]
+        return "\n".join(lines) + "\n"
+
+    def write(self, prefix: str) -> list:
+        """
+        Writes the report to prefix.txt, the phase stacks in the folded
+        format of flamegraph.pl and speedscope to prefix.folded, with
+        microseconds as sample counts, and the function profile to
+        prefix.pstats
+
+        Arguments:
+            prefix: string
+
+        Returns:
+            file_paths: list
+        """
+        file_paths = [prefix + ".txt", prefix + ".folded"]
+        with open(prefix + ".txt", "w") as report_file:
+            report_file.write(self.report())
+
+        with open(prefix + ".folded", "w") as stacks_file:
+            for stack, seconds in sorted(self.stacks.items()):
+                stacks_file.write("{} {}\n".format(stack, round(seconds * 1e6)))
+
+        if self.function_profile is not None and self.function_profile.getstats():
+            self.function_profile.dump_stats(prefix + ".pstats")
+            file_paths.append(prefix + ".pstats")
+        return file_paths
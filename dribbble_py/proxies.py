@@ -0,0 +1,311 @@
+import itertools
+from contextlib import asynccontextmanager
+
+import anyio
+import httpx
+
+from dribbble_py.limits import RateLimiter
+
+# Browser identities rotated between exits. The headers of one profile
+# are sent together, so an exit never mixes two browsers.
+HEADER_PROFILES = (
+    {
+        "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/97.0.4690.0 Safari/537.36",
+        "accept-language": "en-US,en;q=0.9",
+        "sec-ch-ua-platform": '"Windows"',
+    },
+    {
+        "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/97.0.4692.71 Safari/537.36",
+        "accept-language": "en-GB,en;q=0.9",
+        "sec-ch-ua-platform": '"macOS"',
+    },
+    {
+        "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:96.0) Gecko/20100101 Firefox/96.0",
+        "accept-language": "en-US,en;q=0.5",
+    },
+    {
+        "user-agent": "Mozilla/5.0 (X11; Linux x86_64; rv:96.0) Gecko/20100101 Firefox/96.0",
+        "accept-language": "en-US,en;q=0.5",
+    },
+    {
+        "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.2 Safari/605.1.15",
+        "accept-language": "en-US,en;q=0.9",
+    },
+)
+
+# Markers of the bot challenge pages served instead of the requested page.
+# Captcha widgets alone are no marker: ordinary pages load them too.
+CHALLENGE_MARKERS = (
+    b"challenge-platform",
+    b"cf-challenge",
+    b"<title>just a moment",
+)
+
+# Weight of the latest outcome in the health score of an exit
+HEALTH_DECAY = 0.2
+
+# Longest cooldown, as a multiple of the base cooldown
+MAX_BACKOFF = 16
+
+
+def is_challenge_page(chunk: bytes) -> bool:
+    """
+    Check whether the start of a page is a bot challenge
+    """
+    head = chunk[:8192].lower()
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+def is_blocked(response: httpx.Response) -> bool:
+    """
+    Check whether response headers show a throttled or challenged request
+    """
+    return response.status_code == 429 or (
+        response.status_code in (403, 503)
+        and response.headers.get("cf-mitigated") == "challenge"
+    )
+
+
+def retry_after(response: httpx.Response) -> float:
+    """
+    Returns the seconds of the Retry-After header of a response, or 0
+    """
+    try:
+        return float(response.headers.get("retry-after", 0))
+    except ValueError:
+        return 0
+
+
+class Exit:
+    """
+    Egress of the requests of a proxy pool: a proxy, or the host itself
+
+    Arguments:
+        proxy: string, proxy URL, None to connect directly
+        rate: float, requests per second through the exit, None for no
+            limit
+        headers: dict, header profile sent through the exit
+    """
+
+    def __init__(self, proxy: str = None, rate: float = None, headers: dict = None):
+        self.proxy = proxy
+        self.rate_limiter = RateLimiter(rate) if rate else None
+        self.headers = headers or {}
+        self.client = None
+
+        self.health = 1.0
+        self.in_flight = 0
+        self.strikes = 0
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+        self.requests = 0
+        self.blocked = 0
+        self.errors = 0
+
+    def __repr__(self):
+        return "Exit({!r})".format(self.proxy or "direct")
+
+    def record(self, success: bool):
+        """
+        Updates the health score with the outcome of a request
+        """
+        self.health = (1 - HEALTH_DECAY) * self.health + HEALTH_DECAY * success
+        if success:
+            self.strikes = 0
+
+    def report(self) -> dict:
+        return {
+            "proxy": self.proxy or "direct",
+            "health": round(self.health, 3),
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "errors": self.errors,
+        }
+
+
+class ProxyPool:
+    """
+    Spreads requests across egress proxies, each with its own rate limit,
+    client and header profile.
+
+    Every request goes through the exit which is least loaded relative to
+    its health score, among the exits which are not cooling down. An exit
+    answered with a 429 or a challenge page cools down for cooldown
+    seconds, or for the Retry-After of the response when it is longer,
+    doubling with every further block until a request succeeds. Its
+    header profile is rotated before it is used again. A blocked request
+    is retried through another exit.
+
+    Clients are opened when the pool is entered as an async context and
+    closed when its last user leaves, so scrapers sharing a pool may each
+    enter it.
+
+    Arguments:
+        proxies: list of proxy URLs, None or "direct" for the host itself
+        rate: float, requests per second through every exit, None for no
+            limit
+        cooldown: float, seconds an exit rests after its first block
+        retries: int, exits tried after a blocked request
+        header_profiles: list of header dicts rotated between exits
+        client_factory: callable returning the httpx.AsyncClient of a
+            proxy URL
+    """
+
+    def __init__(
+        self,
+        proxies: list,
+        rate: float = None,
+        cooldown: float = 60,
+        retries: int = 2,
+        header_profiles: list = HEADER_PROFILES,
+        client_factory=None,
+    ):
+        if not proxies:
+            raise ValueError("a proxy pool needs at least one proxy")
+
+        self.cooldown = cooldown
+        self.retries = retries
+        self.profiles = itertools.cycle(header_profiles)
+        self.client_factory = client_factory or (
+            lambda proxy: httpx.AsyncClient(proxies=proxy)
+        )
+        self.exits = [
+            Exit(
+                None if proxy in (None, "direct") else proxy, rate, next(self.profiles)
+            )
+            for proxy in proxies
+        ]
+        self.users = 0
+        self.leases = {}
+
+    async def __aenter__(self):
+        if not self.users:
+            for egress in self.exits:
+                egress.client = self.client_factory(egress.proxy)
+        self.users += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.users -= 1
+        if not self.users:
+            with anyio.CancelScope(shield=True):
+                for egress in self.exits:
+                    await egress.client.aclose()
+                    egress.client = None
+
+    async def acquire(self, exclude=()) -> Exit:
+        """
+        Waits for the best exit which is not cooling down, and for its
+        rate limit
+
+        Arguments:
+            exclude: exits already blocked for the request, used only
+                when no other exit is left
+        """
+        while True:
+            now = anyio.current_time()
+            candidates = [
+                egress
+                for egress in self.exits
+                if egress.cooldown_until <= now and egress not in exclude
+            ] or [egress for egress in self.exits if egress.cooldown_until <= now]
+            if candidates:
+                break
+            await anyio.sleep(min(egress.cooldown_until for egress in self.exits) - now)
+
+        # least loaded for its health, then least recently used
+        egress = min(
+            candidates,
+            key=lambda egress: (
+                (egress.in_flight + 1) / max(egress.health, 0.01),
+                egress.last_used,
+            ),
+        )
+        egress.in_flight += 1
+        egress.last_used = now
+        try:
+            if egress.rate_limiter is not None:
+                await egress.rate_limiter.acquire()
+        except BaseException:
+            egress.in_flight -= 1
+            raise
+        return egress
+
+    def block(self, egress: Exit, wait: float = 0):
+        """
+        Cools an exit down after a 429 or a challenge page, and rotates
+        its header profile
+        """
+        egress.blocked += 1
+        egress.strikes += 1
+        egress.record(False)
+        backoff = self.cooldown * min(2 ** (egress.strikes - 1), MAX_BACKOFF)
+        egress.cooldown_until = anyio.current_time() + max(backoff, wait)
+        egress.headers = next(self.profiles)
+
+    def penalize(self, response: httpx.Response):
+        """
+        Blocks the exit of a response found to be a challenge page only
+        once its body was read
+        """
+        egress = self.leases.get(id(response))
+        if egress is not None:
+            self.block(egress)
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: dict = None):
+        """
+        Streams a GET request through the pool, yielding the response of
+        the first exit which is not blocked, or the last blocked response
+        once the retries ran out
+
+        Arguments:
+            url: string
+            headers: dict, sent along the header profile of the exit, whose
+                headers win
+
+        Yields:
+            response: httpx.Response
+        """
+        tried = []
+        streaming = False
+        while True:
+            egress = await self.acquire(tried)
+            egress.requests += 1
+            try:
+                async with egress.client.stream(
+                    "GET", url, headers={**(headers or {}), **egress.headers}
+                ) as response:
+                    if is_blocked(response) and len(tried) < self.retries:
+                        self.block(egress, retry_after(response))
+                        tried.append(egress)
+                        continue
+
+                    if is_blocked(response):
+                        self.block(egress, retry_after(response))
+                    else:
+                        egress.record(True)
+                    self.leases[id(response)] = egress
+                    streaming = True
+                    try:
+                        yield response
+                    finally:
+                        del self.leases[id(response)]
+                    return
+
+            except httpx.TransportError:
+                egress.errors += 1
+                egress.record(False)
+                # errors of the caller reading the body are not retried
+                if streaming or len(tried) >= self.retries:
+                    raise
+                tried.append(egress)
+
+            finally:
+                egress.in_flight -= 1
+
+    def report(self) -> list:
+        """
+        Returns the health and request counts of every exit
+        """
+        return [egress.report() for egress in self.exits]
@@ -0,0 +1,65 @@
+# Pages of a dribbble user that can be scraped independently
+SECTIONS = ("main", "about", "projects", "goods", "members", "collections", "shots")
+
+# Section that has to be scraped to obtain an exported field
+FIELD_SECTIONS = {
+    "shots_count": "main",
+    "projects_count": "main",
+    "collections_count": "main",
+    "liked_shots": "main",
+    "user_description": "main",
+    "hire_status": "main",
+    "members_count": "main",
+    "team_url": "main",
+    "followers": "about",
+    "following": "about",
+    "tags": "about",
+    "location": "about",
+    "bio": "about",
+    "is_pro": "about",
+    "join_date": "about",
+    "skills": "about",
+    "social_media_profiles": "about",
+    "projects": "projects",
+    "goods_for_sale": "goods",
+    "members": "members",
+    "collections": "collections",
+    "shots": "shots",
+}
+
+
+# Sections whose items are linked to shot metadata, which the shot
+# pipelines of other sections may still be fetching when they finish
+SHOT_SECTIONS = ("projects", "goods", "collections", "shots")
+
+
+def plan_sections(sections: list = None, fields: list = None) -> list:
+    """
+    Returns the sections which have to be scraped for the requested
+    sections and fields. All sections are planned if neither is given.
+
+    Arguments:
+        sections: list
+        fields: list
+
+    Returns:
+        planned_sections: list
+    """
+    if not sections and not fields:
+        return list(SECTIONS)
+
+    requested = set(sections or [])
+    unknown_sections = requested.difference(SECTIONS)
+    if unknown_sections:
+        raise ValueError(
+            "Unknown section(s): {}".format(", ".join(sorted(unknown_sections)))
+        )
+
+    unknown_fields = set(fields or []).difference(FIELD_SECTIONS)
+    if unknown_fields:
+        raise ValueError(
+            "Unknown field(s): {}".format(", ".join(sorted(unknown_fields)))
+        )
+    requested.update(FIELD_SECTIONS[field] for field in fields or [])
+
+    return [section for section in SECTIONS if section in requested]
@@ -0,0 +1,207 @@
+import io
+import os
+import gzip
+import json
+import importlib
+from contextlib import contextmanager
+from functools import lru_cache
+
+# File extensions of the data formats and of their compressions
+FORMATS = {"json": ".json", "msgpack": ".msgpack"}
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+@lru_cache(maxsize=None)
+def optional_module(name: str):
+    """
+    Imports an optional encoder or compressor, see the extras of setup.py,
+    on first use rather than at import time, so the CLI starts without
+    them. Returns None when it is not installed.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def json_dumps(data) -> str:
+    """
+    Encodes data as JSON, with orjson when it is installed
+    """
+    orjson = optional_module("orjson")
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data)
+
+
+def dumps(data, data_format: str = "json") -> bytes:
+    """
+    Encodes data in a data format
+
+    Arguments:
+        data: JSON compatible data
+        data_format: string, json or msgpack
+
+    Returns:
+        payload: bytes
+    """
+    if data_format == "msgpack":
+        msgpack = optional_module("msgpack")
+        if msgpack is None:
+            raise ImportError("msgpack output needs: pip install dribbble-py[msgpack]")
+        return msgpack.packb(data, use_bin_type=True)
+    orjson = optional_module("orjson")
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data).encode()
+
+
+def loads(payload: bytes, data_format: str = "json"):
+    """
+    Decodes data encoded by dumps
+    """
+    if data_format == "msgpack":
+        msgpack = optional_module("msgpack")
+        if msgpack is None:
+            raise ImportError("msgpack input needs: pip install dribbble-py[msgpack]")
+        # shot ids and usernames are string keys, counts may be int keys
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    orjson = optional_module("orjson")
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def split_extension(path: str) -> tuple:
+    """
+    Splits the data format and compression extensions off a path
+
+    Arguments:
+        path: string, e.g. JohnDoe.json.zst
+
+    Returns:
+        (base, data_format, compression): tuple, data_format is None when
+            the path has no data extension
+    """
+    base, compression = path, None
+    for name, extension in COMPRESSIONS.items():
+        if base.endswith(extension):
+            base, compression = base[: -len(extension)], name
+            break
+
+    for name, extension in FORMATS.items():
+        if base.endswith(extension):
+            return base[: -len(extension)], name, compression
+    return path, None, None
+
+
+def is_data_file(file_name: str) -> bool:
+    """
+    Check whether a file name has the extension of a data file
+    """
+    return split_extension(file_name)[1] is not None
+
+
+def output_path(name: str, data_format: str = None, compression: str = None) -> str:
+    """
+    Returns the path of an output file. A name which already has a data
+    extension is kept, so the extension chooses the format; otherwise the
+    extensions of data_format and compression are appended.
+    """
+    if is_data_file(name):
+        return name
+    return name + FORMATS[data_format or "json"] + COMPRESSIONS.get(compression, "")
+
+
+@contextmanager
+def compressed_writer(binary_file, compression: str = None):
+    """
+    Yields a binary file object compressing into binary_file, which is
+    left open
+
+    Arguments:
+        binary_file: file object opened for writing bytes
+        compression: string, gzip, zstd or None
+    """
+    if compression is None:
+        yield binary_file
+    elif compression == "gzip":
+        # a fixed mtime keeps equal data byte for byte equal
+        with gzip.GzipFile(fileobj=binary_file, mode="wb", mtime=0) as writer:
+            yield writer
+    elif compression == "zstd":
+        zstandard = optional_module("zstandard")
+        if zstandard is None:
+            raise ImportError("zstd compression needs: pip install dribbble-py[zstd]")
+        writer = zstandard.ZstdCompressor().stream_writer(binary_file, closefd=False)
+        with writer:
+            yield writer
+    else:
+        raise ValueError("unknown compression {!r}".format(compression))
+
+
+@contextmanager
+def compressed_reader(binary_file, compression: str = None):
+    """
+    Yields a binary file object decompressing binary_file
+    """
+    if compression is None:
+        yield binary_file
+    elif compression == "gzip":
+        with gzip.GzipFile(fileobj=binary_file, mode="rb") as reader:
+            yield reader
+    elif compression == "zstd":
+        zstandard = optional_module("zstandard")
+        if zstandard is None:
+            raise ImportError("zstd compression needs: pip install dribbble-py[zstd]")
+        with zstandard.ZstdDecompressor().stream_reader(
+            binary_file, closefd=False
+        ) as reader:
+            yield reader
+    else:
+        raise ValueError("unknown compression {!r}".format(compression))
+
+
+def write(path: str, data):
+    """
+    Writes data to a file, in the format and compression of its extension
+    """
+    _, data_format, compression = split_extension(path)
+    with open(path, "wb") as data_file, compressed_writer(
+        data_file, compression
+    ) as writer:
+        writer.write(dumps(data, data_format or "json"))
+
+
+def load(path: str):
+    """
+    Loads a file written in any data format and compression, chosen by
+    its extension. Files without a data extension are read as JSON.
+    """
+    _, data_format, compression = split_extension(path)
+    with open(path, "rb") as data_file, compressed_reader(
+        data_file, compression
+    ) as reader:
+        return loads(reader.read(), data_format or "json")
+
+
+def write_text(binary_file, write_json):
+    """
+    Runs a callable writing JSON text to a file object on a binary file
+    object, encoding the text as UTF-8
+    """
+    text_file = io.TextIOWrapper(binary_file, encoding="utf-8")
+    write_json(text_file)
+    text_file.flush()
+    text_file.detach()
+
+
+def data_files(path: str) -> dict:
+    """
+    Returns the data files of a directory by their name without extension
+    """
+    return {
+        split_extension(file_name)[0]: os.path.join(path, file_name)
+        for file_name in os.listdir(path)
+        if is_data_file(file_name) and not file_name.startswith(".")
+    }
@@ -0,0 +1,300 @@
+import sys
+import json
+import time
+import argparse
+import textwrap
+from collections import OrderedDict
+
+import anyio
+import httpx
+
+from dribbble_py.dribbble_user import DribbbleUser, plan_sections
+from dribbble_py.http_server import serve_http
+from dribbble_py.limits import PRIORITIES, RequestScheduler
+from dribbble_py.utils import split_csv
+
+
+class ScrapeService:
+    """
+    Long running scraper keeping a pooled HTTP client and a cache of
+    scraped results warm between jobs. Concurrent identical jobs share
+    a single scrape.
+
+    Arguments:
+        max_connections: int
+        cache_ttl: float, seconds a result stays cached
+        cache_size: int, maximum number of cached results
+    """
+
+    def __init__(
+        self, max_connections: int = 20, cache_ttl: float = 300, cache_size: int = 1024
+    ):
+        self.max_connections = max_connections
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+
+        self.client = None
+        self.scheduler = None
+        self.cache = OrderedDict()
+        self.in_flight = {}
+
+    @staticmethod
+    def job_key(job: dict) -> tuple:
+        """
+        Returns the cache key of a scrape job
+        """
+        if job.get("priority", "bulk") not in PRIORITIES:
+            raise ValueError("Unknown priority: {}".format(job["priority"]))
+        return (
+            job["username"],
+            tuple(plan_sections(job.get("sections"), job.get("fields"))),
+            tuple(sorted(job.get("fields") or [])),
+            bool(job.get("metadata")),
+        )
+
+    def cached(self, key: tuple):
+        """
+        Returns a cached result which has not expired, or None
+        """
+        try:
+            cached_at, data = self.cache[key]
+        except KeyError:
+            return None
+
+        if time.monotonic() - cached_at > self.cache_ttl:
+            del self.cache[key]
+            return None
+
+        self.cache.move_to_end(key)
+        return data
+
+    def store(self, key: tuple, data: dict):
+        """
+        Caches a result, evicting the least recently used ones
+        """
+        self.cache[key] = (time.monotonic(), data)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def scrape(self, job: dict) -> dict:
+        """
+        Scrapes a job, answering from the cache or from an identical job
+        which is already running when possible
+
+        Arguments:
+            job: dict with username, sections, fields and metadata
+
+        Returns:
+            data: dict
+        """
+        key = self.job_key(job)
+
+        data = self.cached(key)
+        if data is not None:
+            return data
+
+        # only jobs with the same time budget share a running scrape
+        flight_key = key + (job.get("deadline"), job.get("section_deadline"))
+        while flight_key in self.in_flight:
+            done, outcome = self.in_flight[flight_key]
+            await done.wait()
+            if outcome:
+                if isinstance(outcome[0], Exception):
+                    raise outcome[0]
+                return outcome[0]
+            # the scrape was cancelled without an outcome, so the first
+            # waiter runs it again for the others
+
+        done, outcome = anyio.Event(), []
+        self.in_flight[flight_key] = (done, outcome)
+        try:
+            dribbble_user = DribbbleUser(
+                job["username"],
+                None,
+                sections=job.get("sections"),
+                fields=job.get("fields"),
+                client=self.client,
+                scheduler=self.scheduler,
+                priority=job.get("priority", "bulk"),
+                deadline=job.get("deadline"),
+                section_deadline=job.get("section_deadline"),
+            )
+            await dribbble_user.run_scrapers(
+                dribbble_user.planned_scrapers(with_metadata=bool(job.get("metadata")))
+            )
+            data = dribbble_user.projected_data()
+            outcome.append(data)
+
+            # partial results of a job out of time are not cached
+            if dribbble_user.is_complete():
+                self.store(key, data)
+            return data
+
+        except Exception as ex:
+            outcome.append(ex)
+            raise
+
+        finally:
+            del self.in_flight[flight_key]
+            done.set()
+
+    @staticmethod
+    def query_job(query: dict) -> dict:
+        """
+        Builds a scrape job from the query string of a request
+        """
+        return {
+            "username": query["username"],
+            "sections": split_csv(query.get("sections")),
+            "fields": split_csv(query.get("fields")),
+            "metadata": query.get("metadata", "0").lower() in ("1", "true", "yes"),
+            "priority": query.get("priority", "interactive"),
+            "deadline": float(query["deadline"]) if "deadline" in query else None,
+            "section_deadline": float(query["section_deadline"])
+            if "section_deadline" in query
+            else None,
+        }
+
+    async def handle(self, request, responder):
+        """
+        Handles a request to the service
+
+        GET  /health                    service status
+        GET  /scrape?username=...       JSON result of one job
+        POST /jobs                      NDJSON stream of results for a
+                                        JSON list of jobs, in completion order
+
+        Single jobs run at interactive priority and job lists at bulk
+        priority, unless a job sets its priority. A job with a deadline or
+        section_deadline in seconds returns what was scraped in time, with
+        the status of every section under section_status.
+        """
+        if request.path == "/health":
+            await responder.send_json(
+                200,
+                {
+                    "status": "ok",
+                    "cached_results": len(self.cache),
+                    "jobs_in_flight": len(self.in_flight),
+                },
+            )
+
+        elif request.path == "/scrape" and request.method == "GET":
+            try:
+                job = self.query_job(request.query)
+                self.job_key(job)
+            except (KeyError, ValueError) as ex:
+                await responder.send_json(400, {"error": str(ex)})
+                return
+
+            data = await self.scrape(job)
+            if request.query.get("format") == "ndjson":
+                line = json.dumps({"username": job["username"], "data": data})
+                await responder.send(
+                    200, (line + "\n").encode(), "application/x-ndjson"
+                )
+            else:
+                await responder.send_json(200, data)
+
+        elif request.path == "/jobs" and request.method == "POST":
+            try:
+                jobs = request.json()
+                for job in jobs:
+                    self.job_key(job)
+            except (KeyError, TypeError, ValueError) as ex:
+                await responder.send_json(400, {"error": str(ex)})
+                return
+
+            await responder.start(200, {"content-type": "application/x-ndjson"})
+            send_stream, receive_stream = anyio.create_memory_object_stream(len(jobs))
+
+            async def run_job(job):
+                try:
+                    line = {"username": job["username"], "data": await self.scrape(job)}
+                except Exception as ex:
+                    line = {"username": job["username"], "error": str(ex)}
+                await send_stream.send(line)
+
+            async with anyio.create_task_group() as nursery:
+                for job in jobs:
+                    nursery.start_soon(run_job, job)
+
+                for _ in jobs:
+                    line = await receive_stream.receive()
+                    await responder.write((json.dumps(line) + "\n").encode())
+
+            await responder.finish()
+
+        else:
+            await responder.send_json(404, {"error": "Not found"})
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080, unix_socket=None):
+        """
+        Opens the pooled HTTP client and serves requests until cancelled
+        """
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+        async with httpx.AsyncClient(limits=limits) as client:
+            self.client = client
+            self.scheduler = RequestScheduler(self.max_connections)
+            await serve_http(self.handle, host, port, unix_socket)
+
+
+def main(argv=None):
+    argv = sys.argv[2:] if argv is None else argv
+    argparser = argparse.ArgumentParser(
+        prog="drbl_py serve",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description=textwrap.dedent(
+            """
+            Serve scrape jobs over a local HTTP or Unix socket service\n
+             """
+        ),
+        epilog="""
+        Example usage
+        -------------\n
+        Serve on port 8080.\n
+            $ drbl_py serve --port 8080\n
+
+        Scrape follower counts through the service.\n
+            $ curl "localhost:8080/scrape?username=JohnDoe&fields=followers"\n
+        """,
+    )
+    argparser.add_argument("--host", default="127.0.0.1", help="Host to bind.\n")
+    argparser.add_argument(
+        "--port", type=int, default=8080, help="Port to bind.\nDefault = 8080\n"
+    )
+    argparser.add_argument(
+        "--unix-socket",
+        dest="unix_socket",
+        help="Serve on a Unix socket instead of TCP.\n",
+    )
+    argparser.add_argument(
+        "--cache-ttl",
+        dest="cache_ttl",
+        type=float,
+        default=300,
+        help="Seconds a scraped result stays cached.\nDefault = 300\n",
+    )
+    argparser.add_argument(
+        "--max-connections",
+        dest="max_connections",
+        type=int,
+        default=20,
+        help="Maximum concurrent requests to dribbble.\nDefault = 20\n",
+    )
+    args = argparser.parse_args(argv)
+
+    service = ScrapeService(
+        max_connections=args.max_connections, cache_ttl=args.cache_ttl
+    )
+    where = args.unix_socket or "{}:{}".format(args.host, args.port)
+    print("Serving dribbble-py on {}...".format(where))
+    try:
+        anyio.run(service.serve, args.host, args.port, args.unix_socket, backend="trio")
+    except KeyboardInterrupt:
+        print("Exiting dribbble-py...\n")
+        sys.exit(0)
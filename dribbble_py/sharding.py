@@ -0,0 +1,422 @@
+import os
+import sys
+import json
+import time
+import queue
+import functools
+import tracemalloc
+import multiprocessing
+from contextlib import AsyncExitStack
+
+import anyio
+import httpx
+
+from dribbble_py.dribbble_user import DRIBBBLE_URL, DribbbleUser
+from dribbble_py.jobqueue import DirectorySink
+from dribbble_py.limits import MemoryBudget, RateLimiter
+from dribbble_py.proxies import ProxyPool
+
+
+def shard(usernames: list, shards: int) -> list:
+    """
+    Splits usernames round-robin into shards of nearly equal size
+
+    Arguments:
+        usernames: list
+        shards: int
+
+    Returns:
+        [usernames, ...]: list
+    """
+    return [usernames[index::shards] for index in range(shards)]
+
+
+async def scrape_batch(
+    usernames: list,
+    output_dir: str,
+    concurrency: int = 4,
+    max_connections: int = 20,
+    rate: float = None,
+    with_metadata: bool = False,
+    sections: list = None,
+    fields: list = None,
+    deadline: float = None,
+    section_deadline: float = None,
+    memory_budget: int = None,
+    spill_threshold: int = None,
+    memory_report: bool = False,
+    data_format: str = "json",
+    compression: str = None,
+    base_url: str = DRIBBBLE_URL,
+    proxies: list = None,
+    proxy_rate: float = None,
+    proxy_cooldown: float = 60,
+    listing_concurrency: int = 2,
+    detail_concurrency: int = 4,
+    report=None,
+    client: httpx.AsyncClient = None,
+):
+    """
+    Scrapes a list of users in one event loop with a shared client,
+    writing one JSON file per user to output_dir
+
+    Arguments:
+        usernames: list
+        output_dir: string
+        concurrency: int, users scraped at the same time
+        max_connections: int, requests in flight
+        rate: float, requests per second, None for no limit
+        with_metadata: bool
+        sections: list
+        fields: list
+        deadline: float, seconds allowed per user
+        section_deadline: float, seconds allowed per section
+        memory_budget: int, bytes of HTML parsed at once, None for no limit
+        spill_threshold: int, bytes of JSON past which sections are spilled
+            to temporary files
+        memory_report: bool, report the parse memory peaks per page type
+        data_format: string, json or msgpack
+        compression: string, gzip, zstd or None
+        base_url: string, site to scrape
+        proxies: list of egress proxy URLs, None to connect directly
+        proxy_rate: float, requests per second through every proxy
+        proxy_cooldown: float, seconds a throttled proxy rests
+        listing_concurrency: int, listing pages of a user's shot pipelines
+            fetched at once
+        detail_concurrency: int, shot pages of a user fetched at once
+        report: callable receiving a progress dict after every user
+        client: httpx.AsyncClient shared with the host application
+    """
+    sink = DirectorySink(output_dir, data_format, compression)
+    users = anyio.Semaphore(concurrency)
+    limiter = anyio.CapacityLimiter(max_connections)
+    rate_limiter = RateLimiter(rate) if rate else None
+    budget = MemoryBudget(memory_budget) if memory_budget else None
+    proxy_pool = (
+        ProxyPool(proxies, rate=proxy_rate, cooldown=proxy_cooldown)
+        if proxies
+        else None
+    )
+    if memory_report and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    async def scrape_user(client, username):
+        started = time.perf_counter()
+        progress = {"username": username, "status": "done", "requests": 0, "bytes": 0}
+        try:
+            dribbble_user = DribbbleUser(
+                username,
+                None,
+                sections=sections,
+                fields=fields,
+                client=client,
+                limiter=limiter,
+                rate_limiter=rate_limiter,
+                deadline=deadline,
+                section_deadline=section_deadline,
+                memory_budget=budget,
+                spill_threshold=spill_threshold,
+                base_url=base_url,
+                proxy_pool=proxy_pool,
+                listing_concurrency=listing_concurrency,
+                detail_concurrency=detail_concurrency,
+            )
+            await dribbble_user.run_scrapers(
+                dribbble_user.planned_scrapers(with_metadata)
+            )
+            progress["requests"] = dribbble_user.requests_made
+            progress["bytes"] = dribbble_user.bytes_downloaded
+            if not dribbble_user.is_complete():
+                progress["status"] = "partial"
+            progress["file"] = sink.write(username, dribbble_user.write_data)
+            if memory_report:
+                progress["memory"] = dribbble_user.memory_report
+            if dribbble_user.pipeline_report:
+                progress["pipeline"] = dribbble_user.pipeline_report
+
+        except Exception as ex:
+            progress["status"] = "failed"
+            progress["error"] = repr(ex)
+
+        finally:
+            progress["seconds"] = time.perf_counter() - started
+            users.release()
+            if report is not None:
+                report(progress)
+
+    async with AsyncExitStack() as stack:
+        client = client or await stack.enter_async_context(httpx.AsyncClient())
+        if proxy_pool is not None:
+            await stack.enter_async_context(proxy_pool)
+        nursery = await stack.enter_async_context(anyio.create_task_group())
+        for username in usernames:
+            await users.acquire()
+            nursery.start_soon(scrape_user, client, username)
+
+
+def merge_memory_reports(memory_reports) -> dict:
+    """
+    Merges the memory reports of several users into one per page type
+
+    Arguments:
+        memory_reports: iterable of dicts
+
+    Returns:
+        memory_report: dict
+    """
+    merged = {}
+    for memory_report in memory_reports:
+        for page_type, report in memory_report.items():
+            merged_report = merged.setdefault(
+                page_type,
+                {"pages": 0, "max_page_bytes": 0, "max_parse_peak_bytes": 0},
+            )
+            merged_report["pages"] += report["pages"]
+            for key in ("max_page_bytes", "max_parse_peak_bytes"):
+                merged_report[key] = max(merged_report[key], report[key])
+    return merged
+
+
+def worker_options(workers: int, options: dict) -> dict:
+    """
+    Divides the global limits of scrape_batch options evenly between
+    workers, keeping at least one user and one connection per worker
+
+    Arguments:
+        workers: int
+        options: dict, scrape_batch keyword arguments
+
+    Returns:
+        options: dict, scrape_batch keyword arguments of every worker
+    """
+    options = dict(options)
+    for limit in ("concurrency", "max_connections"):
+        options[limit] = max(1, options[limit] // workers)
+    for limit in ("rate", "proxy_rate"):
+        options[limit] = options[limit] / workers if options[limit] else None
+    options["memory_budget"] = (
+        options["memory_budget"] // workers if options["memory_budget"] else None
+    )
+    return options
+
+
+def _shard_worker(shard_index: int, usernames: list, options: dict, progress_queue):
+    """
+    Entry point of a shard process: scrapes its usernames and reports
+    progress to the parent through progress_queue
+    """
+    # The parent reports progress, the scrapers' own output is discarded
+    sys.stdout = open(os.devnull, "w")
+
+    def report(progress):
+        progress["shard"] = shard_index
+        progress_queue.put(("user", progress))
+
+    try:
+        anyio.run(
+            functools.partial(scrape_batch, usernames, report=report, **options),
+            backend="trio",
+        )
+    except BaseException as ex:
+        progress_queue.put(("shard_error", (shard_index, repr(ex))))
+        raise
+    finally:
+        progress_queue.put(("shard_done", shard_index))
+
+
+def print_progress(progress: dict, reported: int, total: int):
+    """
+    Prints the outcome of a user reported by a shard
+
+    Arguments:
+        progress: dict
+        reported: int, users reported so far
+        total: int
+    """
+    print(
+        "[{}/{}] {} {} in {:0.2f}s (worker {})".format(
+            reported,
+            total,
+            {"done": "✓", "partial": "~"}.get(progress["status"], "✗"),
+            progress["username"],
+            progress["seconds"],
+            progress["shard"],
+        )
+    )
+
+
+def run_sharded(
+    usernames: list,
+    workers: int,
+    output_dir: str,
+    concurrency: int = 4,
+    max_connections: int = 20,
+    rate: float = None,
+    with_metadata: bool = False,
+    sections: list = None,
+    fields: list = None,
+    deadline: float = None,
+    section_deadline: float = None,
+    memory_budget: int = None,
+    spill_threshold: int = None,
+    memory_report: bool = False,
+    data_format: str = "json",
+    compression: str = None,
+    base_url: str = DRIBBBLE_URL,
+    proxies: list = None,
+    proxy_rate: float = None,
+    proxy_cooldown: float = 60,
+    listing_concurrency: int = 2,
+    detail_concurrency: int = 4,
+) -> dict:
+    """
+    Scrapes usernames across worker processes, each running its own event
+    loop on a shard of the usernames. The global concurrency, connection
+    and rate limits are divided evenly between the workers. The parent
+    prints progress, and writes a summary of every user to
+    output_dir/summary.json.
+
+    Arguments:
+        usernames: list
+        workers: int
+        output_dir: string
+        concurrency: int, users scraped at the same time across workers
+        max_connections: int, requests in flight across workers
+        rate: float, requests per second across workers, None for no limit
+        with_metadata: bool
+        sections: list
+        fields: list
+        deadline: float, seconds allowed per user
+        section_deadline: float, seconds allowed per section
+        memory_budget: int, bytes of HTML parsed at once across workers
+        spill_threshold: int, bytes of JSON past which sections are spilled
+        memory_report: bool, add the parse memory peaks per page type to
+            the summary
+        data_format: string, json or msgpack
+        compression: string, gzip, zstd or None
+        base_url: string, site to scrape
+        proxies: list of egress proxy URLs shared by the workers
+        proxy_rate: float, requests per second through every proxy across
+            workers
+        proxy_cooldown: float, seconds a throttled proxy rests
+        listing_concurrency: int, listing pages of a user's shot pipelines
+            fetched at once
+        detail_concurrency: int, shot pages of a user fetched at once
+
+    Returns:
+        summary: dict
+    """
+    workers = max(1, min(workers, len(usernames)))
+    options = worker_options(
+        workers,
+        {
+            "output_dir": output_dir,
+            "concurrency": concurrency,
+            "max_connections": max_connections,
+            "rate": rate,
+            "with_metadata": with_metadata,
+            "sections": sections,
+            "fields": fields,
+            "deadline": deadline,
+            "section_deadline": section_deadline,
+            "memory_budget": memory_budget,
+            "spill_threshold": spill_threshold,
+            "memory_report": memory_report,
+            "data_format": data_format,
+            "compression": compression,
+            "base_url": base_url,
+            "proxies": proxies,
+            "proxy_rate": proxy_rate,
+            "proxy_cooldown": proxy_cooldown,
+            "listing_concurrency": listing_concurrency,
+            "detail_concurrency": detail_concurrency,
+        },
+    )
+
+    os.makedirs(output_dir, exist_ok=True)
+    context = multiprocessing.get_context("spawn")
+    progress_queue = context.Queue()
+    shards = shard(usernames, workers)
+    processes = [
+        context.Process(
+            target=_shard_worker,
+            args=(shard_index, shard_usernames, options, progress_queue),
+        )
+        for shard_index, shard_usernames in enumerate(shards)
+    ]
+
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+
+    users = {}
+    shard_errors = {}
+    running = len(processes)
+    while running:
+        try:
+            kind, message = progress_queue.get(timeout=1)
+        except queue.Empty:
+            # Stop waiting for shards whose process died without reporting
+            if not any(process.is_alive() for process in processes):
+                break
+            continue
+
+        if kind == "shard_done":
+            running -= 1
+            continue
+        if kind == "shard_error":
+            shard_index, error = message
+            shard_errors[shard_index] = error
+            continue
+
+        users[message["username"]] = message
+        print_progress(message, len(users), len(usernames))
+
+    for process in processes:
+        process.join()
+
+    # users of a shard which raised or died before reporting them failed
+    failed_shards = []
+    for shard_index, (process, shard_usernames) in enumerate(zip(processes, shards)):
+        if process.exitcode != 0:
+            failed_shards.append(shard_index)
+        for username in shard_usernames:
+            if username in users:
+                continue
+            users[username] = {
+                "username": username,
+                "status": "failed",
+                "error": shard_errors.get(
+                    shard_index,
+                    "worker {} exited with code {}".format(
+                        shard_index, process.exitcode
+                    ),
+                ),
+                "requests": 0,
+                "bytes": 0,
+                "seconds": 0,
+                "shard": shard_index,
+            }
+            print_progress(users[username], len(users), len(usernames))
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "workers": workers,
+        "seconds": elapsed,
+        "done": sum(user["status"] == "done" for user in users.values()),
+        "partial": sum(user["status"] == "partial" for user in users.values()),
+        "failed": sum(user["status"] == "failed" for user in users.values()),
+        "failed_workers": failed_shards,
+        "requests": sum(user["requests"] for user in users.values()),
+        "bytes": sum(user["bytes"] for user in users.values()),
+        "users_per_second": len(users) / elapsed if elapsed else 0,
+        "users": users,
+    }
+    if memory_report:
+        summary["memory"] = merge_memory_reports(
+            user["memory"] for user in users.values() if "memory" in user
+        )
+    with open(os.path.join(output_dir, "summary.json"), "w") as summary_file:
+        json.dump(summary, summary_file)
+
+    return summary
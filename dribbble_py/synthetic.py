@@ -0,0 +1,538 @@
+import sys
+import zlib
+import random
+import argparse
+import textwrap
+from urllib.parse import urlsplit, parse_qs
+
+import anyio
+
+from dribbble_py.http_server import serve_http
+
+# Words the generated titles, names and tags are made of
+WORDS = (
+    "logo",
+    "icon",
+    "branding",
+    "mobile",
+    "app",
+    "dashboard",
+    "illustration",
+    "typography",
+    "landing",
+    "poster",
+    "ui",
+    "ux",
+    "web",
+    "motion",
+    "3d",
+    "pattern",
+)
+SKILLS = ("Figma", "Branding", "Illustration", "Motion", "UI Design", "Lettering")
+SOCIAL_SITES = ("twitter", "instagram", "behance")
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct")
+
+# Site layout around every full page, which fragments leave out
+LAYOUT_HEADER = (
+    "<!DOCTYPE html><html><head><title>Dribbble</title>"
+    + "<link rel='stylesheet' href='/assets/site.css'>" * 20
+    + "</head><body><header><nav>"
+    + "".join("<a href='/{0}'>{0}</a>".format(word) for word in WORDS * 8)
+    + "</nav></header><main>"
+)
+LAYOUT_FOOTER = (
+    "</main><footer>"
+    + "<script src='/assets/site.js'></script>" * 20
+    + "</footer></body></html>"
+)
+NOT_FOUND_PAGE = (
+    "<section class='message-404'></section><section class='collage-404'>"
+    "<div class='collage-404-images'></div></section>"
+)
+
+CHUNK_SIZE = 16 * 1024
+
+
+def slug(title: str) -> str:
+    return title.replace(" ", "-")
+
+
+class SyntheticDribbble:
+    """
+    Local site generating dribbble profiles in the markup the scrapers
+    read, for load and scaling tests. Every username is a profile with
+    the configured number of shots, projects, collections, members and
+    goods. Pages are generated on request from the username and shot
+    ids, so a profile of 10k shots costs no memory.
+
+    Listings honour page and per_page, and answer requests sent with the
+    X-Requested-With header of infinite scroll with the list fragment
+    only. Usernames starting with "missing" are not found.
+
+    Arguments:
+        shots: int, shots per profile
+        projects: int
+        project_shots: int, shots per project, taken from the profile
+        collections: int
+        collection_shots: int, shots per collection, by other designers
+        members: int
+        goods: int
+        latency: float, mean seconds waited before every response
+        error_rate: float, share of requests answered with a 500
+        throttle_rate: float, share of requests answered with a 429
+        seed: int
+    """
+
+    def __init__(
+        self,
+        shots: int = 100,
+        projects: int = 2,
+        project_shots: int = 10,
+        collections: int = 2,
+        collection_shots: int = 10,
+        members: int = 0,
+        goods: int = 2,
+        latency: float = 0,
+        error_rate: float = 0,
+        throttle_rate: float = 0,
+        seed: int = 0,
+    ):
+        self.shots = shots
+        self.projects = projects
+        self.project_shots = project_shots
+        self.collections = collections
+        self.collection_shots = collection_shots
+        self.members = members
+        self.goods = goods
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.seed = seed
+
+        self.random = random.Random(seed)
+        self.status_counts = {}
+
+    # Generated data
+    # ---
+
+    def shot_id(self, username: str, index: int) -> int:
+        """
+        Returns the id of the shot at index of a profile, unique per
+        username and index
+        """
+        return (zlib.crc32(username.encode()) % 100000 + 1) * 1000000 + index
+
+    def title(self, number: int) -> str:
+        generator = random.Random(number * 31 + self.seed)
+        return " ".join(generator.sample(WORDS, 2)).title()
+
+    def shot_thumbnail(self, shot_id: int, designer: str = None) -> str:
+        """
+        Returns the thumbnail of a shot, with the designer details shown
+        in collections when a designer is given
+        """
+        title = self.title(shot_id)
+        designer_details = ""
+        if designer is not None:
+            designer_details = (
+                "<a class='hoverable url' href='/{0}'>"
+                "<span class='display-name'>{0}</span></a>"
+                "<span class='js-shot-likes-count'>{1}</span>"
+                "<span class='js-shot-views-count'>{2:,}</span>"
+            ).format(designer, shot_id % 97, shot_id % 9973)
+        return (
+            "<li class='shot-thumbnail' id='screenshot-{0}'>"
+            "<div class='shot-thumbnail-base'>"
+            "<img alt='{1} shot' src='/images/{0}.png'>"
+            "<a class='shot-thumbnail-link' href='/shots/{0}-{2}'></a></div>"
+            "<div class='shot-title'>{1}</div>{3}</li>"
+        ).format(shot_id, title, slug(title), designer_details)
+
+    def count_item(self, name: str, count: int) -> str:
+        return "<li class='{}'><a><span class='count'>{:,}</span></a></li>".format(
+            name, count
+        )
+
+    def main_page(self, username: str) -> str:
+        return (
+            "<div class='masthead-intro'><h2>Designer {0}</h2></div>"
+            "<div class='hire-prompt-trigger profile-action-item'></div>"
+            "<div class='masthead-teams'>"
+            "<a class='team-avatar-link' href='/team-{0}'></a></div>"
+            "<ul class='profile-stats'>{1}</ul><ol class='shots-grid'>{2}</ol>"
+        ).format(
+            username,
+            "".join(
+                self.count_item(name, count)
+                for name, count in (
+                    ("shots", self.shots),
+                    ("projects", self.projects),
+                    ("collections", self.collections),
+                    ("liked", self.shots * 3),
+                    ("members", self.members),
+                )
+            ),
+            "".join(
+                self.shot_thumbnail(self.shot_id(username, index))
+                for index in range(min(self.shots, 12))
+            ),
+        )
+
+    def about_page(self, username: str) -> str:
+        generator = random.Random(username)
+        return (
+            "<section class='content-section profile-stats-section "
+            "medium-screens-only'>{0}</section>"
+            "<p class='location'>City {1}</p><p class='bio-text'>Bio of {2}</p>"
+            "<p class='info-item pro'></p>"
+            "<p class='info-item created'><span>Member since {3} 20{4:02}</span></p>"
+            "<ul class='skills-list'>{5}</ul><ul class='social-links-list'>{6}</ul>"
+        ).format(
+            "".join(
+                "<a><span class='count'>{:,}</span></a>".format(count)
+                for count in (generator.randrange(100000), generator.randrange(500), 12)
+            ),
+            generator.randrange(100),
+            username,
+            generator.choice(MONTHS),
+            generator.randrange(10, 23),
+            "".join(
+                "<li><a>{}</a></li>".format(skill)
+                for skill in generator.sample(SKILLS, 3)
+            ),
+            "".join(
+                "<li><a href='/{}/social/{}'>{}</a></li>".format(
+                    username, site, site.title()
+                )
+                for site in SOCIAL_SITES
+            ),
+        )
+
+    def listing_range(self, query: dict, default_per_page: int, total: int):
+        """
+        Returns the item indexes of a listing page, pages starting at 1
+        """
+        page = max(int(query.get("page", 1)), 1)
+        per_page = int(query.get("per_page", default_per_page))
+        return range((page - 1) * per_page, min(page * per_page, total))
+
+    def shots_page(self, username: str, query: dict) -> str:
+        return "<ol class='shots-grid'>{}</ol>".format(
+            "".join(
+                self.shot_thumbnail(self.shot_id(username, index))
+                for index in self.listing_range(query, 24, self.shots)
+            )
+        )
+
+    def shot_page(self, shot_id: int) -> str:
+        generator = random.Random(shot_id + self.seed)
+        shot_data = (
+            "var shotData = {{shotData: {{likesCount: {}, viewsCount: {}, "
+            "savesCount: {}, postedOn: 'Mar {}, 2021', isAnimated: false, "
+            "isAnimatedGif: false, tags: [{}]}}}}"
+        ).format(
+            generator.randrange(1000),
+            generator.randrange(100000),
+            generator.randrange(100),
+            generator.randrange(1, 29),
+            ", ".join("'{}'".format(tag) for tag in generator.sample(WORDS, 4)),
+        )
+        return (
+            "<h1>{}</h1><ul class='color-chips group'>{}</ul>{}"
+            "<script>\n\n\n{}</script>"
+        ).format(
+            self.title(shot_id),
+            "".join(
+                "<li><a>#{:06X}</a></li>".format(generator.randrange(1 << 24))
+                for _ in range(generator.randrange(4, 9))
+            ),
+            "<script></script>" * 6,
+            shot_data,
+        )
+
+    def projects_page(self, username: str) -> str:
+        return "".join(
+            (
+                "<div class='shots-group-item'>"
+                "<a class='shots-group' href='/{0}/projects/{1}-{2}'>"
+                "<div class='collection-name'>{3}</div>"
+                "<div class='shots-group-meta'><span class='shots-count'>"
+                "{4} Shots</span><span class='timestamp'>Updated March {5}, 2021"
+                "</span></div></a></div>"
+            ).format(
+                username,
+                number,
+                slug(self.title(number)),
+                self.title(number),
+                self.project_shots,
+                number + 1,
+            )
+            for number in range(self.projects)
+        )
+
+    def project_page(self, username: str, number: int, query: dict) -> str:
+        first_shot = number * self.project_shots
+        return "".join(
+            (
+                "<div class='shot-section-item'>"
+                "<h3 class='shot-title'><a>{1}</a></h3>"
+                "<p class='shot-date'>March 1, 2021</p>"
+                "<p class='shot-description'>About {1}</p>"
+                "<a class='shot-link' href='/shots/{0}-{2}'></a></div>"
+            ).format(shot_id, self.title(shot_id), slug(self.title(shot_id)))
+            for shot_id in (
+                self.shot_id(username, (first_shot + index) % max(self.shots, 1))
+                for index in self.listing_range(query, 8, self.project_shots)
+            )
+        )
+
+    def collections_page(self, username: str) -> str:
+        return "<ul>{}</ul>".format(
+            "".join(
+                (
+                    "<li class='shots-group-item'>"
+                    "<a class='shots-group' href='/{0}/collections/{1}-{2}'></a>"
+                    "<div class='collection-name'>{3}</div>"
+                    "<span class='shots-count'>{4} Shots</span>"
+                    "<span class='designers-count'>{5} Designers</span></li>"
+                ).format(
+                    username,
+                    number,
+                    slug(self.title(number + 1000)),
+                    self.title(number + 1000),
+                    self.collection_shots,
+                    min(self.collection_shots, 5),
+                )
+                for number in range(self.collections)
+            )
+        )
+
+    def collection_page(self, username: str, number: int) -> str:
+        designers = ["designer-{}-{}".format(number, index) for index in range(5)]
+        return "<ol class='shots-grid'>{}</ol>".format(
+            "".join(
+                self.shot_thumbnail(
+                    self.shot_id(designers[index % 5], index), designers[index % 5]
+                )
+                for index in range(self.collection_shots)
+            )
+        )
+
+    def members_page(self, username: str, query: dict) -> str:
+        return "<ol>{}</ol>".format(
+            "".join(
+                (
+                    "<li class='scrolling-row'>"
+                    "<span class='designer-card-username'>"
+                    "<a class='designer-link' href='/{0}-member-{1}'>Member {1}</a>"
+                    "</span><span class='designer-card-location'>City {1}</span></li>"
+                ).format(username, index)
+                for index in self.listing_range(query, 6, self.members)
+            )
+        )
+
+    def goods_page(self, username: str) -> str:
+        return "<ol>{}</ol>".format(
+            "".join(
+                (
+                    "<li class='shot-thumbnail-container' data-thumbnail-id='{0}'>"
+                    "<div class='shot-details-container'>"
+                    "<div class='font-label'>{1}</div>"
+                    "<div class='price-label'><span>${2}</span></div></div></li>"
+                ).format(shot_id, self.title(shot_id), 10 + index)
+                for index, shot_id in enumerate(
+                    self.shot_id(username, index) for index in range(self.goods)
+                )
+            )
+        )
+
+    # Requests
+    # ---
+
+    def route(self, path: str, query: dict, headers: dict, host: str) -> tuple:
+        """
+        Returns the response to a GET request
+
+        Arguments:
+            path: string
+            query: dict
+            headers: dict, with lower case names
+            host: string, base URL of the server for redirects
+
+        Returns:
+            (status, headers, body): tuple
+        """
+        parts = [part for part in path.split("/") if part]
+        fragment = headers.get("x-requested-with") == "XMLHttpRequest"
+        page = None
+
+        if len(parts) == 2 and parts[0] == "shots":
+            page = self.shot_page(int(parts[1].split("-")[0]))
+        elif len(parts) == 3 and parts[0] == "external":
+            page = "<p>{} profile of {}</p>".format(parts[1], parts[2])
+        elif parts and not parts[0].startswith("missing"):
+            username, section = parts[0], parts[1:]
+            if section == []:
+                page = self.main_page(username)
+            elif section == ["about"]:
+                page = self.about_page(username)
+            elif section == ["shots"]:
+                page = self.shots_page(username, query)
+            elif section == ["members"]:
+                page = self.members_page(username, query)
+            elif section == ["projects"]:
+                page = self.projects_page(username)
+            elif len(section) == 2 and section[0] == "projects":
+                page = self.project_page(username, int(section[1].split("-")[0]), query)
+            elif section == ["collections"]:
+                page = self.collections_page(username)
+            elif len(section) == 2 and section[0] == "collections":
+                page = self.collection_page(username, int(section[1].split("-")[0]))
+            elif section == ["goods"]:
+                page = self.goods_page(username)
+            elif len(section) == 2 and section[0] == "social":
+                location = "{}/external/{}/{}".format(host, section[1], username)
+                return 302, {"location": location}, b""
+
+        status = 200
+        if page is None:
+            status, page = 404, NOT_FOUND_PAGE
+        if not fragment:
+            page = LAYOUT_HEADER + page + LAYOUT_FOOTER
+        return status, {"content-type": "text/html; charset=utf-8"}, page.encode()
+
+    async def respond(self, path: str, query: dict, headers: dict, host: str):
+        """
+        Waits for the injected latency, then returns the response to a
+        request, or an injected error or throttling response
+        """
+        if self.latency:
+            await anyio.sleep(self.random.expovariate(1 / self.latency))
+
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            response = (429, {"retry-after": "1"}, b"Too Many Requests")
+        elif roll < self.throttle_rate + self.error_rate:
+            response = (500, {}, b"Internal Server Error")
+        else:
+            response = self.route(path, query, headers, host)
+
+        self.status_counts[response[0]] = self.status_counts.get(response[0], 0) + 1
+        return response
+
+    async def handle(self, request, responder):
+        """
+        Serves a request of the HTTP server, streaming the body in chunks
+        """
+        status, headers, body = await self.respond(
+            request.path,
+            request.query,
+            request.headers,
+            "http://" + request.headers.get("host", "127.0.0.1"),
+        )
+        await responder.start(status, dict(headers, **{"content-length": len(body)}))
+        for start in range(0, len(body), CHUNK_SIZE):
+            await responder.write(body[start : start + CHUNK_SIZE])
+        await responder.finish()
+
+    def transport(self):
+        """
+        Returns an httpx transport answering requests in process, without
+        a socket
+        """
+        import httpx
+
+        async def handler(request):
+            url = urlsplit(str(request.url))
+            status, headers, body = await self.respond(
+                url.path,
+                {key: values[-1] for key, values in parse_qs(url.query).items()},
+                {name.lower(): value for name, value in request.headers.items()},
+                "{}://{}".format(url.scheme, url.netloc),
+            )
+            return httpx.Response(status, headers=headers, content=body)
+
+        return httpx.MockTransport(handler)
+
+
+def main(argv=None):
+    argv = sys.argv[2:] if argv is None else argv
+    argparser = argparse.ArgumentParser(
+        prog="drbl_py synthetic",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description=textwrap.dedent(
+            """
+            Serve generated dribbble profiles locally for load tests\n
+             """
+        ),
+        epilog="""
+        Example usage
+        -------------\n
+        Serve profiles of 10k shots with 50 ms of latency and 1% of 429s.\n
+            $ drbl_py synthetic --shots 10000 --latency 0.05 --throttle-rate 0.01\n
+
+        Scrape a generated profile.\n
+            $ drbl_py -u JohnDoe --base-url http://127.0.0.1:8081\n
+        """,
+    )
+    argparser.add_argument("--host", default="127.0.0.1", help="Host to bind.\n")
+    argparser.add_argument(
+        "--port", type=int, default=8081, help="Port to bind.\nDefault = 8081\n"
+    )
+    for name, default in (
+        ("shots", 100),
+        ("projects", 2),
+        ("project-shots", 10),
+        ("collections", 2),
+        ("collection-shots", 10),
+        ("members", 0),
+        ("goods", 2),
+    ):
+        argparser.add_argument(
+            "--" + name,
+            type=int,
+            default=default,
+            help="{} per profile.\nDefault = {}\n".format(
+                name.replace("-", " ").capitalize(), default
+            ),
+        )
+    argparser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        help="Mean seconds before every response.\nDefault = 0\n",
+    )
+    argparser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0,
+        help="Share of requests answered with a 500.\nDefault = 0\n",
+    )
+    argparser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0,
+        help="Share of requests answered with a 429.\nDefault = 0\n",
+    )
+    argparser.add_argument("--seed", type=int, default=0, help="Random seed.\n")
+    args = argparser.parse_args(argv)
+
+    synthetic = SyntheticDribbble(
+        shots=args.shots,
+        projects=args.projects,
+        project_shots=args.project_shots,
+        collections=args.collections,
+        collection_shots=args.collection_shots,
+        members=args.members,
+        goods=args.goods,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed,
+    )
+    print("Serving synthetic dribbble on http://{}:{}".format(args.host, args.port))
+    try:
+        anyio.run(serve_http, synthetic.handle, args.host, args.port, backend="trio")
+    except KeyboardInterrupt:
+        print("Exiting dribbble-py...\n")
+        print(synthetic.status_counts)
@@ -0,0 +1,402 @@
+import os
+import sys
+import argparse
+import textwrap
+
+from dribbble_py.diff import snapshot_files
+from dribbble_py.serialization import load
+from dribbble_py.utils import iter_user_shots
+
+# numpy and scipy are optional, see the tags extra of setup.py
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+ENGAGEMENT = ("views", "likes")
+
+
+def require_scipy():
+    if sparse is None:
+        raise ImportError("tag analytics need: pip install dribbble-py[tags]")
+
+
+def tag_name(tag) -> str:
+    """
+    Returns the normalized name of a tag, given as a string or as a dict
+    with a name
+    """
+    if isinstance(tag, dict):
+        tag = tag.get("name")
+    return str(tag).strip().lower() if tag else None
+
+
+def as_count(value) -> int:
+    return value if isinstance(value, int) else 0
+
+
+def rows_to_csr(rows: list, width: int):
+    """
+    Builds a binary CSR matrix from the column indexes of every row
+    """
+    lengths = np.array([len(row) for row in rows], np.int64)
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    indices = np.concatenate(rows).astype(np.int32) if rows else np.array([], np.int32)
+    return sparse.csr_matrix(
+        (np.ones(len(indices), np.float32), indices, indptr), shape=(len(rows), width)
+    )
+
+
+class TagAnalytics:
+    """
+    Sparse tag-by-shot and skill-by-user matrices of a scraped corpus.
+
+    Rows are shots and users, columns the tags of a shared vocabulary.
+    Updating with new snapshots replaces the rows of the shots and users
+    seen again and appends the others, with the views and likes of every
+    shot kept alongside its row, so a corpus is never rebuilt from its
+    JSON files.
+    """
+
+    def __init__(self):
+        require_scipy()
+        self.tags = []
+        self.columns = {}
+        self.shot_matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.shot_ids = np.array([], str)
+        self.shot_owners = np.array([], str)
+        self.engagement = {name: np.array([], np.int64) for name in ENGAGEMENT}
+        self.skill_matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.usernames = np.array([], str)
+
+    def tag_columns(self, tags: list):
+        """
+        Returns the sorted columns of tags, adding new tags to the
+        vocabulary
+        """
+        columns = set()
+        for tag in map(tag_name, tags or []):
+            if tag is None:
+                continue
+            if tag not in self.columns:
+                self.columns[tag] = len(self.tags)
+                self.tags.append(tag)
+            columns.add(self.columns[tag])
+        return np.array(sorted(columns), np.int32)
+
+    def update(self, snapshots):
+        """
+        Adds the shots and skills of scraped users. Shots without fetched
+        metadata are skipped.
+
+        Arguments:
+            snapshots: iterable of (username, dribbble_user_data) tuples
+        """
+        shots, skills = {}, {}
+        for username, dribbble_user_data in snapshots:
+            own_shots = set(
+                ((dribbble_user_data.get("shots") or {}).get("shots")) or {}
+            )
+            for shot_id, shot in iter_user_shots(dribbble_user_data):
+                metadata = shot.get("metadata") or {}
+                if metadata.get("tags") is None:
+                    continue
+                owner = username if shot_id in own_shots else ""
+                # the copy of a shot in its owner's data wins over the
+                # copies in collections
+                if not owner and shots.get(str(shot_id), ("",) * 4)[3]:
+                    continue
+                shots[str(shot_id)] = (
+                    self.tag_columns(metadata["tags"]),
+                    as_count(metadata.get("views_count")),
+                    as_count(metadata.get("likes")),
+                    owner,
+                )
+            skills[username] = self.tag_columns(dribbble_user_data.get("skills"))
+
+        width = len(self.tags)
+        if shots:
+            shot_ids = np.array(list(shots), str)
+            rows, views, likes, owners = zip(*shots.values())
+            owners = np.array(owners, str)
+
+            # shots seen without their owner keep the owner known so far
+            seen = np.isin(self.shot_ids, shot_ids)
+            known_owners = dict(zip(self.shot_ids[seen], self.shot_owners[seen]))
+            for position in np.flatnonzero(owners == ""):
+                owners[position] = known_owners.get(shot_ids[position], "")
+
+            self.shot_matrix = self.merge_rows(self.shot_matrix, ~seen, rows, width)
+            self.shot_ids = np.concatenate((self.shot_ids[~seen], shot_ids))
+            self.shot_owners = np.concatenate((self.shot_owners[~seen], owners))
+            for name, values in zip(ENGAGEMENT, (views, likes)):
+                self.engagement[name] = np.concatenate(
+                    (self.engagement[name][~seen], np.array(values, np.int64))
+                )
+
+        if skills:
+            usernames = np.array(list(skills), str)
+            seen = np.isin(self.usernames, usernames)
+            self.skill_matrix = self.merge_rows(
+                self.skill_matrix, ~seen, list(skills.values()), width
+            )
+            self.usernames = np.concatenate((self.usernames[~seen], usernames))
+
+        # both matrices share the vocabulary
+        self.shot_matrix.resize((self.shot_matrix.shape[0], width))
+        self.skill_matrix.resize((self.skill_matrix.shape[0], width))
+
+    def merge_rows(self, matrix, keep, rows: list, width: int):
+        """
+        Returns the kept rows of a matrix followed by new rows
+        """
+        matrix.resize((matrix.shape[0], width))
+        return sparse.vstack((matrix[keep], rows_to_csr(list(rows), width)), "csr")
+
+    def update_from_paths(self, paths: list):
+        """
+        Adds the users of user files or batch output directories, loading
+        one user at a time
+        """
+        self.update(
+            (username, load(file_path))
+            for path in paths
+            for username, file_path in snapshot_files(path).items()
+        )
+
+    def matrix(self, source: str = "shots"):
+        return self.shot_matrix if source == "shots" else self.skill_matrix
+
+    def cooccurrence(self, source: str = "shots"):
+        """
+        Returns the tag-by-tag co-occurrence counts, tag counts on the
+        diagonal
+
+        Arguments:
+            source: string, shots or skills
+
+        Returns:
+            cooccurrence: scipy.sparse.csr_matrix
+        """
+        matrix = self.matrix(source)
+        return (matrix.T @ matrix).tocsr()
+
+    def tag_counts(self, source: str = "shots"):
+        return np.asarray(self.matrix(source).sum(axis=0)).ravel()
+
+    def related(self, tag: str, limit: int = 10, source: str = "shots") -> list:
+        """
+        Returns the tags found most often with a tag
+
+        Arguments:
+            tag: string
+            limit: int
+            source: string, shots or skills
+
+        Returns:
+            [(tag, count, jaccard), ...]: list, by count then jaccard
+        """
+        column = self.columns.get(tag_name(tag))
+        if column is None:
+            return []
+
+        matrix = self.matrix(source).tocsc()
+        rows = matrix.indices[matrix.indptr[column] : matrix.indptr[column + 1]]
+        counts = np.asarray(matrix[rows].sum(axis=0)).ravel()
+        counts[column] = 0
+        tag_counts = self.tag_counts(source)
+        jaccard = counts / np.maximum(tag_counts[column] + tag_counts - counts, 1)
+
+        related = np.flatnonzero(counts)
+        related = related[np.lexsort((-jaccard[related], -counts[related]))][:limit]
+        return [
+            (self.tags[index], int(counts[index]), float(jaccard[index]))
+            for index in related
+        ]
+
+    def tag_engagement(self) -> dict:
+        """
+        Returns the shots, views and likes of every tag, summed over its
+        shots
+
+        Returns:
+            {"tags": [...], "shots": array, "views": array, ...}: dict
+        """
+        matrix_t = self.shot_matrix.T.tocsr()
+        aggregates = {"tags": self.tags, "shots": self.tag_counts("shots")}
+        for name in ENGAGEMENT:
+            aggregates[name] = matrix_t @ self.engagement[name].astype(np.float64)
+        return aggregates
+
+    def top_tags(self, by: str = "views", limit: int = 20) -> list:
+        """
+        Returns the tags with the most shots, views or likes
+
+        Returns:
+            [(tag, shots, views, likes, mean views), ...]: list
+        """
+        aggregates = self.tag_engagement()
+        order = np.argsort(-aggregates[by], kind="stable")[:limit]
+        return [
+            (
+                self.tags[index],
+                int(aggregates["shots"][index]),
+                int(aggregates["views"][index]),
+                int(aggregates["likes"][index]),
+                float(aggregates["views"][index] / max(aggregates["shots"][index], 1)),
+            )
+            for index in order
+        ]
+
+    def user_tags(self):
+        """
+        Returns the tag counts of the shots of every user, one row per
+        username, by a sparse product of shot ownership and shot tags
+        """
+        user_rows = {username: row for row, username in enumerate(self.usernames)}
+        owned = np.flatnonzero(np.isin(self.shot_owners, self.usernames))
+        ownership = sparse.csr_matrix(
+            (
+                np.ones(len(owned), np.float32),
+                ([user_rows[owner] for owner in self.shot_owners[owned]], owned),
+            ),
+            shape=(len(self.usernames), len(self.shot_ids)),
+        )
+        return (ownership @ self.shot_matrix).tocsr()
+
+    def save(self, path: str):
+        """
+        Saves the matrices, their row ids and the vocabulary to a .npz file
+        """
+        np.savez(
+            path,
+            tags=np.array(self.tags, str),
+            shot_ids=self.shot_ids,
+            shot_owners=self.shot_owners,
+            shot_indptr=self.shot_matrix.indptr,
+            shot_indices=self.shot_matrix.indices,
+            usernames=self.usernames,
+            skill_indptr=self.skill_matrix.indptr,
+            skill_indices=self.skill_matrix.indices,
+            **self.engagement,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TagAnalytics":
+        """
+        Loads analytics saved by save
+        """
+        tag_analytics = cls()
+        with np.load(path) as arrays:
+            tag_analytics.tags = [str(tag) for tag in arrays["tags"]]
+            tag_analytics.columns = {
+                tag: column for column, tag in enumerate(tag_analytics.tags)
+            }
+            width = len(tag_analytics.tags)
+            for name, ids in (("shot", "shot_ids"), ("skill", "usernames")):
+                indices = arrays[name + "_indices"]
+                setattr(
+                    tag_analytics,
+                    name + "_matrix",
+                    sparse.csr_matrix(
+                        (
+                            np.ones(len(indices), np.float32),
+                            indices,
+                            arrays[name + "_indptr"],
+                        ),
+                        shape=(len(arrays[ids]), width),
+                    ),
+                )
+            tag_analytics.shot_ids = arrays["shot_ids"]
+            tag_analytics.shot_owners = arrays["shot_owners"]
+            tag_analytics.usernames = arrays["usernames"]
+            tag_analytics.engagement = {name: arrays[name] for name in ENGAGEMENT}
+        return tag_analytics
+
+
+def main(argv=None):
+    argv = sys.argv[2:] if argv is None else argv
+    argparser = argparse.ArgumentParser(
+        prog="drbl_py tags",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description=textwrap.dedent(
+            """
+            Analyse the shot tags and user skills of a scraped corpus\n
+             """
+        ),
+        epilog="""
+        Example usage
+        -------------\n
+        Add a batch scrape with metadata to the tag matrices.\n
+            $ drbl_py tags update results\n
+
+        Print the tags found most often with a tag.\n
+            $ drbl_py tags related --tag logo\n
+
+        Print the tags whose shots have the most views.\n
+            $ drbl_py tags top --by views\n
+        """,
+    )
+    argparser.add_argument("action", choices=("update", "related", "top"))
+    argparser.add_argument(
+        "paths", nargs="*", help="User files or directories to add.\n"
+    )
+    argparser.add_argument(
+        "--db",
+        default="tags.npz",
+        help="Tag matrices file.\nDefault = tags.npz\n",
+    )
+    argparser.add_argument("--tag", help="Tag or skill to relate.\n")
+    argparser.add_argument(
+        "--skills",
+        action="store_true",
+        help="Relate user skills instead of shot tags.\n",
+    )
+    argparser.add_argument(
+        "--by",
+        choices=("shots",) + ENGAGEMENT,
+        default="views",
+        help="Order of top tags.\nDefault = views\n",
+    )
+    argparser.add_argument(
+        "--limit", type=int, default=20, help="Tags to print.\nDefault = 20\n"
+    )
+    args = argparser.parse_args(argv)
+
+    try:
+        if args.action == "update":
+            if os.path.exists(args.db):
+                tag_analytics = TagAnalytics.load(args.db)
+            else:
+                tag_analytics = TagAnalytics()
+            tag_analytics.update_from_paths(args.paths)
+            tag_analytics.save(args.db)
+            print(
+                "✓ {} shots, {} users, {} tags".format(
+                    len(tag_analytics.shot_ids),
+                    len(tag_analytics.usernames),
+                    len(tag_analytics.tags),
+                )
+            )
+            return
+
+        tag_analytics = TagAnalytics.load(args.db)
+    except ImportError as ex:
+        print(ex)
+        sys.exit(1)
+
+    if args.action == "related":
+        if args.tag is None:
+            argparser.error("related needs --tag")
+        source = "skills" if args.skills else "shots"
+        for tag, count, jaccard in tag_analytics.related(args.tag, args.limit, source):
+            print("{}\t{}\t{:0.3f}".format(tag, count, jaccard))
+    else:
+        print("tag\tshots\tviews\tlikes\tmean views")
+        for tag, shots, views, likes, mean_views in tag_analytics.top_tags(
+            args.by, args.limit
+        ):
+            print(
+                "{}\t{}\t{}\t{}\t{:0.1f}".format(tag, shots, views, likes, mean_views)
+            )
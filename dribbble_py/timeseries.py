@@ -0,0 +1,347 @@
+import os
+import sys
+import time
+import sqlite3
+import calendar
+import argparse
+import textwrap
+
+from dribbble_py.diff import build_index, snapshot_files
+from dribbble_py.normalize import PREFERRED_DATE_FORMAT, SCRAPED_AT_FORMAT
+from dribbble_py.serialization import load
+
+# Counters recorded for every user and every shot
+USER_METRICS = (
+    "followers",
+    "following",
+    "shots_count",
+    "projects_count",
+    "collections_count",
+    "liked_shots",
+    "members_count",
+)
+SHOT_METRICS = ("likes", "views", "saves")
+
+BUCKETS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+
+
+class TimeSeriesStore:
+    """
+    Append-only store of user and shot counters in a SQLite database.
+
+    Samples are clustered by series, metric and time, so a range query
+    reads one contiguous run of B-tree pages. A sample is only stored
+    when the counter changed since the previous sample, which keeps
+    counters that rarely move, such as the views of old shots, down to
+    a few rows however often they are scraped.
+
+    Arguments:
+        path: string, database file or ":memory:"
+    """
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS series (
+                series_id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE
+            )
+            """
+        )
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS samples (
+                series_id INTEGER NOT NULL,
+                metric TEXT NOT NULL,
+                time INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                PRIMARY KEY (series_id, metric, time)
+            ) WITHOUT ROWID
+            """
+        )
+        self.db.commit()
+        self.series_ids = {}
+
+    def _series_id(self, key: str, create: bool = True):
+        if key not in self.series_ids:
+            row = self.db.execute(
+                "SELECT series_id FROM series WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                if not create:
+                    return None
+                row = (
+                    self.db.execute(
+                        "INSERT INTO series (key) VALUES (?)", (key,)
+                    ).lastrowid,
+                )
+            self.series_ids[key] = row[0]
+        return self.series_ids[key]
+
+    def _value_at(self, series_id: int, metric: str, at: int):
+        row = self.db.execute(
+            """
+            SELECT time, value FROM samples
+            WHERE series_id = ? AND metric = ? AND time <= ?
+            ORDER BY time DESC LIMIT 1
+            """,
+            (series_id, metric, at),
+        ).fetchone()
+        return row
+
+    def append(self, samples: list) -> int:
+        """
+        Appends samples, skipping those equal to the previous value of
+        their counter
+
+        Arguments:
+            samples: list of (key, metric, time, value) tuples
+
+        Returns:
+            stored: int
+        """
+        stored = 0
+        for key, metric, at, value in samples:
+            series_id = self._series_id(key)
+            previous = self._value_at(series_id, metric, int(at))
+            if previous is not None and previous[1] == value:
+                continue
+            stored += self.db.execute(
+                "INSERT OR IGNORE INTO samples VALUES (?, ?, ?, ?)",
+                (series_id, metric, int(at), value),
+            ).rowcount
+        self.db.commit()
+        return stored
+
+    def range(self, key: str, metric: str, start: int, end: int) -> list:
+        """
+        Returns the values of a counter between start and end. The value
+        in effect at start comes first, timestamped start.
+
+        Arguments:
+            key: string, e.g. user:JohnDoe or shot:123
+            metric: string
+            start: int, seconds since the epoch
+            end: int, seconds since the epoch
+
+        Returns:
+            [(time, value), ...]: list
+        """
+        series_id = self._series_id(key, create=False)
+        if series_id is None:
+            return []
+
+        points = []
+        previous = self._value_at(series_id, metric, start)
+        if previous is not None:
+            points.append((start, previous[1]))
+        points.extend(
+            self.db.execute(
+                """
+                SELECT time, value FROM samples
+                WHERE series_id = ? AND metric = ? AND time > ? AND time <= ?
+                ORDER BY time
+                """,
+                (series_id, metric, start, end),
+            )
+        )
+        return points
+
+    def downsample(
+        self, key: str, metric: str, start: int, end: int, bucket: int
+    ) -> list:
+        """
+        Returns the value of a counter at the end of every bucket between
+        start and end, carried forward over buckets without samples
+
+        Arguments:
+            key: string
+            metric: string
+            start: int
+            end: int
+            bucket: int, bucket length in seconds
+
+        Returns:
+            [(bucket_start, value), ...]: list
+        """
+        points = self.range(key, metric, start, end)
+        buckets = []
+        value = None
+        index = 0
+        for bucket_start in range(start, end, bucket):
+            # the last bucket also holds the samples taken at end
+            bucket_end = bucket_start + bucket
+            if bucket_end >= end:
+                bucket_end = end + 1
+            while index < len(points) and points[index][0] < bucket_end:
+                value = points[index][1]
+                index += 1
+            if value is not None:
+                buckets.append((bucket_start, value))
+        return buckets
+
+    def record_user(self, username: str, dribbble_user_data: dict, at: int) -> int:
+        """
+        Appends the counters of a scraped user and of the user's shots
+
+        Returns:
+            stored: int
+        """
+        samples = [
+            ("user:" + username, metric, at, dribbble_user_data[metric])
+            for metric in USER_METRICS
+            if isinstance(dribbble_user_data.get(metric), int)
+        ]
+        for shot_id, shot in build_index(dribbble_user_data)["shots"].items():
+            if shot_id is None or not shot_id.isdigit():
+                continue
+            samples.extend(
+                ("shot:" + shot_id, metric, at, shot[metric])
+                for metric in SHOT_METRICS
+                if isinstance(shot[metric], int)
+            )
+        return self.append(samples)
+
+    def close(self):
+        self.db.close()
+
+
+def parse_time(value: str) -> int:
+    """
+    Returns the seconds since the epoch of a UTC time, given in seconds,
+    in the scraped_at format of exports or as a date
+
+    Arguments:
+        value: string, e.g. 1700000000, 2021-03-01T12:00:00Z or 2021-03-01
+
+    Returns:
+        seconds: int
+    """
+    if value.isdigit():
+        return int(value)
+    for time_format in (SCRAPED_AT_FORMAT, PREFERRED_DATE_FORMAT):
+        try:
+            return calendar.timegm(time.strptime(value, time_format))
+        except ValueError:
+            continue
+    raise ValueError("Unknown time: {}".format(value))
+
+
+def sample_time(dribbble_user_data: dict, file_path: str, at: int = None) -> int:
+    """
+    Returns the time of the counters of a user file: at when given, else
+    the time the user was scraped, and the modification time of the file
+    for exports which do not store it
+
+    Arguments:
+        dribbble_user_data: dict
+        file_path: string
+        at: int, seconds since the epoch
+
+    Returns:
+        seconds: int
+    """
+    if at is not None:
+        return at
+    if dribbble_user_data.get("scraped_at"):
+        return parse_time(dribbble_user_data["scraped_at"])
+    return int(os.path.getmtime(file_path))
+
+
+def main(argv=None):
+    argv = sys.argv[2:] if argv is None else argv
+    argparser = argparse.ArgumentParser(
+        prog="drbl_py history",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description=textwrap.dedent(
+            """
+            Record and query the counters of scraped users and shots over time\n
+             """
+        ),
+        epilog="""
+        Example usage
+        -------------\n
+        Record the counters of a batch scrape.\n
+            $ drbl_py history record results\n
+
+        Record exports which do not store their scrape time.\n
+            $ drbl_py history record old_results --time 2021-03-01\n
+
+        Print the daily views of a shot over the last 90 days.\n
+            $ drbl_py history query --shot 123 --metric views --days 90\n
+        """,
+    )
+    argparser.add_argument("action", choices=("record", "query"))
+    argparser.add_argument(
+        "paths", nargs="*", help="User files or directories to record.\n"
+    )
+    argparser.add_argument(
+        "--db",
+        default="history.db",
+        help="Time-series database.\nDefault = history.db\n",
+    )
+    argparser.add_argument(
+        "--time",
+        type=parse_time,
+        help="UTC time of the recorded counters, in seconds, as\n"
+        "2021-03-01T12:00:00Z or as 2021-03-01.\n"
+        "Default = the scrape time stored in every file, or its\n"
+        "modification time\n",
+    )
+    argparser.add_argument("--user", help="Username to query.\n")
+    argparser.add_argument("--shot", help="Shot id to query.\n")
+    argparser.add_argument(
+        "--metric",
+        help="Counter to query.\n{}\n{}\n".format(
+            ", ".join(USER_METRICS), ", ".join(SHOT_METRICS)
+        ),
+    )
+    argparser.add_argument(
+        "--days",
+        type=int,
+        default=30,
+        help="Days back from now to query.\nDefault = 30\n",
+    )
+    argparser.add_argument(
+        "--bucket",
+        choices=BUCKETS,
+        help="Downsample to one value per bucket.\nDefault = every sample\n",
+    )
+    args = argparser.parse_args(argv)
+
+    store = TimeSeriesStore(args.db)
+    try:
+        if args.action == "record":
+            for path in args.paths:
+                for username, file_path in snapshot_files(path).items():
+                    dribbble_user_data = load(file_path)
+                    stored = store.record_user(
+                        username,
+                        dribbble_user_data,
+                        sample_time(dribbble_user_data, file_path, args.time),
+                    )
+                    print("✓ {} {} sample(s) stored".format(username, stored))
+            return
+
+        if (args.user is None) == (args.shot is None) or args.metric is None:
+            argparser.error("query needs --metric and one of --user or --shot")
+
+        key = "user:" + args.user if args.user else "shot:" + args.shot
+        end = int(time.time())
+        start = end - args.days * BUCKETS["day"]
+        if args.bucket:
+            points = store.downsample(
+                key, args.metric, start, end, BUCKETS[args.bucket]
+            )
+        else:
+            points = store.range(key, args.metric, start, end)
+
+        for at, value in points:
+            print(
+                "{}\t{}".format(
+                    time.strftime("%Y-%m-%d %H:%M", time.localtime(at)), value
+                )
+            )
+    finally:
+        store.close()
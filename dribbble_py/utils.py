@@ -1,5 +1,54 @@
-import httpx
-from bs4 import BeautifulSoup
+from urllib.parse import urlsplit
+
+try:
+    from contextlib import aclosing
+except ImportError:  # Python < 3.10
+    from contextlib import asynccontextmanager
+
+    @asynccontextmanager
+    async def aclosing(agen):
+        """
+        Closes an async generator on exit, like contextlib.aclosing
+        """
+        try:
+            yield agen
+        finally:
+            await agen.aclose()
+
+
+def element_soup(element):
+    """
+    Builds a soup holding a copy of an lxml element, without serializing
+    the element and parsing it again
+
+    Arguments:
+        element: lxml.etree element
+
+    Returns:
+        soup: BeautifulSoup
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup("", "lxml")
+
+    def copy(element, parent):
+        tag = soup.new_tag(element.tag, attrs=dict(element.attrib))
+        parent.append(tag)
+        if element.text:
+            tag.append(element.text)
+        for child in element:
+            # comments and processing instructions keep only their tail
+            if isinstance(child.tag, str):
+                copy(child, tag)
+            if child.tail:
+                tag.append(child.tail)
+
+    copy(element, soup)
+    return soup
+
+
+# Dribbble paths which are not user profiles
+NON_PROFILE_PATHS = ("", "None", "shots", "users", "tags", "search", "designers")
 
 
 def int_k(string_k: str):
@@ -30,6 +79,8 @@ def get_redirect_url(query_url: str):
 
 
     """
+    import httpx
+
     response = httpx.get(
         query_url,
         timeout=10,
@@ -45,13 +96,24 @@ def get_redirect_url(query_url: str):
 
     history_urls.append(response.url)
 
+    return [profile_redirect_url(history_urls), response_site]
+
+
+def profile_redirect_url(history_urls: list) -> str:
+    """
+    Returns the profile URL of a history of redirects, the last URL unless
+    it is a login page
+
+    Arguments:
+        history_urls: list
+
+    Returns:
+        redirected_url: string
+    """
     # Discard login redirect URLs of facebook, instagram and etc.,
     if "login" in str(history_urls[-1:][0]) or "authwall" in str(history_urls[-1:][0]):
-        redirected_url = str(history_urls[-2:][0])
-    else:
-        redirected_url = str(history_urls[-1:][0])
-
-    return [redirected_url, response_site]
+        return str(history_urls[-2:][0])
+    return str(history_urls[-1:][0])
 
 
 def string_to_number(number_string: str) -> int:
@@ -63,3 +125,90 @@ def string_to_number(number_string: str) -> int:
     except ValueError:
         int_number = 0
     return int_number
+
+
+def split_csv(value: str) -> list:
+    """
+    Split a comma separated value into a list of names
+
+    Arguments:
+        value: string
+
+    Returns:
+        names: list
+    """
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def username_from_url(profile_url: str) -> str:
+    """
+    Returns the username of a dribbble profile URL, or None when the URL
+    is not a profile
+
+    Arguments:
+        profile_url: string
+
+    Returns:
+        username: string
+    """
+    if not profile_url:
+        return None
+
+    username = urlsplit(profile_url).path.strip("/").split("/")[0]
+    if username in NON_PROFILE_PATHS:
+        return None
+    return username
+
+
+def shot_id_from_url(shot_url: str) -> str:
+    """
+    Returns the id of a dribbble shot URL, e.g. 123 for
+    https://dribbble.com/shots/123-Logo, or the URL itself when it is
+    not a shot page
+
+    Arguments:
+        shot_url: string
+
+    Returns:
+        shot_id: string
+    """
+    if not shot_url:
+        return None
+
+    path = urlsplit(shot_url).path.strip("/").split("/")
+    if len(path) > 1 and path[0] == "shots":
+        shot_id = path[1].split("-")[0]
+        if shot_id.isdigit():
+            return shot_id
+    return shot_url
+
+
+def iter_user_shots(dribbble_user_data: dict):
+    """
+    Yields the shots of every section of a scraped user, keyed by shot id:
+    user shots, goods, project shots and collection shots. A shot found in
+    several sections is yielded once per section.
+
+    Arguments:
+        dribbble_user_data: dict
+
+    Yields:
+        (shot_id, shot): tuple
+    """
+    shot_dicts = [
+        ((dribbble_user_data.get("shots") or {}).get("shots")) or {},
+        dribbble_user_data.get("goods_for_sale") or {},
+    ]
+    for section in ("projects", "collections"):
+        shot_dicts += [
+            item.get("shots") or {}
+            for item in (dribbble_user_data.get(section) or {}).values()
+            if isinstance(item, dict)
+        ]
+
+    for shots in shot_dicts:
+        for shot_id, shot in shots.items():
+            if isinstance(shot, dict):
+                yield shot_id, shot
@@ -0,0 +1,269 @@
+import os
+import sys
+import socket
+import argparse
+import textwrap
+from contextlib import AsyncExitStack
+
+import anyio
+import httpx
+
+from dribbble_py.dribbble_user import DribbbleUser
+from dribbble_py.jobqueue import SQLiteJobQueue, DirectorySink
+from dribbble_py.utils import split_csv
+
+
+class Worker:
+    """
+    Claims username jobs from a shared queue, scrapes them and writes the
+    results to a sink. Leases of running jobs are extended by heartbeats.
+
+    Arguments:
+        queue: JobQueue
+        sink: DirectorySink
+        worker_id: string, unique among the workers sharing the queue
+        concurrency: int, jobs scraped at the same time
+        max_connections: int, requests in flight across all jobs
+        lease_seconds: float
+        poll_interval: float, seconds to wait when no job is claimable
+        exit_when_empty: bool, stop once no job is claimable
+        with_metadata: bool
+        sections: list
+        client: httpx.AsyncClient shared with the host application
+    """
+
+    def __init__(
+        self,
+        queue,
+        sink,
+        worker_id: str,
+        concurrency: int = 4,
+        max_connections: int = 20,
+        lease_seconds: float = 120,
+        poll_interval: float = 5,
+        exit_when_empty: bool = False,
+        with_metadata: bool = False,
+        sections: list = None,
+        client: httpx.AsyncClient = None,
+    ):
+        self.queue = queue
+        self.sink = sink
+        self.worker_id = worker_id
+        self.concurrency = concurrency
+        self.max_connections = max_connections
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.exit_when_empty = exit_when_empty
+        self.with_metadata = with_metadata
+        self.sections = sections
+        self.client = client
+        self.queue_limiter = None
+
+        self.completed = 0
+        self.failed = 0
+
+    async def queue_call(self, method, *args):
+        """
+        Runs a queue method in a worker thread, so a locked database does
+        not block the scrapes. Queue calls run one at a time.
+        """
+        return await anyio.to_thread.run_sync(method, *args, limiter=self.queue_limiter)
+
+    async def keep_lease(self, job, lease_lost, cancel_scope):
+        """
+        Extends the lease of a job every third of the lease time. When
+        another worker took the job over, sets lease_lost and cancels the
+        scrape.
+        """
+        while True:
+            await anyio.sleep(self.lease_seconds / 3)
+            if not await self.queue_call(
+                self.queue.heartbeat, job, self.worker_id, self.lease_seconds
+            ):
+                lease_lost.set()
+                cancel_scope.cancel()
+                return
+
+    async def run_job(self, client, limiter, job, slots):
+        """
+        Scrapes a claimed job while keeping its lease
+        """
+        try:
+            lease_lost = anyio.Event()
+            async with anyio.create_task_group() as nursery:
+                nursery.start_soon(
+                    self.keep_lease, job, lease_lost, nursery.cancel_scope
+                )
+
+                dribbble_user = DribbbleUser(
+                    job.username,
+                    None,
+                    sections=self.sections,
+                    client=client,
+                    limiter=limiter,
+                )
+                await dribbble_user.run_scrapers(
+                    dribbble_user.planned_scrapers(self.with_metadata)
+                )
+                nursery.cancel_scope.cancel()
+
+            if lease_lost.is_set():
+                print("✗ {} lease lost, result discarded".format(job.username))
+                return
+
+            self.sink.write(job.username, dribbble_user.projected_data())
+            await self.queue_call(self.queue.complete, job, self.worker_id)
+            self.completed += 1
+            print("✓ {} scraped".format(job.username))
+
+        except Exception as ex:
+            await self.queue_call(self.queue.fail, job, self.worker_id, repr(ex))
+            self.failed += 1
+            print("✗ {} failed: {}".format(job.username, ex))
+
+        finally:
+            slots.release()
+
+    async def run(self):
+        """
+        Processes jobs until cancelled, or until the queue has no
+        claimable job when exit_when_empty is set
+        """
+        slots = anyio.Semaphore(self.concurrency)
+        limiter = anyio.CapacityLimiter(self.max_connections)
+        self.queue_limiter = anyio.CapacityLimiter(1)
+
+        async with AsyncExitStack() as stack:
+            client = self.client or await stack.enter_async_context(httpx.AsyncClient())
+            nursery = await stack.enter_async_context(anyio.create_task_group())
+            while True:
+                await slots.acquire()
+                job = await self.queue_call(
+                    self.queue.claim, self.worker_id, self.lease_seconds
+                )
+
+                if job is None:
+                    slots.release()
+                    if self.exit_when_empty:
+                        break
+                    await anyio.sleep(self.poll_interval)
+                    continue
+
+                nursery.start_soon(self.run_job, client, limiter, job, slots)
+
+        return {"completed": self.completed, "failed": self.failed}
+
+
+def main(argv=None):
+    argv = sys.argv[2:] if argv is None else argv
+    argparser = argparse.ArgumentParser(
+        prog="drbl_py worker",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description=textwrap.dedent(
+            """
+            Scrape username jobs claimed from a shared queue\n
+             """
+        ),
+        epilog="""
+        Example usage
+        -------------\n
+        Queue usernames.\n
+            $ drbl_py worker --queue /shared/jobs.db --enqueue users.txt\n
+
+        Run a worker on every host.\n
+            $ drbl_py worker --queue /shared/jobs.db --sink /shared/results\n
+        """,
+    )
+    argparser.add_argument(
+        "--queue", required=True, help="SQLite queue database on a shared volume.\n"
+    )
+    argparser.add_argument(
+        "--enqueue",
+        help="Queue the usernames of a file, one per line, and exit.\n",
+    )
+    argparser.add_argument(
+        "--sink",
+        default="results",
+        help="Directory receiving one JSON file per user.\nDefault = results\n",
+    )
+    argparser.add_argument(
+        "--worker-id",
+        dest="worker_id",
+        help="Unique worker name.\nDefault = hostname:pid\n",
+    )
+    argparser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Jobs scraped at the same time.\nDefault = 4\n",
+    )
+    argparser.add_argument(
+        "--max-connections",
+        dest="max_connections",
+        type=int,
+        default=20,
+        help="Requests in flight across all jobs.\nDefault = 20\n",
+    )
+    argparser.add_argument(
+        "--lease",
+        type=float,
+        default=120,
+        help="Seconds a job stays leased without a heartbeat.\nDefault = 120\n",
+    )
+    argparser.add_argument(
+        "--max-attempts",
+        dest="max_attempts",
+        type=int,
+        default=3,
+        help="Claims of a job before it is failed.\nDefault = 3\n",
+    )
+    argparser.add_argument(
+        "--exit-when-empty",
+        dest="exit_when_empty",
+        action="store_true",
+        help="Stop once the queue has no claimable job.\n",
+    )
+    argparser.add_argument(
+        "-m",
+        "--get-metadata",
+        action="store_true",
+        help="Get metadata about every user shot.\n",
+    )
+    argparser.add_argument(
+        "-s",
+        "--sections",
+        help="Comma separated sections to scrape.\n",
+        dest="sections",
+    )
+    args = argparser.parse_args(argv)
+
+    queue = SQLiteJobQueue(args.queue, max_attempts=args.max_attempts)
+
+    if args.enqueue:
+        with open(args.enqueue) as usernames_file:
+            usernames = [line.strip() for line in usernames_file if line.strip()]
+        print("Queued {} jobs".format(queue.put(usernames)))
+        print("Queue: {}".format(queue.counts()))
+        queue.close()
+        return
+
+    worker = Worker(
+        queue,
+        DirectorySink(args.sink),
+        args.worker_id or "{}:{}".format(socket.gethostname(), os.getpid()),
+        concurrency=args.concurrency,
+        max_connections=args.max_connections,
+        lease_seconds=args.lease,
+        exit_when_empty=args.exit_when_empty,
+        with_metadata=args.get_metadata,
+        sections=split_csv(args.sections),
+    )
+    try:
+        results = anyio.run(worker.run, backend="trio")
+        print("\nWorker: {}".format(results))
+        print("Queue: {}".format(queue.counts()))
+    except KeyboardInterrupt:
+        print("Exiting dribbble-py...\n")
+        sys.exit(0)
+    finally:
+        queue.close()
@@ -23,13 +23,23 @@ setup(
     include_package_data=True,
     entry_points={"console_scripts": ["drbl_py = dribbble_py.cli:main"]},
     install_requires=[
+        "anyio",
         "art",
         "beautifulsoup4",
         "chompjs",
+        "h11",
         "requests",
         "lxml",
         "httpx",
         "trio",
     ],
+    extras_require={
+        "brotli": ["brotli"],
+        "orjson": ["orjson"],
+        "msgpack": ["msgpack"],
+        "zstd": ["zstandard"],
+        "palette": ["numpy"],
+        "tags": ["numpy", "scipy"],
+    },
     keywords=["dribbble", "dribbble-scraper", "scraper", "graphic-design", "design"],
 )
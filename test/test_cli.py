@@ -0,0 +1,44 @@
+import unittest
+import subprocess
+import sys
+
+
+SCRAPING_MODULES = (
+    "httpx",
+    "bs4",
+    "lxml",
+    "chompjs",
+    "art",
+    "trio",
+    "anyio",
+    "orjson",
+    "msgpack",
+    "zstandard",
+)
+
+
+class TestCli(unittest.TestCase):
+    def test_version_skips_scraping_imports(self):
+        print("Testing drbl_py --version imports...")
+        code = "\n".join(
+            [
+                "import sys",
+                "from dribbble_py.cli import main",
+                "try:",
+                "    main(['drbl_py', '--version'])",
+                "except SystemExit:",
+                "    pass",
+                "print(','.join(m for m in {!r} if m in sys.modules))".format(
+                    SCRAPING_MODULES
+                ),
+            ]
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertIn("0.0.1", result.stdout)
+        self.assertEqual(result.stdout.splitlines()[-1], "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+from unittest import IsolatedAsyncioTestCase
+import os
+import tempfile
+import unittest
+import anyio
+import httpx
+
+from dribbble_py.crawler import Crawler, Frontier, discovered_usernames, DONE
+from dribbble_py.synthetic import SyntheticDribbble
+
+
+class TestCrawler(unittest.TestCase):
+    def test_frontier_deduplicates_breadth_first(self):
+        print("Testing crawl frontier...")
+        frontier = Frontier(":memory:")
+        self.assertEqual(frontier.add(["TonyBabel", "theosm"], 0), 2)
+        self.assertEqual(frontier.add(["tonybabel", "JohnDoe"], 1), 1)
+        self.assertTrue(frontier.seen("THEOSM"))
+
+        self.assertCountEqual(
+            frontier.next_batch(10, max_depth=0), [("TonyBabel", 0), ("theosm", 0)]
+        )
+        frontier.mark("TonyBabel", DONE)
+        self.assertEqual(frontier.requeue_in_progress(), 1)
+        self.assertEqual(
+            frontier.counts(), {"queued": 2, "in_progress": 0, "done": 1, "failed": 0}
+        )
+
+    def test_discovered_usernames(self):
+        print("Testing discovered usernames...")
+        dribbble_user_data = {
+            "team_url": "https://dribbble.com/ueno",
+            "members": {
+                "members_count": 1,
+                "theosm": {"profile_url": "https://dribbble.com/theosm"},
+            },
+            "collections": {
+                "Icons": {
+                    "shots": {
+                        "Logo": {"designer_profile_url": "https://dribbble.com/ueno"},
+                        "Logo 2": {"designer_profile_url": "https://dribbble.comNone"},
+                    }
+                }
+            },
+        }
+        self.assertEqual(discovered_usernames(dribbble_user_data), ["ueno", "theosm"])
+
+
+class TestCrawl(IsolatedAsyncioTestCase):
+    # every synthetic user links to a team, two members and the two
+    # designers of its collection, designers shared by all users
+    synthetic = SyntheticDribbble(shots=4, collections=1, collection_shots=2, members=2)
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.frontier_path = os.path.join(tempfile.mkdtemp(), "crawl.db")
+        self.visited = []
+
+    async def crawl(self, seeds=None, **options):
+        """
+        Crawls the synthetic site from seeds, recording the users visited
+        by their collections page, requested once per scrape
+        """
+        transport = self.synthetic.transport()
+
+        async def handler(request):
+            parts = request.url.path.strip("/").split("/")
+            if parts[1:] == ["collections"]:
+                self.visited.append(parts[0])
+            return await transport.handle_async_request(request)
+
+        frontier = Frontier(self.frontier_path)
+        self.addCleanup(frontier.close)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            crawler = Crawler(
+                frontier,
+                self.output_dir,
+                base_url="http://synthetic.test",
+                client=client,
+                **options,
+            )
+            with anyio.fail_after(20):
+                return await crawler.crawl(seeds), frontier
+
+    async def test_crawl_depth_limit(self):
+        print("Testing crawl depth limit...")
+        counts, frontier = await self.crawl(["JohnDoe"], max_depth=1)
+
+        linked = [
+            "team-JohnDoe",
+            "JohnDoe-member-0",
+            "JohnDoe-member-1",
+            "designer-0-0",
+            "designer-0-1",
+        ]
+        self.assertCountEqual(self.visited, ["JohnDoe"] + linked)
+        self.assertEqual(
+            counts, {"queued": 0, "in_progress": 0, "done": 6, "failed": 0}
+        )
+        self.assertCountEqual(
+            os.listdir(self.output_dir),
+            [username + ".json" for username in ["JohnDoe"] + linked],
+        )
+        # the links of users at the depth limit are not followed
+        self.assertFalse(frontier.seen("team-JohnDoe-member-0"))
+
+    async def test_crawl_budget(self):
+        print("Testing crawl budget...")
+        counts, _ = await self.crawl(["JohnDoe"], max_depth=2, budget=3)
+
+        self.assertEqual(len(self.visited), 3)
+        self.assertEqual(self.visited[0], "JohnDoe")
+        # three linked users are left, besides the team and members linked
+        # from the two which were scraped
+        self.assertEqual(
+            counts, {"queued": 9, "in_progress": 0, "done": 3, "failed": 0}
+        )
+
+    async def test_crawl_resumes_from_frontier(self):
+        print("Testing resumed crawls...")
+        counts, frontier = await self.crawl(["JohnDoe"], max_depth=1, budget=2)
+        self.assertEqual(counts["done"], 2)
+        frontier.close()
+
+        # a user left in progress by an interrupted crawl is scraped again
+        frontier = Frontier(self.frontier_path)
+        interrupted = [
+            username for username, depth in frontier.next_batch(1, max_depth=1)
+        ]
+        frontier.close()
+        first_run = list(self.visited)
+
+        # users already visited are skipped, whatever the case of the seed
+        counts, frontier = await self.crawl(["johndoe"], max_depth=1)
+
+        self.assertEqual(
+            counts, {"queued": 0, "in_progress": 0, "done": 6, "failed": 0}
+        )
+        self.assertEqual(len(self.visited), 6)
+        self.assertCountEqual(self.visited, set(self.visited))
+        self.assertNotIn("johndoe", self.visited)
+        self.assertNotIn(interrupted[0], first_run)
+        self.assertIn(interrupted[0], self.visited[len(first_run) :])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import json
+import tempfile
+import unittest
+
+from dribbble_py.diff import build_index, diff_indexes, diff_snapshots
+
+
+def user_data(followers, shots, collections):
+    return {
+        "user_exists": True,
+        "followers": followers,
+        "following": 10,
+        "shots": {
+            "shots_count": len(shots),
+            "shots": {
+                title: {
+                    "shot_url": "https://dribbble.com/shots/{}-{}".format(
+                        shot_id, title
+                    ),
+                    "metadata": {"likes": likes, "views_count": 100, "saves_count": 1},
+                }
+                for shot_id, title, likes in shots
+            },
+        },
+        "collections": {
+            name: {"collection_url": "https://dribbble.com/collections/" + name}
+            for name in collections
+        },
+    }
+
+
+class TestDiff(unittest.TestCase):
+    def test_diff_indexes(self):
+        print("Testing snapshot diff...")
+        old_index = build_index(
+            user_data(5, [(1, "Logo", 3), (2, "Icons", 4)], ["Icons"])
+        )
+        new_index = build_index(
+            user_data(7, [(1, "Logo Final", 8), (3, "Poster", 0)], ["Icons", "Type"])
+        )
+        changes = list(diff_indexes("JohnDoe", old_index, new_index))
+        self.assertEqual(
+            [change["change"] for change in changes],
+            [
+                "user_stats",
+                "shot_stats",
+                "shot_added",
+                "shot_removed",
+                "collection_added",
+            ],
+        )
+        self.assertEqual(changes[0]["followers"], {"old": 5, "new": 7})
+        self.assertEqual(changes[1]["shot_id"], "1")
+        self.assertEqual(changes[1]["likes"], 5)
+
+    def test_diff_skips_sections_not_scraped(self):
+        print("Testing snapshot diff of a fields run...")
+        old_index = build_index(user_data(5, [(1, "Logo", 3)], ["Icons"]))
+        # drbl_py -f followers scrapes the about page only
+        new_index = build_index({"user_exists": True, "followers": 7, "following": 10})
+        self.assertEqual(
+            list(diff_indexes("JohnDoe", old_index, new_index)),
+            [
+                {
+                    "username": "JohnDoe",
+                    "change": "sections_skipped",
+                    "shots": {"old": "complete", "new": "missing"},
+                    "collections": {"old": "complete", "new": "missing"},
+                },
+                {
+                    "username": "JohnDoe",
+                    "change": "user_stats",
+                    "followers": {"old": 5, "new": 7},
+                },
+            ],
+        )
+
+    def test_diff_skips_sections_cut_short(self):
+        print("Testing snapshot diff of a run past its deadline...")
+        old_index = build_index(
+            user_data(5, [(1, "Logo", 3), (2, "Icons", 4)], ["Icons"])
+        )
+        new_data = user_data(5, [(1, "Logo", 3)], [])
+        new_data["section_status"] = {
+            "about": "complete",
+            "shots": "partial",
+            "collections": "timed_out",
+        }
+        changes = list(diff_indexes("JohnDoe", old_index, build_index(new_data)))
+        self.assertEqual(
+            changes,
+            [
+                {
+                    "username": "JohnDoe",
+                    "change": "sections_skipped",
+                    "shots": {"old": "complete", "new": "partial"},
+                    "collections": {"old": "complete", "new": "timed_out"},
+                }
+            ],
+        )
+
+    def test_diff_snapshot_directories(self):
+        print("Testing snapshot directory diff...")
+        with tempfile.TemporaryDirectory() as old_dir, tempfile.TemporaryDirectory() as new_dir:
+            for directory, username in ((old_dir, "JohnDoe"), (new_dir, "theosm")):
+                with open(os.path.join(directory, username + ".json"), "w") as file:
+                    json.dump(user_data(1, [], []), file)
+
+            self.assertEqual(
+                list(diff_snapshots(old_dir, new_dir)),
+                [
+                    {"username": "JohnDoe", "change": "user_removed"},
+                    {"username": "theosm", "change": "user_added"},
+                ],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,16 @@
 from unittest import IsolatedAsyncioTestCase
 import unittest
 import sys
+import io
+import json
+import anyio
+import httpx
 
 
 sys.path.append("../dribbble_py")
 from dribbble_py import *
+from dribbble_py.synthetic import SyntheticDribbble
+from dribbble_py.utils import aclosing
 
 
 class TestDribbbleUser(IsolatedAsyncioTestCase):
@@ -38,6 +44,574 @@ class TestDribbbleUser(IsolatedAsyncioTestCase):
         self.assertGreaterEqual(drbl_usr.dribbble_user_data["followers"], 0)
         self.assertGreaterEqual(drbl_usr.dribbble_user_data["following"], 0)
 
+    async def test_scrape_with_shared_client(self):
+        print("Testing scrape with a shared client... ")
+        requested_urls = []
+
+        def handler(request):
+            requested_urls.append(str(request.url))
+            return httpx.Response(
+                200,
+                text="""<html><body>
+                <ul><li class="shots"><a><span class="count">1,024</span></a></li></ul>
+                </body></html>""",
+            )
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            drbl_usr = DribbbleUser(
+                "TonyBabel", None, fields=["shots_count"], client=client
+            )
+            await drbl_usr.scrape_user_pages_without_metadata_nursery()
+
+        self.assertEqual(drbl_usr.sections, ["main"])
+        self.assertEqual(requested_urls, ["https://dribbble.com/TonyBabel/"])
+        data = drbl_usr.projected_data()
+        self.assertRegex(data.pop("scraped_at"), r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ$")
+        self.assertEqual(data, {"shots_count": 1024})
+
+    def test_plan_sections(self):
+        print("Testing planned sections... ")
+        self.assertEqual(plan_sections(), list(SECTIONS))
+        self.assertEqual(plan_sections(fields=["shots_count"]), ["main"])
+        self.assertEqual(
+            plan_sections(fields=["followers", "shots_count", "hire_status"]),
+            ["main", "about"],
+        )
+        self.assertEqual(
+            plan_sections(sections=["shots"], fields=["bio"]), ["about", "shots"]
+        )
+        self.assertEqual(plan_sections(fields=list(FIELD_SECTIONS)), list(SECTIONS))
+        self.assertTrue(set(FIELD_SECTIONS.values()).issubset(SECTIONS))
+
+        with self.assertRaises(ValueError):
+            plan_sections(sections=["main", "likes"])
+        with self.assertRaises(ValueError):
+            plan_sections(fields=["shots_count", "likes_count"])
+        with self.assertRaises(ValueError):
+            DribbbleUser("TonyBabel", None, sections=["likes"])
+
+    async def test_main_only_run_makes_one_request(self):
+        print("Testing main only scrape... ")
+        synthetic = SyntheticDribbble(shots=40)
+
+        async with httpx.AsyncClient(transport=synthetic.transport()) as client:
+            drbl_usr = DribbbleUser(
+                "JohnDoe",
+                None,
+                sections=["main"],
+                client=client,
+                base_url="http://synthetic.test",
+            )
+            await drbl_usr.scrape_user_pages_with_metadata_nursery()
+
+        self.assertEqual(synthetic.status_counts, {200: 1})
+        self.assertEqual(drbl_usr.requests_made, 1)
+        self.assertEqual(drbl_usr.dribbble_user_data["shots_count"], 40)
+        self.assertNotIn("shots", drbl_usr.dribbble_user_data)
+
+    async def test_shot_pages_fetched_once(self):
+        print("Testing shot registry... ")
+        requested_urls = []
+        # the shot data sits in the 7th script, after three lines
+        shot_data_script = (
+            "<script>\n\n\n"
+            'var shotData = {shotData: {likesCount: 5, postedOn: "Mar 1, 2021"}}'
+            "</script>"
+        )
+
+        def handler(request):
+            requested_urls.append(str(request.url))
+            return httpx.Response(
+                200,
+                text="<html><body>{}{}</body></html>".format(
+                    "<script></script>" * 6, shot_data_script
+                ),
+            )
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            drbl_usr = DribbbleUser("TonyBabel", None, client=client)
+            shots = {
+                "1": {"title": "Logo", "shot_url": "https://dribbble.com/shots/1-Logo"},
+                "2": {"title": "Logo", "shot_url": "https://dribbble.com/shots/2-Logo"},
+            }
+            goods = {"2": {"title": "Logo", "url": "https://dribbble.com/shots/2"}}
+            await drbl_usr.get_shots_data(shots)
+            await drbl_usr.get_shots_data(goods, "url")
+
+        self.assertEqual(len(requested_urls), 2)
+        self.assertIs(goods["2"]["metadata"], shots["2"]["metadata"])
+        self.assertEqual(shots["1"]["metadata"]["likes"], 5)
+        self.assertEqual(shots["1"]["metadata"]["published_date"], "2021-03-01")
+
+    async def test_page_read_until_markers(self):
+        print("Testing early end of page bodies... ")
+        sent_chunks = []
+
+        def handler(request):
+            chunks = [b"<li class='shots'>12</li>", b"<li class='shot-thumbnail'>"]
+
+            async def body():
+                for chunk in chunks + [b"x" * 1024] * 8:
+                    sent_chunks.append(chunk)
+                    yield chunk
+
+            return httpx.Response(200, content=body())
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            drbl_usr = DribbbleUser("TonyBabel", None, client=client)
+            page = await drbl_usr.get_page(
+                client, drbl_usr.user_pages["main"], ("shot-thumbnail",)
+            )
+            self.assertEqual(len(sent_chunks), 2)
+            self.assertTrue(page.text.endswith("<li class='shot-thumbnail'>"))
+
+            drbl_usr.max_page_bytes = 2048
+            page = await drbl_usr.get_page(client, drbl_usr.user_pages["shots"])
+            self.assertLess(len(page.content), 2048 + 1024)
+
+    async def test_listing_items_parsed_while_downloading(self):
+        print("Testing incremental listing parsing... ")
+        sent_chunks = []
+        parsed_when_sent = []
+        page_items = []
+
+        def shot_thumbnail(shot_id):
+            return (
+                '<li class="shot-thumbnail"><div class="shot-title">Shot {0}</div>'
+                '<a class="shot-thumbnail-link" href="/shots/{0}-Shot"></a></li>'
+            ).format(shot_id)
+
+        def handler(request):
+            chunks = [b"<html><body><ol>"]
+            if request.url.params["page"] == "1":
+                chunks += [shot_thumbnail(1).encode(), shot_thumbnail(2).encode()]
+            chunks.append(b"</ol></body></html>")
+
+            async def body():
+                for chunk in chunks:
+                    sent_chunks.append(chunk)
+                    parsed_when_sent.append(len(page_items))
+                    yield chunk
+
+            return httpx.Response(200, content=body())
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            drbl_usr = DribbbleUser("TonyBabel", None, client=client)
+            await drbl_usr.read_listing(
+                client,
+                drbl_usr.user_pages["shots"] + "?page=1",
+                "li",
+                "shot-thumbnail",
+                drbl_usr.parse_shot_thumbnail,
+                "shots",
+                page_items,
+            )
+            # the first shot was parsed before the rest of its page was sent
+            self.assertEqual(parsed_when_sent, [0, 0, 1, 2])
+            self.assertEqual(page_items[0][1]["title"], "Shot 1")
+
+            sent_chunks.clear()
+            shots = []
+            async for shot in drbl_usr.iter_shots():
+                shots.append((shot, len(sent_chunks)))
+
+        self.assertEqual([shot["shot_id"] for shot, _ in shots], ["1", "2"])
+        # items are handed to the consumer once their page is read
+        self.assertEqual(shots[0][1], 4)
+
+    async def test_section_deadline_keeps_partial_results(self):
+        print("Testing section deadlines... ")
+
+        def handler(request):
+            if request.url.path == "/TonyBabel/":
+                return httpx.Response(
+                    200,
+                    text='<li class="shots"><a><span class="count">16</span></a></li>',
+                )
+
+            async def slow_body():
+                yield (
+                    b'<ol><li class="shot-thumbnail"><div class="shot-title">Logo</div>'
+                    b'<a class="shot-thumbnail-link" href="/shots/1-Logo"></a></li>'
+                )
+                await anyio.sleep(10)
+                yield b"</ol>"
+
+            return httpx.Response(200, content=slow_body())
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            drbl_usr = DribbbleUser(
+                "TonyBabel",
+                None,
+                sections=["main", "shots", "projects"],
+                client=client,
+                section_deadline=0.2,
+            )
+            await drbl_usr.scrape_user_pages_without_metadata_nursery()
+
+        data = drbl_usr.projected_data()
+        self.assertEqual(
+            data["section_status"],
+            {"main": "complete", "shots": "partial", "projects": "timed_out"},
+        )
+        self.assertEqual(list(data["shots"]["shots"]), ["1"])
+        self.assertFalse(drbl_usr.is_complete())
+
+    async def test_spilled_sections_written_to_json(self):
+        print("Testing spilled sections... ")
+
+        def handler(request):
+            return httpx.Response(
+                200,
+                text="""<html><body>
+                <ul><li class="shots"><a><span class="count">1,024</span></a></li></ul>
+                </body></html>""",
+            )
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            drbl_usr = DribbbleUser(
+                "TonyBabel",
+                None,
+                sections=["main"],
+                client=client,
+                spill_threshold=1,
+            )
+            await drbl_usr.scrape_user_pages_without_metadata_nursery()
+
+        self.assertIn("shots_count", drbl_usr.spilled)
+        self.assertNotIn("shots_count", drbl_usr.dribbble_user_data)
+
+        json_file = io.StringIO()
+        drbl_usr.write_json(json_file)
+        self.assertEqual(json.loads(json_file.getvalue())["shots_count"], 1024)
+        self.assertEqual(drbl_usr.projected_data()["shots_count"], 1024)
+        self.assertEqual(drbl_usr.spilled, {})
+
+    async def test_spilled_sections_keep_shot_metadata(self):
+        print("Testing spilled sections with shot metadata... ")
+        synthetic = SyntheticDribbble(shots=40, projects=2, project_shots=5)
+        exports = []
+
+        async with httpx.AsyncClient(transport=synthetic.transport()) as client:
+            for spill_threshold in (None, 1):
+                drbl_usr = DribbbleUser(
+                    "JohnDoe",
+                    None,
+                    sections=["projects", "shots"],
+                    client=client,
+                    base_url="http://synthetic.test",
+                    spill_threshold=spill_threshold,
+                )
+                await drbl_usr.scrape_user_pages_with_metadata_nursery()
+                if spill_threshold:
+                    self.assertIn("projects", drbl_usr.spilled)
+                json_file = io.StringIO()
+                drbl_usr.write_json(json_file)
+                exports.append(json.loads(json_file.getvalue()))
+                exports[-1].pop("scraped_at")
+
+        project_shots = [
+            shot
+            for project in exports[1]["projects"].values()
+            if isinstance(project, dict)
+            for shot in project.get("shots", {}).values()
+        ]
+        self.assertEqual(len(project_shots), 10)
+        self.assertTrue(all(shot["metadata"]["tags"] for shot in project_shots))
+        self.assertEqual(exports[1], exports[0])
+
+    async def test_listing_fragments_with_fallback(self):
+        print("Testing listing fragments... ")
+        shot = (
+            '<li class="shot-thumbnail"><div class="shot-title">Logo</div>'
+            '<a class="shot-thumbnail-link" href="/shots/1-Logo"></a></li>'
+        )
+        member = (
+            '<li class="scrolling-row"><span class="designer-card-username">'
+            '<a class="designer-link" href="/anna">Anna</a></span></li>'
+        )
+        requests = []
+
+        def handler(request):
+            is_fragment = request.headers.get("x-requested-with") == "XMLHttpRequest"
+            requests.append((request.url.path, is_fragment))
+            if request.url.path.endswith("/shots"):
+                # the fragment holds the items without the site layout
+                return httpx.Response(200, text=shot if is_fragment else "")
+            if is_fragment:
+                return httpx.Response(406)
+            if request.url.params["page"] != "1":
+                return httpx.Response(200, text="<!DOCTYPE html><html></html>")
+            return httpx.Response(
+                200,
+                text="<!DOCTYPE html><html><body><ol>{}</ol></body></html>".format(
+                    member
+                ),
+            )
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            drbl_usr = DribbbleUser("TonyBabel", None, client=client)
+            shots = [shot async for shot in drbl_usr.iter_shots()]
+            members = [member async for member in drbl_usr.iter_members()]
+
+        self.assertEqual([shot["shot_id"] for shot in shots], ["1"])
+        self.assertEqual([member["username"] for member in members], ["anna"])
+        self.assertEqual(drbl_usr.fragment_support, {"shots": True, "members": False})
+        # once refused, members pages are requested in full right away
+        self.assertEqual(
+            requests[-3:],
+            [
+                ("/TonyBabel/members", True),
+                ("/TonyBabel/members", False),
+                ("/TonyBabel/members", False),
+            ],
+        )
+
+    async def test_throttled_fragment_page_retried(self):
+        print("Testing throttled listing fragments... ")
+        synthetic = SyntheticDribbble(shots=20)
+        transport = synthetic.transport()
+        throttled = []
+
+        async def handler(request):
+            if request.url.params.get("page") == "2" and not throttled:
+                throttled.append(request.headers.get("x-requested-with"))
+                return httpx.Response(429, headers={"retry-after": "0"})
+            return await transport.handle_async_request(request)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            drbl_usr = DribbbleUser(
+                "JohnDoe", None, client=client, base_url="http://synthetic.test"
+            )
+            drbl_usr.throttle_backoff = 0.01
+            with anyio.fail_after(5):
+                shots = [shot async for shot in drbl_usr.iter_shots()]
+
+        self.assertEqual(throttled, ["XMLHttpRequest"])
+        self.assertEqual(len({shot["shot_id"] for shot in shots}), 20)
+        self.assertEqual(drbl_usr.fragment_support, {"shots": True})
+
+    async def test_early_break_releases_request_slot(self):
+        print("Testing early break out of a listing... ")
+        synthetic = SyntheticDribbble(shots=40)
+        limiter = anyio.CapacityLimiter(1)
+
+        async with httpx.AsyncClient(transport=synthetic.transport()) as client:
+            drbl_usr = DribbbleUser(
+                "JohnDoe",
+                None,
+                client=client,
+                base_url="http://synthetic.test",
+                limiter=limiter,
+            )
+            with anyio.fail_after(5):
+                async for shot in drbl_usr.iter_shots():
+                    break
+                self.assertEqual(limiter.borrowed_tokens, 0)
+                # the only request slot is free for the next request
+                page = await drbl_usr.get_page(client, drbl_usr.user_pages["main"])
+
+        self.assertEqual(shot["shot_id"], str(synthetic.shot_id("JohnDoe", 0)))
+        self.assertEqual(page.status_code, 200)
+
+    async def test_pipeline_with_one_request_slot(self):
+        print("Testing pipelines sharing one request slot... ")
+        synthetic = SyntheticDribbble(shots=60, goods=20)
+
+        async with httpx.AsyncClient(transport=synthetic.transport()) as client:
+            for section, buffer in (("shots", 16), ("goods", 4)):
+                drbl_usr = DribbbleUser(
+                    "JohnDoe",
+                    None,
+                    sections=[section],
+                    client=client,
+                    base_url="http://synthetic.test",
+                    limiter=anyio.CapacityLimiter(1),
+                    pipeline_buffer=buffer,
+                )
+                # more items than the channel holds, with one slot for both stages
+                with anyio.fail_after(10):
+                    await drbl_usr.scrape_user_pages_with_metadata_nursery()
+
+                report = drbl_usr.pipeline_report
+                if section == "shots":
+                    self.assertEqual(
+                        len(drbl_usr.dribbble_user_data["shots"]["shots"]), 60
+                    )
+                    self.assertEqual(report["shots"]["fetched"], 60)
+                else:
+                    self.assertEqual(
+                        len(drbl_usr.dribbble_user_data["goods_for_sale"]), 20
+                    )
+                    self.assertEqual(report["goods_for_sale"]["fetched"], 20)
+
+    async def test_shot_pages_fetched_while_listing(self):
+        print("Testing pipelined shot metadata... ")
+        synthetic = SyntheticDribbble(shots=40, goods=3)
+        transport = synthetic.transport()
+        requests = []
+        in_flight = {"shot": 0, "max_shot": 0}
+
+        async def handler(request):
+            page_type = "shot" if "/shots/" in request.url.path else "listing"
+            requests.append((page_type, request.url.path))
+            if page_type == "shot":
+                in_flight["shot"] += 1
+                in_flight["max_shot"] = max(in_flight["max_shot"], in_flight["shot"])
+            try:
+                await anyio.sleep(0.01)
+                return await transport.handle_async_request(request)
+            finally:
+                if page_type == "shot":
+                    in_flight["shot"] -= 1
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            drbl_usr = DribbbleUser(
+                "JohnDoe",
+                None,
+                sections=["shots", "goods"],
+                client=client,
+                base_url="http://synthetic.test",
+                detail_concurrency=3,
+                pipeline_buffer=2,
+            )
+            await drbl_usr.scrape_user_pages_with_metadata_nursery()
+
+        shots = drbl_usr.dribbble_user_data["shots"]["shots"]
+        self.assertEqual(len(shots), 40)
+        self.assertTrue(all(shot["metadata"]["tags"] for shot in shots.values()))
+        self.assertEqual(len(drbl_usr.dribbble_user_data["goods_for_sale"]), 3)
+
+        # the first shot page is fetched before the last listing page
+        last_listing = max(
+            index
+            for index, (page_type, path) in enumerate(requests)
+            if path.endswith("/shots")
+        )
+        first_shot = [page_type for page_type, _ in requests].index("shot")
+        self.assertLess(first_shot, last_listing)
+        self.assertLessEqual(in_flight["max_shot"], 3)
+
+        # goods share their shot pages with the shots listed with them
+        report = drbl_usr.pipeline_report
+        self.assertEqual(report["goods_for_sale"]["listed"], 3)
+        self.assertEqual(
+            report["shots"]["fetched"] + report["goods_for_sale"]["fetched"], 40
+        )
+        self.assertLessEqual(report["shots"]["max_queue_depth"], 2)
+
+
+class TestListingIterators(IsolatedAsyncioTestCase):
+    def synthetic_user(self, synthetic, requests):
+        """
+        Returns a user of the synthetic site, recording the path and page
+        of every request
+        """
+        transport = synthetic.transport()
+
+        async def handler(request):
+            requests.append((request.url.path, request.url.params.get("page")))
+            return await transport.handle_async_request(request)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.addAsyncCleanup(client.aclose)
+        return DribbbleUser(
+            "JohnDoe", None, client=client, base_url="http://synthetic.test"
+        )
+
+    async def test_listings_paginated(self):
+        print("Testing paginated listings... ")
+        synthetic = SyntheticDribbble(
+            shots=20, projects=1, project_shots=20, collection_shots=12, members=10
+        )
+        requests = []
+        drbl_usr = self.synthetic_user(synthetic, requests)
+        project_url = "http://synthetic.test/JohnDoe/projects/0-project"
+        collection_url = "http://synthetic.test/JohnDoe/collections/0-collection"
+
+        with anyio.fail_after(5):
+            shots = [shot async for shot in drbl_usr.iter_shots()]
+            members = [member async for member in drbl_usr.iter_members()]
+            project_shots = [
+                shot async for shot in drbl_usr.iter_project_shots(project_url)
+            ]
+            collection_shots = [
+                shot async for shot in drbl_usr.iter_collection_shots(collection_url)
+            ]
+
+        self.assertEqual(
+            [shot["shot_id"] for shot in shots],
+            [str(synthetic.shot_id("JohnDoe", index)) for index in range(20)],
+        )
+        self.assertEqual(
+            [member["username"] for member in members],
+            ["JohnDoe-member-{}".format(index) for index in range(10)],
+        )
+        self.assertEqual(
+            [shot["shot_id"] for shot in project_shots],
+            [str(synthetic.shot_id("JohnDoe", index)) for index in range(20)],
+        )
+        self.assertEqual(len({shot["shot_id"] for shot in collection_shots}), 12)
+
+        # listings end on the first empty page, 8 shots and 6 members a page
+        pages = {}
+        for path, page in requests:
+            pages.setdefault(path, []).append(page)
+        self.assertEqual(pages["/JohnDoe/shots"], ["1", "2", "3", "4"])
+        self.assertEqual(pages["/JohnDoe/members"], ["1", "2", "3"])
+        self.assertEqual(pages["/JohnDoe/projects/0-project"], ["1", "2", "3", "4"])
+        # every collection page repeats the same shots
+        self.assertEqual(pages["/JohnDoe/collections/0-collection"], ["1", "2"])
+
+    async def test_listings_stopped_early(self):
+        print("Testing listings stopped early... ")
+        synthetic = SyntheticDribbble(shots=40, project_shots=20, members=20)
+        requests = []
+        drbl_usr = self.synthetic_user(synthetic, requests)
+        project_url = "http://synthetic.test/JohnDoe/projects/0-project"
+
+        with anyio.fail_after(5):
+            for items in (
+                drbl_usr.iter_shots(),
+                drbl_usr.iter_members(),
+                drbl_usr.iter_project_shots(project_url),
+            ):
+                async with aclosing(items):
+                    async for item in items:
+                        break
+                # closed after the first item, no further page is requested
+                self.assertEqual(requests[-1][1], "1")
+                requested = len(requests)
+                with self.assertRaises(StopAsyncIteration):
+                    await items.__anext__()
+                self.assertEqual(len(requests), requested)
+
+        self.assertEqual(len(requests), 3)
+
+    async def test_empty_listings(self):
+        print("Testing empty listings... ")
+        synthetic = SyntheticDribbble(
+            shots=0, project_shots=0, collection_shots=0, members=0
+        )
+        requests = []
+        drbl_usr = self.synthetic_user(synthetic, requests)
+
+        with anyio.fail_after(5):
+            for items in (
+                drbl_usr.iter_shots(),
+                drbl_usr.iter_members(),
+                drbl_usr.iter_project_shots(
+                    "http://synthetic.test/JohnDoe/projects/0-project"
+                ),
+                drbl_usr.iter_collection_shots(
+                    "http://synthetic.test/JohnDoe/collections/0-collection"
+                ),
+            ):
+                self.assertEqual([item async for item in items], [])
+
+        # a single page request per listing
+        self.assertEqual([page for path, page in requests], ["1"] * 4)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,91 @@
+import os
+import json
+import tempfile
+import unittest
+
+from dribbble_py.jobqueue import (
+    JobQueue,
+    MemoryJobQueue,
+    SQLiteJobQueue,
+    DirectorySink,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class JobQueueTests:
+    def make_queue(self, clock):
+        raise NotImplementedError
+
+    def test_claim_heartbeat_complete(self):
+        print("Testing job leases...")
+        clock = FakeClock()
+        queue = self.make_queue(clock)
+        self.assertEqual(queue.put(["TonyBabel", "theosm", "TonyBabel"]), 2)
+
+        job = queue.claim("worker-1", 60)
+        self.assertEqual((job.username, job.attempts), ("TonyBabel", 1))
+        clock.now += 50
+        self.assertTrue(queue.heartbeat(job, "worker-1", 60))
+        self.assertFalse(queue.heartbeat(job, "worker-2", 60))
+        self.assertTrue(queue.complete(job, "worker-1"))
+        self.assertEqual(queue.counts()["done"], 1)
+
+    def test_expired_lease_is_requeued(self):
+        print("Testing expired leases...")
+        clock = FakeClock()
+        queue = self.make_queue(clock)
+        queue.put(["TonyBabel"])
+
+        job = queue.claim("worker-1", 60)
+        self.assertIsNone(queue.claim("worker-2", 60))
+        clock.now += 61
+        taken_over = queue.claim("worker-2", 60)
+        self.assertEqual((taken_over.job_id, taken_over.attempts), (job.job_id, 2))
+        self.assertFalse(queue.complete(job, "worker-1"))
+
+        self.assertTrue(queue.fail(taken_over, "worker-2", "timeout"))
+        self.assertEqual(queue.claim("worker-1", 60).attempts, 3)
+        clock.now += 61
+        self.assertIsNone(queue.claim("worker-1", 60))
+        self.assertEqual(queue.counts()["failed"], 1)
+
+
+class TestMemoryJobQueue(JobQueueTests, unittest.TestCase):
+    def make_queue(self, clock):
+        return MemoryJobQueue(max_attempts=3, clock=clock)
+
+
+class TestSQLiteJobQueue(JobQueueTests, unittest.TestCase):
+    def make_queue(self, clock):
+        directory = tempfile.mkdtemp()
+        return SQLiteJobQueue(
+            os.path.join(directory, "jobs.db"), max_attempts=3, clock=clock
+        )
+
+
+class TestJobQueue(unittest.TestCase):
+    def test_queue_methods_are_abstract(self):
+        print("Testing job queue interface...")
+        with self.assertRaises(TypeError):
+            JobQueue()
+
+
+class TestDirectorySink(unittest.TestCase):
+    def test_write(self):
+        print("Testing directory sink...")
+        sink = DirectorySink(tempfile.mkdtemp())
+        file_path = sink.write("TonyBabel", {"followers": 10})
+        with open(file_path) as json_file:
+            self.assertEqual(json.load(json_file), {"followers": 10})
+        self.assertEqual(os.listdir(sink.path), ["TonyBabel.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
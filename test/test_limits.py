@@ -0,0 +1,85 @@
+from unittest import IsolatedAsyncioTestCase
+import unittest
+
+import anyio
+
+from dribbble_py.limits import MemoryBudget, RequestScheduler
+
+
+class TestRequestScheduler(IsolatedAsyncioTestCase):
+    async def test_interactive_requests_skip_bulk_backlog(self):
+        print("Testing request scheduler priorities...")
+        scheduler = RequestScheduler(4)
+        granted = []
+
+        async def request(priority, flow):
+            async with scheduler.slot(priority, flow):
+                granted.append((priority, flow))
+                await anyio.sleep(0.01)
+
+        async with anyio.create_task_group() as nursery:
+            for index in range(8):
+                nursery.start_soon(request, "bulk", "backfill")
+            await anyio.sleep(0)
+            # bulk requests leave a slot free for interactive ones
+            self.assertEqual(scheduler.class_in_flight["bulk"], 3)
+            nursery.start_soon(request, "interactive", "lookup")
+            await anyio.sleep(0)
+            self.assertIn(("interactive", "lookup"), granted)
+
+        self.assertEqual(scheduler.in_flight, 0)
+
+    async def test_flows_share_slots_fairly(self):
+        print("Testing request scheduler fair queuing...")
+        scheduler = RequestScheduler(1)
+        granted = []
+
+        async def request(flow):
+            async with scheduler.slot("bulk", flow):
+                granted.append(flow)
+                await anyio.sleep(0)
+
+        async with anyio.create_task_group() as nursery:
+            await scheduler.acquire("bulk", "first")
+            for flow in ["big"] * 4 + ["small"] * 2:
+                nursery.start_soon(request, flow)
+            await anyio.sleep(0.01)
+            scheduler.release("bulk")
+
+        self.assertEqual(granted, ["big", "small", "big", "small", "big", "big"])
+
+
+class TestMemoryBudget(IsolatedAsyncioTestCase):
+    async def test_pages_wait_for_budget(self):
+        print("Testing memory budget...")
+        budget = MemoryBudget(100)
+        held = []
+        peak = []
+
+        async def parse(size):
+            async with budget.hold(size):
+                held.append(size)
+                peak.append(budget.used)
+                await anyio.sleep(0.01)
+
+        async with anyio.create_task_group() as nursery:
+            for size in (60, 60, 30, 200):
+                nursery.start_soon(parse, size)
+
+        # pages larger than the budget are parsed alone
+        self.assertEqual(sorted(held), [30, 60, 60, 200])
+        self.assertLessEqual(max(used for used in peak if used != 200), 100)
+        self.assertEqual(budget.used, 0)
+
+    async def test_nested_holds_do_not_wait(self):
+        print("Testing nested memory budget holds...")
+        budget = MemoryBudget(10)
+        with anyio.fail_after(1):
+            async with budget.hold(10):
+                async with budget.hold(10):
+                    self.assertEqual(budget.used, 20)
+        self.assertEqual(budget.used, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from dribbble_py.normalize import Normalizer, parse_count, date_parser
+
+
+class TestNormalize(unittest.TestCase):
+    def test_parse_count(self):
+        print("Testing count parsing...")
+        self.assertEqual(parse_count("1,234"), 1234)
+        self.assertEqual(parse_count("1.2k"), 1200)
+        self.assertEqual(parse_count("3M"), 3000000)
+        self.assertEqual(parse_count("12 Shots"), 12)
+        self.assertEqual(parse_count("12 members"), 12)
+        self.assertEqual(parse_count("12 more"), 12)
+        self.assertEqual(parse_count("3 kits"), 3)
+        self.assertEqual(parse_count("4k views"), 4000)
+        self.assertEqual(parse_count(None), 0)
+        self.assertRaises(ValueError, parse_count, "none yet")
+        self.assertEqual(parse_count("Shots: 12."), 12)
+        self.assertRaises(ValueError, parse_count, "12kB")
+        self.assertRaises(ValueError, parse_count, "123mm")
+
+    def test_normalize_records_errors(self):
+        print("Testing batch normalization...")
+        normalizer = Normalizer()
+        records = normalizer.normalize(
+            "projects",
+            [
+                {"shots_count": "4 Shots", "updated_date": "March 1, 2021"},
+                {"shots_count": "many", "updated_date": "March 2, 2021"},
+            ],
+            {"shots_count": parse_count, "updated_date": date_parser("%B %d, %Y")},
+        )
+        self.assertEqual(records[0], {"shots_count": 4, "updated_date": "2021-03-01"})
+        self.assertEqual(
+            records[1], {"shots_count": None, "updated_date": "2021-03-02"}
+        )
+        self.assertEqual(len(normalizer.errors), 1)
+        self.assertEqual(normalizer.errors[0]["field"], "shots_count")
+        self.assertEqual(normalizer.errors[0]["value"], "many")
+
+
+if __name__ == "__main__":
+    unittest.main()
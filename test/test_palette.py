@@ -0,0 +1,62 @@
+import os
+import json
+import tempfile
+import unittest
+
+from dribbble_py import palette
+from dribbble_py.palette import PaletteIndex
+
+
+@unittest.skipIf(palette.np is None, "numpy is not installed")
+class TestPaletteIndex(unittest.TestCase):
+    def setUp(self):
+        self.palette_index = PaletteIndex.build(
+            [
+                ("1", ["#FF6600", "#FFFFFF"]),
+                ("2", ["#0033CC", "#000000", "#FFFFFF"]),
+                ("3", ["#FF6611", "#FAFAFA"]),
+                ("4", ["not a colour"]),
+            ]
+        )
+
+    def test_near_color(self):
+        print("Testing palette colour search...")
+        self.assertEqual(len(self.palette_index), 3)
+        matches = self.palette_index.near_color("#ff6600", limit=2)
+        self.assertEqual([shot_id for shot_id, _ in matches], ["1", "3"])
+        self.assertAlmostEqual(matches[0][1], 0, places=3)
+
+    def test_similar_palettes(self):
+        print("Testing palette similarity...")
+        matches = self.palette_index.similar_to_shot("1")
+        self.assertEqual([shot_id for shot_id, _ in matches], ["3", "2"])
+        self.assertEqual(
+            self.palette_index.similar(["#ff6600", "#fff"], limit=1)[0][0], "1"
+        )
+
+    def test_saved_index_is_memory_mapped(self):
+        print("Testing saved palette index...")
+        with tempfile.TemporaryDirectory() as index_dir:
+            self.palette_index.save(index_dir)
+            loaded_index = PaletteIndex.load(index_dir)
+            self.assertIsInstance(loaded_index.colors, palette.np.memmap)
+            self.assertEqual(loaded_index.near_color("#0033cc", limit=1)[0][0], "2")
+
+    def test_build_from_snapshots(self):
+        print("Testing palette index of a snapshot...")
+        user_data = {
+            "shots": {"shots": {"5": {"metadata": {"color_palette": ["#123456"]}}}},
+            "collections": {
+                "Icons": {"shots": {"6": {"metadata": {"color_palette": ["#abc"]}}}}
+            },
+        }
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            with open(os.path.join(snapshot_dir, "JohnDoe.json"), "w") as user_file:
+                json.dump(user_data, user_file)
+            palette_index = PaletteIndex.from_snapshots([snapshot_dir])
+
+        self.assertEqual(sorted(palette_index.shot_ids), ["5", "6"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+from unittest import IsolatedAsyncioTestCase
+import os
+import io
+import time
+import tempfile
+import unittest
+
+import httpx
+
+from dribbble_py.dribbble_user import DribbbleUser
+from dribbble_py.profiling import PhaseProfiler
+
+
+class TestPhaseProfiler(IsolatedAsyncioTestCase):
+    def test_nested_phases_exclude_inner_time(self):
+        print("Testing nested profiler phases...")
+        profiler = PhaseProfiler(functions=False)
+        with profiler.phase("extract", "collections"):
+            with profiler.phase("fetch", "collection"):
+                time.sleep(0.05)
+
+        self.assertLess(profiler.phases[("extract", "collections")][1], 0.04)
+        self.assertGreaterEqual(profiler.phases[("fetch", "collection")][1], 0.05)
+        self.assertEqual(
+            sorted(profiler.stacks),
+            ["extract:collections", "extract:collections;fetch:collection"],
+        )
+
+    async def test_scrape_phases_per_page_type(self):
+        print("Testing scrape profiling...")
+
+        def handler(request):
+            return httpx.Response(
+                200,
+                text="""<html><body>
+                <ul><li class="shots"><a><span class="count">1,024</span></a></li></ul>
+                </body></html>""",
+            )
+
+        profiler = PhaseProfiler()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            drbl_usr = DribbbleUser(
+                "TonyBabel", None, sections=["main"], client=client, profiler=profiler
+            )
+            with profiler.run():
+                await drbl_usr.scrape_user_pages_without_metadata_nursery()
+                drbl_usr.write_data(io.BytesIO())
+
+        self.assertEqual(
+            set(profiler.phases),
+            {
+                ("fetch", "main"),
+                ("parse", "main"),
+                ("extract", "main"),
+                ("normalize", "main"),
+                ("export", "json"),
+            },
+        )
+        with tempfile.TemporaryDirectory() as profile_dir:
+            file_paths = profiler.write(os.path.join(profile_dir, "profile"))
+            self.assertEqual(
+                [os.path.splitext(file_path)[1] for file_path in file_paths],
+                [".txt", ".folded", ".pstats"],
+            )
+            with open(file_paths[1]) as stacks_file:
+                self.assertIn("extract:main;normalize:main ", stacks_file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
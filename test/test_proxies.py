@@ -0,0 +1,150 @@
+from unittest import IsolatedAsyncioTestCase
+import unittest
+
+import anyio
+import httpx
+
+from dribbble_py.dribbble_user import DribbbleUser
+from dribbble_py.proxies import ProxyPool, is_challenge_page
+from dribbble_py.synthetic import SyntheticDribbble
+
+
+class TestProxyPool(IsolatedAsyncioTestCase):
+    def mock_pool(self, handler, proxies, **kwargs):
+        """
+        Returns a pool whose clients answer with handler(proxy, request)
+        """
+
+        def client_factory(proxy):
+            return httpx.AsyncClient(
+                transport=httpx.MockTransport(lambda request: handler(proxy, request))
+            )
+
+        return ProxyPool(proxies, client_factory=client_factory, **kwargs)
+
+    async def test_requests_spread_across_exits(self):
+        print("Testing requests spread across proxies...")
+        user_agents = {}
+
+        def handler(proxy, request):
+            user_agents.setdefault(proxy, set()).add(request.headers["user-agent"])
+            return httpx.Response(200, text="ok")
+
+        proxies = ["http://proxy-a:8080", "http://proxy-b:8080", "direct"]
+        async with self.mock_pool(handler, proxies) as pool:
+            for _ in range(9):
+                async with pool.stream("http://dribbble.test/") as response:
+                    await response.aread()
+
+        self.assertEqual([report["requests"] for report in pool.report()], [3, 3, 3])
+        self.assertEqual(
+            set(user_agents), {"http://proxy-a:8080", "http://proxy-b:8080", None}
+        )
+        # every exit keeps one header profile while it is not blocked
+        self.assertEqual(len(set.union(*user_agents.values())), 3)
+        self.assertTrue(all(len(agents) == 1 for agents in user_agents.values()))
+
+    async def test_throttled_exit_cools_down(self):
+        print("Testing proxy cooldown after a 429...")
+
+        def handler(proxy, request):
+            if proxy == "http://throttled:8080":
+                return httpx.Response(429, headers={"retry-after": "120"})
+            return httpx.Response(200, text="ok")
+
+        proxies = ["http://throttled:8080", "http://healthy:8080"]
+        async with self.mock_pool(handler, proxies, cooldown=30) as pool:
+            for _ in range(4):
+                async with pool.stream("http://dribbble.test/") as response:
+                    self.assertEqual(response.status_code, 200)
+
+        throttled, healthy = pool.exits
+        self.assertEqual((throttled.requests, throttled.blocked), (1, 1))
+        self.assertEqual(healthy.requests, 4)
+        self.assertLess(throttled.health, healthy.health)
+        self.assertGreater(throttled.cooldown_until - healthy.cooldown_until, 100)
+
+    async def test_challenge_page_penalizes_exit(self):
+        print("Testing challenge pages through a proxy pool...")
+        synthetic = SyntheticDribbble(shots=10, members=0)
+        transport = synthetic.transport()
+
+        async def handler(proxy, request):
+            if proxy == "http://challenged:8080":
+                return httpx.Response(
+                    200, text="<html><title>Just a moment...</title></html>"
+                )
+            return await transport.handle_async_request(request)
+
+        pool = self.mock_pool(
+            handler, ["http://challenged:8080", "http://healthy:8080"], retries=0
+        )
+        drbl_usr = DribbbleUser(
+            "JohnDoe",
+            None,
+            sections=["main"],
+            base_url="http://synthetic.test",
+            proxy_pool=pool,
+        )
+        await drbl_usr.scrape_user_pages_without_metadata_nursery()
+
+        challenged, healthy = pool.exits
+        self.assertEqual(challenged.blocked, 1)
+        self.assertEqual(healthy.blocked, 0)
+        self.assertIsNone(healthy.client)
+
+    async def test_user_check_and_redirects_through_pool(self):
+        print("Testing user check and social links through a proxy pool...")
+        synthetic = SyntheticDribbble(shots=10, members=0)
+        transport = synthetic.transport()
+        requests = []
+
+        async def handler(proxy, request):
+            requests.append((proxy, request.url.path))
+            return await transport.handle_async_request(request)
+
+        pool = self.mock_pool(handler, ["http://proxy-a:8080"])
+        drbl_usr = DribbbleUser(
+            "JohnDoe",
+            None,
+            sections=["about"],
+            base_url="http://synthetic.test",
+            proxy_pool=pool,
+            limiter=anyio.CapacityLimiter(1),
+        )
+        await drbl_usr.scrape_user_pages_without_metadata_nursery(find_user=True)
+
+        self.assertEqual(drbl_usr.dribbble_user_data["user_exists"], "Yes")
+        # the synthetic links all lead to one host, the last link wins
+        self.assertEqual(
+            drbl_usr.dribbble_user_data["social_media_profiles"]["synthetic.test"],
+            "http://synthetic.test/external/behance/JohnDoe",
+        )
+        # the user check, the about page, and each social link and its redirect
+        self.assertEqual(len(requests), 2 + 2 * 3)
+        self.assertTrue(all(proxy == "http://proxy-a:8080" for proxy, _ in requests))
+        self.assertEqual(drbl_usr.requests_made, len(requests))
+
+        missing_usr = DribbbleUser(
+            "missing-user", None, base_url="http://synthetic.test", proxy_pool=pool
+        )
+        await missing_usr.find_user()
+        self.assertEqual(missing_usr.dribbble_user_data["user_exists"], "No")
+        self.assertEqual(requests[-1], ("http://proxy-a:8080", "/missing-user/"))
+
+    def test_captcha_widget_is_no_challenge(self):
+        print("Testing challenge page markers...")
+        page = (
+            b"<!DOCTYPE html><html><head><title>Sign up | Dribbble</title>"
+            b"<script src='https://www.google.com/recaptcha/api.js'></script>"
+            b"<script src='https://js.hcaptcha.com/1/api.js'></script></head>"
+            b"<body><div class='h-captcha'></div></body></html>"
+        )
+        self.assertFalse(is_challenge_page(page))
+        self.assertTrue(
+            is_challenge_page(b"<html><head><title>Just a moment...</title></head>")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
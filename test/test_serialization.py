@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from dribbble_py import serialization
+from dribbble_py.jobqueue import DirectorySink
+from dribbble_py.serialization import load, output_path, split_extension, write
+
+USER_DATA = {
+    "followers": 1024,
+    "location": "Zürich",
+    "shots": {"shots_count": 1, "shots": {"123": {"title": "Logo", "likes": 5}}},
+}
+
+
+class TestSerialization(unittest.TestCase):
+    def test_extensions_choose_format(self):
+        print("Testing data file extensions...")
+        self.assertEqual(
+            split_extension("JohnDoe.msgpack.zst"), ("JohnDoe", "msgpack", "zstd")
+        )
+        self.assertEqual(split_extension("JohnDoe.txt"), ("JohnDoe.txt", None, None))
+        self.assertEqual(output_path("JohnDoe"), "JohnDoe.json")
+        self.assertEqual(output_path("JohnDoe", "json", "gzip"), "JohnDoe.json.gz")
+        self.assertEqual(
+            output_path("JohnDoe.msgpack", "json", "gzip"), "JohnDoe.msgpack"
+        )
+
+    def test_round_trips(self):
+        print("Testing data format round trips...")
+        extensions = [".json", ".json.gz"]
+        if serialization.optional_module("zstandard") is not None:
+            extensions.append(".json.zst")
+        if serialization.optional_module("msgpack") is not None:
+            extensions += [".msgpack", ".msgpack.gz"]
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            for extension in extensions:
+                file_path = os.path.join(data_dir, "JohnDoe" + extension)
+                write(file_path, USER_DATA)
+                self.assertEqual(load(file_path), USER_DATA, extension)
+
+    def test_directory_sink_compresses(self):
+        print("Testing compressed sink...")
+        with tempfile.TemporaryDirectory() as data_dir:
+            sink = DirectorySink(data_dir, compression="gzip")
+            file_path = sink.write("JohnDoe", USER_DATA)
+            self.assertTrue(file_path.endswith("JohnDoe.json.gz"))
+            self.assertEqual(load(file_path), USER_DATA)
+
+            file_path = sink.write(
+                "theosm",
+                lambda data_file, data_format: data_file.write(b'{"followers": 1}'),
+            )
+            self.assertEqual(load(file_path), {"followers": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
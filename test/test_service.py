@@ -0,0 +1,168 @@
+from unittest import IsolatedAsyncioTestCase
+import os
+import json
+import time
+import tempfile
+import unittest
+import anyio
+import httpx
+
+from dribbble_py.http_server import serve_http
+from dribbble_py.limits import RequestScheduler
+from dribbble_py.service import ScrapeService
+
+MAIN_PAGE = """<html><body>
+<ul><li class="shots"><a><span class="count">12</span></a></li></ul>
+</body></html>"""
+
+
+class TestScrapeService(IsolatedAsyncioTestCase):
+    def make_service(self, handler, **kwargs):
+        service = ScrapeService(**kwargs)
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        service.scheduler = RequestScheduler(service.max_connections)
+        self.addAsyncCleanup(service.client.aclose)
+        return service
+
+    async def test_identical_jobs_share_a_scrape(self):
+        print("Testing shared scrape jobs...")
+        requests = []
+
+        async def handler(request):
+            requests.append(request.url.path)
+            await anyio.sleep(0.05)
+            return httpx.Response(200, text=MAIN_PAGE)
+
+        service = self.make_service(handler)
+        job = {"username": "TonyBabel", "sections": ["main"]}
+        results = []
+
+        async def scrape():
+            results.append(await service.scrape(job))
+
+        async with anyio.create_task_group() as nursery:
+            for _ in range(3):
+                nursery.start_soon(scrape)
+
+        self.assertEqual(requests, ["/TonyBabel/"])
+        self.assertEqual([data["shots_count"] for data in results], [12, 12, 12])
+        self.assertEqual(service.in_flight, {})
+
+        # the next identical job is answered from the cache
+        await service.scrape(job)
+        self.assertEqual(len(requests), 1)
+
+    async def test_cancelled_scrape_runs_again_for_waiters(self):
+        print("Testing cancelled shared scrape jobs...")
+        requests = []
+
+        async def handler(request):
+            requests.append(request.url.path)
+            await anyio.sleep(0.05)
+            return httpx.Response(200, text=MAIN_PAGE)
+
+        service = self.make_service(handler)
+        job = {"username": "TonyBabel", "sections": ["main"]}
+        results = []
+
+        async def leader():
+            with leader_scope:
+                await service.scrape(job)
+
+        async def waiter():
+            results.append(await service.scrape(job))
+
+        leader_scope = anyio.CancelScope()
+        async with anyio.create_task_group() as nursery:
+            nursery.start_soon(leader)
+            await anyio.sleep(0.01)
+            nursery.start_soon(waiter)
+            nursery.start_soon(waiter)
+            await anyio.sleep(0.01)
+            leader_scope.cancel()
+
+        self.assertEqual(len(requests), 2)
+        self.assertEqual([data["shots_count"] for data in results], [12, 12])
+
+    def test_cache_expiry_and_eviction(self):
+        print("Testing result cache...")
+        service = ScrapeService(cache_ttl=60, cache_size=2)
+        service.store("a", {"followers": 1})
+        service.store("b", {"followers": 2})
+        self.assertEqual(service.cached("a"), {"followers": 1})
+
+        # b is the least recently used result
+        service.store("c", {"followers": 3})
+        self.assertEqual(list(service.cache), ["a", "c"])
+        self.assertIsNone(service.cached("b"))
+
+        service.cache["a"] = (time.monotonic() - 61, {"followers": 1})
+        self.assertIsNone(service.cached("a"))
+        self.assertEqual(list(service.cache), ["c"])
+
+
+class TestHTTPService(IsolatedAsyncioTestCase):
+    async def test_scrape_and_jobs_endpoints(self):
+        print("Testing service endpoints...")
+
+        def handler(request):
+            return httpx.Response(200, text=MAIN_PAGE)
+
+        service = ScrapeService()
+        service.scheduler = RequestScheduler(service.max_connections)
+        unix_socket = os.path.join(tempfile.mkdtemp(), "drbl.sock")
+
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as service.client, httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(uds=unix_socket),
+            base_url="http://service",
+        ) as client, anyio.create_task_group() as nursery:
+            nursery.start_soon(serve_http, service.handle, None, None, unix_socket)
+            with anyio.fail_after(5):
+                while not os.path.exists(unix_socket):
+                    await anyio.sleep(0.01)
+
+                response = await client.get(
+                    "/scrape", params={"username": "TonyBabel", "sections": "main"}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["shots_count"], 12)
+
+                response = await client.post(
+                    "/jobs",
+                    json=[
+                        {"username": "TonyBabel", "sections": ["main"]},
+                        {"username": "theosm", "sections": ["main"]},
+                    ],
+                )
+                self.assertEqual(
+                    response.headers["content-type"], "application/x-ndjson"
+                )
+                lines = [json.loads(line) for line in response.text.splitlines()]
+                self.assertEqual(
+                    sorted(line["username"] for line in lines), ["TonyBabel", "theosm"]
+                )
+                self.assertTrue(
+                    all(line["data"]["shots_count"] == 12 for line in lines)
+                )
+
+                # bad requests
+                response = await client.get("/scrape")
+                self.assertEqual(response.status_code, 400)
+                response = await client.get(
+                    "/scrape", params={"username": "TonyBabel", "sections": "likes"}
+                )
+                self.assertEqual(response.status_code, 400)
+                response = await client.post(
+                    "/jobs", json=[{"username": "TonyBabel", "priority": "urgent"}]
+                )
+                self.assertEqual(response.status_code, 400)
+                response = await client.post("/jobs", content=b"{")
+                self.assertEqual(response.status_code, 400)
+
+            nursery.cancel_scope.cancel()
+
+
+if __name__ == "__main__":
+    unittest.main()
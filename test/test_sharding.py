@@ -0,0 +1,157 @@
+from unittest import IsolatedAsyncioTestCase
+import os
+import json
+import tempfile
+import unittest
+import anyio
+import httpx
+
+from dribbble_py.sharding import (
+    merge_memory_reports,
+    run_sharded,
+    scrape_batch,
+    shard,
+    worker_options,
+)
+from dribbble_py.synthetic import SyntheticDribbble
+
+
+def batch_options(**options):
+    return {
+        "output_dir": tempfile.mkdtemp(),
+        "concurrency": 8,
+        "max_connections": 20,
+        "rate": None,
+        "with_metadata": False,
+        "sections": None,
+        "fields": None,
+        "deadline": None,
+        "section_deadline": None,
+        "memory_budget": None,
+        "spill_threshold": None,
+        "memory_report": False,
+        "data_format": "json",
+        "compression": None,
+        "base_url": "http://synthetic.test",
+        "proxies": None,
+        "proxy_rate": None,
+        "proxy_cooldown": 60,
+        "listing_concurrency": 2,
+        "detail_concurrency": 4,
+        **options,
+    }
+
+
+class TestSharding(unittest.TestCase):
+    def test_shard(self):
+        print("Testing username shards...")
+        usernames = ["a", "b", "c", "d", "e"]
+        self.assertEqual(shard(usernames, 2), [["a", "c", "e"], ["b", "d"]])
+        self.assertEqual(shard(usernames, 1), [usernames])
+        self.assertEqual(shard(["a"], 3), [["a"], [], []])
+
+    def test_worker_options(self):
+        print("Testing per worker limits...")
+        options = worker_options(
+            4,
+            batch_options(
+                max_connections=10, rate=8.0, proxy_rate=2.0, memory_budget=1000
+            ),
+        )
+        self.assertEqual(options["concurrency"], 2)
+        self.assertEqual(options["max_connections"], 2)
+        self.assertEqual(options["rate"], 2.0)
+        self.assertEqual(options["proxy_rate"], 0.5)
+        self.assertEqual(options["memory_budget"], 250)
+
+        # every worker keeps one user and one connection
+        options = worker_options(8, batch_options(concurrency=4, max_connections=4))
+        self.assertEqual((options["concurrency"], options["max_connections"]), (1, 1))
+        self.assertIsNone(options["rate"])
+        self.assertIsNone(options["memory_budget"])
+
+    def test_merge_memory_reports(self):
+        print("Testing merged memory reports...")
+        merged = merge_memory_reports(
+            [
+                {"main": {"pages": 1, "max_page_bytes": 10, "max_parse_peak_bytes": 5}},
+                {
+                    "main": {
+                        "pages": 2,
+                        "max_page_bytes": 4,
+                        "max_parse_peak_bytes": 9,
+                    },
+                    "shots": {
+                        "pages": 3,
+                        "max_page_bytes": 7,
+                        "max_parse_peak_bytes": 1,
+                    },
+                },
+            ]
+        )
+        self.assertEqual(
+            merged,
+            {
+                "main": {"pages": 3, "max_page_bytes": 10, "max_parse_peak_bytes": 9},
+                "shots": {"pages": 3, "max_page_bytes": 7, "max_parse_peak_bytes": 1},
+            },
+        )
+
+    def test_failed_shard_users_in_summary(self):
+        print("Testing failed shards...")
+        output_dir = tempfile.mkdtemp()
+
+        # the client of every shard rejects the proxy before any user reports
+        summary = run_sharded(
+            ["a", "b", "c"],
+            2,
+            output_dir,
+            base_url="http://synthetic.test",
+            proxies=["ftp://proxy:21"],
+        )
+        with open(os.path.join(output_dir, "summary.json")) as summary_file:
+            self.assertEqual(json.load(summary_file), summary)
+
+        self.assertEqual(summary["failed"], 3)
+        self.assertEqual(summary["failed_workers"], [0, 1])
+        self.assertEqual(sorted(summary["users"]), ["a", "b", "c"])
+        self.assertTrue(
+            all("ValueError" in user["error"] for user in summary["users"].values())
+        )
+
+
+class TestScrapeBatch(IsolatedAsyncioTestCase):
+    async def test_scrape_batch(self):
+        print("Testing batch scrapes...")
+        synthetic = SyntheticDribbble(shots=30, goods=4)
+        usernames = ["JohnDoe", "theosm", "TonyBabel"]
+        progress = []
+
+        # the share of a worker of four with four connections in all
+        options = worker_options(
+            4,
+            batch_options(
+                concurrency=4,
+                max_connections=4,
+                with_metadata=True,
+                sections=["main", "goods", "shots"],
+            ),
+        )
+        async with httpx.AsyncClient(transport=synthetic.transport()) as client:
+            with anyio.fail_after(20):
+                await scrape_batch(
+                    usernames, report=progress.append, client=client, **options
+                )
+
+        self.assertEqual(
+            sorted(user["username"] for user in progress), sorted(usernames)
+        )
+        self.assertTrue(all(user["status"] == "done" for user in progress))
+        with open(os.path.join(options["output_dir"], "theosm.json")) as json_file:
+            data = json.load(json_file)
+        self.assertEqual(len(data["shots"]["shots"]), 30)
+        self.assertEqual(len(data["goods_for_sale"]), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
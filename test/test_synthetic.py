@@ -0,0 +1,90 @@
+from unittest import IsolatedAsyncioTestCase
+import io
+import json
+import socket
+import unittest
+
+import anyio
+import httpx
+
+from dribbble_py.dribbble_user import DribbbleUser
+from dribbble_py.http_server import serve_http
+from dribbble_py.synthetic import SyntheticDribbble
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class TestSyntheticDribbble(IsolatedAsyncioTestCase):
+    async def test_scrape_synthetic_server(self):
+        print("Testing a scrape of the synthetic server...")
+        synthetic = SyntheticDribbble(shots=30, members=8, goods=3)
+        port = free_port()
+
+        async with anyio.create_task_group() as nursery:
+            nursery.start_soon(serve_http, synthetic.handle, "127.0.0.1", port)
+            await anyio.sleep(0.1)
+
+            drbl_usr = DribbbleUser(
+                "JohnDoe", None, base_url="http://127.0.0.1:{}/".format(port)
+            )
+            await drbl_usr.scrape_user_pages_with_metadata_nursery()
+            nursery.cancel_scope.cancel()
+
+        data_file = io.BytesIO()
+        drbl_usr.write_data(data_file)
+        data = json.loads(data_file.getvalue())
+
+        self.assertTrue(drbl_usr.is_complete())
+        self.assertEqual(len(data["shots"]["shots"]), 30)
+        self.assertEqual(data["members"]["members_count"], 8)
+        self.assertEqual(len(data["members"]), 8 + 1)
+        self.assertEqual(len(data["goods_for_sale"]), 3)
+        self.assertEqual(len(data["projects"]), 2)
+        # every social link redirects to the synthetic server itself
+        self.assertEqual(
+            data["social_media_profiles"],
+            {"127.0.0.1": "http://127.0.0.1:{}/external/behance/JohnDoe".format(port)},
+        )
+        for shot in data["shots"]["shots"].values():
+            self.assertEqual(len(shot["metadata"]["tags"]), 4)
+        self.assertEqual(sorted(synthetic.status_counts), [200, 302])
+
+    async def test_listing_fragments_and_not_found(self):
+        print("Testing synthetic listing fragments...")
+        synthetic = SyntheticDribbble(shots=30)
+        host = "http://synthetic.test"
+
+        status, _, page = synthetic.route("/JohnDoe/shots", {"page": "2"}, {}, host)
+        _, _, fragment = synthetic.route(
+            "/JohnDoe/shots",
+            {"page": "2"},
+            {"x-requested-with": "XMLHttpRequest"},
+            host,
+        )
+        self.assertEqual(status, 200)
+        self.assertTrue(page.startswith(b"<!DOCTYPE html>"))
+        self.assertFalse(fragment.startswith(b"<!DOCTYPE html>"))
+        self.assertIn(fragment, page)
+        self.assertEqual(fragment.count(b"class='shot-thumbnail'"), 6)
+
+        status, _, page = synthetic.route("/missing-user/", {}, {}, host)
+        self.assertEqual(status, 404)
+        self.assertIn(b"message-404", page)
+
+    async def test_injected_throttling(self):
+        print("Testing synthetic throttling...")
+        synthetic = SyntheticDribbble(throttle_rate=1)
+        async with httpx.AsyncClient(transport=synthetic.transport()) as client:
+            response = await client.get("http://synthetic.test/JohnDoe/")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["retry-after"], "1")
+        self.assertEqual(synthetic.status_counts, {429: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
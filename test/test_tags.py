@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from dribbble_py import tags
+from dribbble_py.tags import TagAnalytics
+
+
+def user_data(shots, skills, collected=None):
+    return {
+        "skills": skills,
+        "shots": {
+            "shots": {
+                shot_id: {
+                    "metadata": {
+                        "tags": shot_tags,
+                        "views_count": views,
+                        "likes": likes,
+                    }
+                }
+                for shot_id, shot_tags, views, likes in shots
+            }
+        },
+        "collections": {
+            "Saved": {
+                "shots": {
+                    shot_id: {"metadata": {"tags": shot_tags}}
+                    for shot_id, shot_tags in collected or []
+                }
+            }
+        },
+    }
+
+
+@unittest.skipIf(tags.sparse is None, "scipy is not installed")
+class TestTagAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.tag_analytics = TagAnalytics()
+        self.tag_analytics.update(
+            [
+                (
+                    "JohnDoe",
+                    user_data(
+                        [
+                            ("1", ["Logo", "branding"], 100, 10),
+                            ("2", ["logo", "icon"], 50, 5),
+                        ],
+                        ["Figma", "Branding"],
+                    ),
+                ),
+                (
+                    "theosm",
+                    user_data(
+                        [("3", ["logo", "branding"], 10, 1)],
+                        ["figma"],
+                        collected=[("1", ["logo", "branding"])],
+                    ),
+                ),
+            ]
+        )
+
+    def test_related_tags(self):
+        print("Testing related tags...")
+        related = self.tag_analytics.related("logo")
+        self.assertEqual([tag for tag, _, _ in related], ["branding", "icon"])
+        self.assertEqual(related[0][1], 2)
+        self.assertAlmostEqual(related[0][2], 2 / 3)
+        self.assertEqual(
+            self.tag_analytics.related("figma", source="skills")[0][:2],
+            ("branding", 1),
+        )
+
+    def test_engagement_and_owners(self):
+        print("Testing tag engagement...")
+        # the collected copy of shot 1 keeps its owner and counters
+        top = self.tag_analytics.top_tags("views")
+        self.assertEqual(top[0][:4], ("logo", 3, 160, 16))
+        user_tags = self.tag_analytics.user_tags()
+        john_row = list(self.tag_analytics.usernames).index("JohnDoe")
+        logo_column = self.tag_analytics.columns["logo"]
+        self.assertEqual(user_tags[john_row, logo_column], 2)
+
+    def test_incremental_update_and_reload(self):
+        print("Testing incremental tag updates...")
+        self.tag_analytics.update(
+            [("JohnDoe", user_data([("2", ["icon", "ui"], 80, 8)], ["figma"]))]
+        )
+        self.assertEqual(len(self.tag_analytics.shot_ids), 3)
+        self.assertEqual(self.tag_analytics.related("ui")[0][0], "icon")
+
+        with tempfile.TemporaryDirectory() as db_dir:
+            db_path = os.path.join(db_dir, "tags.npz")
+            self.tag_analytics.save(db_path)
+            loaded = TagAnalytics.load(db_path)
+
+        self.assertEqual(loaded.top_tags("views"), self.tag_analytics.top_tags("views"))
+        self.assertEqual(
+            (loaded.cooccurrence() != self.tag_analytics.cooccurrence()).nnz, 0
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
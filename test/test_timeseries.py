@@ -0,0 +1,93 @@
+import os
+import json
+import tempfile
+import unittest
+
+from dribbble_py.timeseries import TimeSeriesStore, main, parse_time, sample_time
+
+
+class TestTimeSeries(unittest.TestCase):
+    def test_append_skips_unchanged_values(self):
+        print("Testing time-series append...")
+        store = TimeSeriesStore(":memory:")
+        dribbble_user_data = {
+            "followers": 10,
+            "shots": {
+                "shots": {
+                    "Logo": {
+                        "shot_url": "https://dribbble.com/shots/123-Logo",
+                        "metadata": {
+                            "likes": 1,
+                            "views_count": 50,
+                            "saves_count": None,
+                        },
+                    }
+                }
+            },
+        }
+        self.assertEqual(store.record_user("JohnDoe", dribbble_user_data, 100), 3)
+        self.assertEqual(store.record_user("JohnDoe", dribbble_user_data, 200), 0)
+
+        dribbble_user_data["followers"] = 12
+        self.assertEqual(store.record_user("JohnDoe", dribbble_user_data, 300), 1)
+        self.assertEqual(
+            store.range("user:JohnDoe", "followers", 150, 400), [(150, 10), (300, 12)]
+        )
+        self.assertEqual(store.range("shot:123", "views", 0, 400), [(100, 50)])
+
+    def test_downsample(self):
+        print("Testing time-series downsampling...")
+        store = TimeSeriesStore(":memory:")
+        store.append([("shot:1", "views", at, at) for at in (0, 5, 25, 32)])
+        self.assertEqual(
+            store.downsample("shot:1", "views", 0, 40, 10),
+            [(0, 5), (10, 5), (20, 25), (30, 32)],
+        )
+
+    def test_sample_time(self):
+        print("Testing time-series sample times...")
+        self.assertEqual(parse_time("1614600000"), 1614600000)
+        self.assertEqual(parse_time("2021-03-01T12:00:00Z"), 1614600000)
+        self.assertEqual(parse_time("2021-03-01"), 1614556800)
+        with self.assertRaises(ValueError):
+            parse_time("March 1, 2021")
+
+        json_path = os.path.join(tempfile.mkdtemp(), "JohnDoe.json")
+        with open(json_path, "w") as json_file:
+            json.dump({"followers": 10}, json_file)
+        os.utime(json_path, (100, 100))
+
+        # the scrape time wins over the file time, --time over both
+        data = {"followers": 10, "scraped_at": "2021-03-01T12:00:00Z"}
+        self.assertEqual(sample_time(data, json_path), 1614600000)
+        self.assertEqual(sample_time(data, json_path, 200), 200)
+        self.assertEqual(sample_time({"followers": 10}, json_path), 100)
+
+    def test_record_scrape_times(self):
+        print("Testing time-series records...")
+        results = tempfile.mkdtemp()
+        db_path = os.path.join(tempfile.mkdtemp(), "history.db")
+        with open(os.path.join(results, "JohnDoe.json"), "w") as json_file:
+            json.dump(
+                {"followers": 10, "scraped_at": "2021-03-01T12:00:00Z"}, json_file
+            )
+        with open(os.path.join(results, "theosm.json"), "w") as json_file:
+            json.dump({"followers": 20}, json_file)
+
+        main(["record", results, "--db", db_path])
+
+        store = TimeSeriesStore(db_path)
+        self.assertEqual(
+            store.range("user:JohnDoe", "followers", 0, 1700000000),
+            [(1614600000, 10)],
+        )
+        # the file time is only used for a file without a scrape time
+        mtime = int(os.path.getmtime(os.path.join(results, "theosm.json")))
+        self.assertEqual(
+            store.range("user:theosm", "followers", 0, mtime + 1), [(mtime, 20)]
+        )
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+from unittest import IsolatedAsyncioTestCase
+import os
+import json
+import tempfile
+import unittest
+import anyio
+import httpx
+
+from dribbble_py.jobqueue import MemoryJobQueue, SQLiteJobQueue, DirectorySink
+from dribbble_py.worker import Worker
+
+MAIN_PAGE = """<html><body>
+<ul><li class="shots"><a><span class="count">12</span></a></li></ul>
+</body></html>"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestWorker(IsolatedAsyncioTestCase):
+    async def test_scrapes_queued_jobs(self):
+        print("Testing worker jobs...")
+        requests = []
+
+        def handler(request):
+            requests.append(request.url.path)
+            return httpx.Response(200, text=MAIN_PAGE)
+
+        directory = tempfile.mkdtemp()
+        for queue in (
+            MemoryJobQueue(),
+            SQLiteJobQueue(os.path.join(directory, "jobs.db")),
+        ):
+            requests.clear()
+            queue.put(["TonyBabel", "theosm"])
+            sink = DirectorySink(tempfile.mkdtemp())
+            async with httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            ) as client:
+                worker = Worker(
+                    queue,
+                    sink,
+                    "worker-1",
+                    concurrency=2,
+                    exit_when_empty=True,
+                    sections=["main"],
+                    client=client,
+                )
+                with anyio.fail_after(5):
+                    results = await worker.run()
+
+            self.assertEqual(results, {"completed": 2, "failed": 0})
+            self.assertEqual(sorted(requests), ["/TonyBabel/", "/theosm/"])
+            self.assertEqual(queue.counts()["done"], 2)
+            queue.close()
+            with open(os.path.join(sink.path, "TonyBabel.json")) as json_file:
+                self.assertEqual(json.load(json_file)["shots_count"], 12)
+
+    async def test_lost_lease_discards_result(self):
+        print("Testing lost worker leases...")
+        clock = FakeClock()
+        queue = MemoryJobQueue(clock=clock)
+        queue.put(["TonyBabel"])
+        taken_over = []
+
+        async def handler(request):
+            # another worker takes the job over once its lease expired
+            clock.now += 61
+            taken_over.append(queue.claim("worker-2", 60))
+            await anyio.sleep(10)
+            return httpx.Response(200, text=MAIN_PAGE)
+
+        sink = DirectorySink(tempfile.mkdtemp())
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            worker = Worker(
+                queue,
+                sink,
+                "worker-1",
+                lease_seconds=0.3,
+                exit_when_empty=True,
+                sections=["main"],
+                client=client,
+            )
+            with anyio.fail_after(5):
+                results = await worker.run()
+
+        self.assertEqual(results, {"completed": 0, "failed": 0})
+        self.assertEqual(taken_over[0].username, "TonyBabel")
+        self.assertEqual(queue.counts()["leased"], 1)
+        self.assertEqual(os.listdir(sink.path), [])
+
+
+if __name__ == "__main__":
+    unittest.main()